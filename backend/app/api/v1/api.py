@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, meetings, agendas, files, reports, meeting_admin
+from app.api.v1.endpoints import auth, users, meetings, agendas, files, uploads, reports, meeting_admin, audit
 
 api_router = APIRouter()
 
@@ -8,5 +8,7 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(meetings.router, prefix="/meetings", tags=["meetings"])
 api_router.include_router(agendas.router, prefix="/agendas", tags=["agendas"])
 api_router.include_router(files.router, prefix="/files", tags=["files"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(meeting_admin.router, tags=["meeting-admin"])
+api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
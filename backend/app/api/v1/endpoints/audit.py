@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from app.core.database import get_async_db
+from app.core.rbac import require_admin
+from app.models.user import User
+from app.schemas.audit import AuditEventPage
+from app.services.audit_store_service import AuditStoreService
+
+router = APIRouter()
+
+@router.get("/events", response_model=AuditEventPage)
+async def read_audit_events(
+    event_type: Optional[str] = None,
+    username: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin)
+):
+    """Search audit events, newest first (Admin only). Pass next_cursor back as `cursor` for the next page."""
+    events, next_cursor = await AuditStoreService.search_events(
+        db, event_type=event_type, username=username, since=since, until=until, cursor=cursor, limit=limit
+    )
+    return {"items": events, "next_cursor": next_cursor}
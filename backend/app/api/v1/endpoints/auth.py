@@ -1,34 +1,25 @@
-from fastapi import APIRouter, HTTPException, Form, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Form, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.services.hr_auth_service import verify_hr_user
-from app.core.auth import create_access_token, get_user_roles
+from app.services.hr_auth_service import match_hr_password_async, upgrade_password_hash
+from app.core.auth import create_access_token, get_user_roles, build_token_claims
 from app.core.database import get_db
 from app.core.audit import log_login_success, log_login_failure
+from app.core.executors import ExecutorSaturated
 from app.models.user import User
 
 router = APIRouter()
 
-@router.post("/login")
-def login(
-    request: Request,
-    username: str = Form(...), 
-    password: str = Form(...),
-    db: Session = Depends(get_db)
-):
-    client_ip = request.client.host
-    
-    if not verify_hr_user(username, password):
-        log_login_failure(username, client_ip)
-        raise HTTPException(status_code=401, detail="Invalid username or password")
-
+def _issue_token(db: Session, username: str) -> dict:
+    """Load local profile/roles and sign the access token (blocking DB work)"""
     # Get user info from PostgreSQL
     user = db.query(User).filter(User.username == username).first()
-    
+
     # Get user roles
     roles = []
     if user:
         roles = get_user_roles(user, db)
-    
+
     user_data = {
         "username": username,
         "email": user.email if user else f"{username}@hospital.local",
@@ -37,13 +28,42 @@ def login(
         "roles": roles
     }
 
-    token = create_access_token(data={"sub": username})
-    
-    # Log successful login
-    log_login_success(username, client_ip)
-    
+    token = create_access_token(data=build_token_claims(user, username, roles, db))
     return {
-        "access_token": token, 
+        "access_token": token,
         "token_type": "bearer",
         "user": user_data
     }
+
+@router.post("/login")
+async def login(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    username: str = Form(...),
+    password: str = Form(...),
+    db: Session = Depends(get_db)
+):
+    client_ip = request.client.host
+
+    try:
+        matched_hash = await match_hr_password_async(username, password)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login service is busy. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    if matched_hash is None:
+        log_login_failure(username, client_ip)
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+
+    response = await run_in_threadpool(_issue_token, db, username)
+
+    # Log successful login
+    log_login_success(username, client_ip)
+
+    # Upgrade legacy MD5 / low-cost bcrypt hashes after the response is sent
+    background_tasks.add_task(upgrade_password_hash, username, password, matched_hash)
+
+    return response
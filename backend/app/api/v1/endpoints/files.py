@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query
+import mimetypes
+import os
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, status, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
+from app.core.downloads import FileDownload
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.rbac import require_authenticated
+from app.core.storage import storage
+from app.models.file import File as FileModel
+from app.models.user import User
 from app.schemas.file import FileResponse as FileResponseSchema, FileUpload
+from app.services.preview_service import PREVIEW_CACHE_CONTROL, previewable, requeue_preview
 
 router = APIRouter()
 
@@ -24,11 +36,79 @@ async def read_file(file_id: int, db: Session = Depends(get_db)):
     # TODO: Get file metadata
     pass
 
-@router.get("/{file_id}/download")
-async def download_file(file_id: int, db: Session = Depends(get_db)):
-    """Download file by ID"""
-    # TODO: Handle file download
-    pass
+@router.api_route("/{file_id}/download", methods=["GET", "HEAD"])
+async def download_file(
+    file_id: int,
+    request: Request,
+    download: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_authenticated)
+):
+    """
+    Download file by ID (inline for preview; ?download=true for an attachment).
+    Supports Range/If-Range for resuming and seeking, and If-None-Match.
+    """
+    result = await db.execute(
+        select(FileModel.file_id, FileModel.file_path, FileModel.original_name,
+               FileModel.mime_type, FileModel.content_hash)
+        .where(FileModel.file_id == file_id, FileModel.is_deleted.is_(False))
+    )
+    file = result.first()
+    if file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    try:
+        stat = await run_in_threadpool(os.stat, file.file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File content is missing")
+
+    # Content-addressed files never change, so their hash is a strong validator
+    if file.content_hash:
+        etag = f'"{file.content_hash}"'
+    else:
+        etag = make_etag("file", file.file_id, stat.st_size, stat.st_mtime_ns)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    media_type = file.mime_type or mimetypes.guess_type(file.original_name)[0]
+    return FileDownload(request, file.file_path, stat, etag, media_type, file.original_name, attachment=download)
+
+@router.get("/{file_id}/preview")
+async def preview_file(
+    file_id: int,
+    request: Request,
+    size: str = Query("thumb", pattern="^(thumb|web)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_authenticated)
+):
+    """
+    JPEG preview of an image or PDF attachment: "thumb" (256px) or "web"
+    (1280px). Previews are generated in the background after upload; until
+    then this returns 404 with Retry-After.
+    """
+    result = await db.execute(
+        select(FileModel.file_path, FileModel.file_type, FileModel.content_hash)
+        .where(FileModel.file_id == file_id, FileModel.is_deleted.is_(False))
+    )
+    file = result.first()
+    if file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    if not previewable(file.file_type, file.file_path, file.content_hash):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No preview for this file type")
+
+    etag = f'"{file.content_hash}.{size}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    path = storage.preview_path(file.content_hash, size)
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        job_status = await db.run_sync(requeue_preview, file.content_hash, file.file_type)
+        await db.commit()
+        if job_status == "failed":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview could not be generated")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview is being generated",
+                            headers={"Retry-After": "10"})
+    return FileDownload(request, path, stat, etag, "image/jpeg", cache_control=PREVIEW_CACHE_CONTROL)
 
 @router.post("/upload", response_model=FileResponseSchema, status_code=status.HTTP_201_CREATED)
 async def upload_file(
@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import set_next_cursor
+from app.core.responses import FastJSON
+from app.core.etag import make_etag, etag_matches, not_modified, set_etag, meeting_etag_state
 from app.core.rbac import require_any_admin
 from app.models.user import User
 from app.schemas.meeting import MeetingResponse, MeetingCreate
 from app.schemas.agenda import AgendaResponse, AgendaCreate
 from app.schemas.objective import ObjectiveResponse, ObjectiveCreate
-from app.services.meeting_service import MeetingService
-from app.services.agenda_service import AgendaService
-from app.services.objective_service import ObjectiveService
+from app.services.meeting_service import AsyncMeetingService
+from app.services.agenda_service import AsyncAgendaService
+from app.services.objective_service import AsyncObjectiveService
 import json
 
-router = APIRouter()
+respond = FastJSON("meeting_admin")
+router = APIRouter(default_response_class=respond.response_class)
 
 # ==================== MEETING ENDPOINTS ====================
 
 @router.post("/meetings", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
 async def create_meeting(
     meeting: MeetingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
     """
@@ -30,30 +34,33 @@ async def create_meeting(
     - All required fields present
     """
     try:
-        new_meeting = MeetingService.create_meeting(db, meeting, current_user.user_id)
+        new_meeting = await AsyncMeetingService.create_meeting(db, meeting, current_user.user_id)
         return new_meeting
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/meetings", response_model=List[MeetingResponse])
 async def get_meetings(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
-    """Get all meetings with pagination"""
-    meetings = MeetingService.get_meetings(db, skip, limit)
-    return meetings
+    """Get all meetings with pagination (next page cursor in X-Next-Cursor)"""
+    meetings, next_cursor = await AsyncMeetingService.get_meeting_rows_page(db, limit, cursor=cursor, skip=skip)
+    set_next_cursor(response, next_cursor)
+    return respond(meetings, response)
 
 @router.get("/meetings/{meeting_id}", response_model=MeetingResponse)
 async def get_meeting(
     meeting_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
     """Get meeting by ID"""
-    meeting = MeetingService.get_meeting(db, meeting_id)
+    meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     return meeting
@@ -68,7 +75,7 @@ async def create_agenda(
     agenda_type: str = Form("เพื่อทราบ"),
     objective_ids: str = Form("[]"),  # JSON string of list
     files: List[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
     """
@@ -80,7 +87,7 @@ async def create_agenda(
     - Allowed types: pdf, doc, docx, md, jpg, jpeg, png
     """
     # Verify meeting exists
-    meeting = MeetingService.get_meeting(db, meeting_id)
+    meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
@@ -99,13 +106,11 @@ async def create_agenda(
     )
     
     try:
-        new_agenda = AgendaService.create_agenda(
+        # Returned with files and objectives already loaded
+        new_agenda = await AsyncAgendaService.create_agenda(
             db, meeting_id, agenda_data, current_user.user_id, files
         )
         
-        # Refresh to load relationships
-        db.refresh(new_agenda)
-        
         # Build response with files and objectives
         response = AgendaResponse(
             agenda_id=new_agenda.agenda_id,
@@ -137,64 +142,51 @@ async def create_agenda(
 @router.get("/meetings/{meeting_id}/agendas", response_model=List[AgendaResponse])
 async def get_meeting_agendas(
     meeting_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
-    """Get all agendas for a meeting with files and objectives"""
-    meeting = MeetingService.get_meeting(db, meeting_id)
-    if not meeting:
+    """
+    Get all agendas for a meeting with files and objectives.
+    With `limit`, returns one page and the next page's cursor in X-Next-Cursor.
+    ETag / If-None-Match aware: unchanged agendas cost one version lookup.
+    """
+    state = await meeting_etag_state(db, meeting_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Meeting not found")
+    etag = make_etag("agendas", *state, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    agendas = AgendaService.get_meeting_agendas(db, meeting_id)
-    
-    # Build response with relationships
-    response = []
-    for agenda in agendas:
-        response.append(AgendaResponse(
-            agenda_id=agenda.agenda_id,
-            meeting_id=agenda.meeting_id,
-            user_id=agenda.user_id,
-            agenda_title=agenda.agenda_title,
-            agenda_detail=agenda.agenda_detail,
-            agenda_type=agenda.agenda_type,
-            agenda_order=agenda.agenda_order,
-            status=agenda.status,
-            created_at=agenda.created_at,
-            updated_at=agenda.updated_at,
-            files=[{
-                "file_id": f.file_id,
-                "filename": f.original_name,
-                "file_path": f.file_path,
-                "uploaded_at": f.uploaded_at
-            } for f in agenda.files],
-            objectives=[{
-                "objective_id": om.objective.objective_id,
-                "objective_name": om.objective.objective_name
-            } for om in agenda.objective_maps]
-        ))
-    
-    return response
+    # Built from row tuples, already in AgendaResponse shape
+    agendas, next_cursor = await AsyncAgendaService.get_meeting_agenda_rows(db, meeting_id, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    set_etag(response, etag)
+    return respond(agendas, response)
 
 # ==================== OBJECTIVE ENDPOINTS ====================
 
 @router.get("/objectives", response_model=List[ObjectiveResponse])
 async def get_objectives(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
     """Get all objectives"""
-    objectives = ObjectiveService.get_objectives(db)
-    return objectives
+    objectives = await AsyncObjectiveService.get_objective_rows(db)
+    return respond(objectives)
 
 @router.post("/objectives", response_model=ObjectiveResponse, status_code=status.HTTP_201_CREATED)
 async def create_objective(
     objective: ObjectiveCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_any_admin)
 ):
     """Create new objective (Admin only)"""
     try:
-        new_objective = ObjectiveService.create_objective(db, objective)
+        new_objective = await AsyncObjectiveService.create_objective(db, objective)
         return new_objective
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
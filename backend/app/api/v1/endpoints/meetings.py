@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.rbac import require_admin, require_authenticated
+from app.core.pagination import set_next_cursor
+from app.core.responses import FastJSON
+from app.core.etag import make_etag, etag_matches, not_modified, set_etag, meeting_etag_state
+from app.core.downloads import content_disposition
 from app.core.audit import log_meeting_create, log_meeting_update, log_meeting_delete, log_meeting_close
 from app.models.user import User
 from app.models.meeting import Meeting
 from app.schemas.meeting import MeetingResponse, MeetingCreate, MeetingUpdate
+from app.services.meeting_service import AsyncMeetingService
+from app.services.attachment_bundle_service import get_bundle_rows, stream_bundle
 
-router = APIRouter()
+respond = FastJSON("meetings")
+router = APIRouter(default_response_class=respond.response_class)
+
+async def _get_meeting_with_creator(db: AsyncSession, meeting_id: int) -> Optional[Meeting]:
+    """Load a meeting together with its creator (fresh from the database)"""
+    result = await db.execute(
+        select(Meeting)
+        .options(joinedload(Meeting.creator))
+        .where(Meeting.meeting_id == meeting_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 def _populate_creator_fullname(meeting: Meeting) -> dict:
     """Helper to populate created_by_fullname from creator relationship"""
@@ -32,42 +52,85 @@ def _populate_creator_fullname(meeting: Meeting) -> dict:
 
 @router.get("/", response_model=List[MeetingResponse])
 async def read_meetings(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_authenticated)
 ):
-    """Get all meetings with pagination"""
-    meetings = db.query(Meeting).options(joinedload(Meeting.creator)).order_by(Meeting.meeting_date.desc()).offset(skip).limit(limit).all()
-    return [_populate_creator_fullname(m) for m in meetings]
+    """
+    Get all meetings with pagination, newest first.
+    The next page's cursor is returned in the X-Next-Cursor header; skip still works without one.
+    """
+    meetings, next_cursor = await AsyncMeetingService.get_meeting_rows_page(db, limit, cursor=cursor, skip=skip)
+    set_next_cursor(response, next_cursor)
+    return respond(meetings, response)
 
 @router.get("/current", response_model=MeetingResponse)
 async def read_current_meeting(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_authenticated)
 ):
-    """Get current active meeting"""
-    meeting = db.query(Meeting).options(joinedload(Meeting.creator)).filter(Meeting.status == "active").order_by(Meeting.meeting_date.desc()).first()
+    """Get current active meeting (ETag / If-None-Match aware)"""
+    state = await meeting_etag_state(db, current=True)
+    if not state:
+        raise HTTPException(status_code=404, detail="No active meeting found")
+    etag = make_etag("meeting", *state)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    meeting = await AsyncMeetingService.get_current_meeting_row(db)
     if not meeting:
         raise HTTPException(status_code=404, detail="No active meeting found")
-    return _populate_creator_fullname(meeting)
+    set_etag(response, etag)
+    return respond(meeting, response)
 
 @router.get("/{meeting_id}", response_model=MeetingResponse)
 async def read_meeting(
     meeting_id: int, 
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_authenticated)
 ):
-    """Get meeting by ID"""
-    meeting = db.query(Meeting).options(joinedload(Meeting.creator)).filter(Meeting.meeting_id == meeting_id).first()
+    """Get meeting by ID (ETag / If-None-Match aware)"""
+    # Version is read before the data: if they race, the client just refetches next time
+    state = await meeting_etag_state(db, meeting_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    etag = make_etag("meeting", *state)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    meeting = await _get_meeting_with_creator(db, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    return _populate_creator_fullname(meeting)
+    set_etag(response, etag)
+    return respond(_populate_creator_fullname(meeting), response)
+
+@router.get("/{meeting_id}/attachments.zip", response_class=StreamingResponse)
+async def download_meeting_attachments(
+    meeting_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_authenticated)
+):
+    """All agenda attachments as a ZIP (one folder per agenda), streamed as it is built"""
+    if not await AsyncMeetingService.get_meeting(db, meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    rows = await get_bundle_rows(db, meeting_id)
+    return StreamingResponse(
+        stream_bundle(rows),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"meeting-{meeting_id}-attachments.zip", attachment=True)},
+    )
 
 @router.post("/", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
 async def create_meeting(
     meeting: MeetingCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Create new meeting (Admin and Group Admin allowed)"""
@@ -76,25 +139,24 @@ async def create_meeting(
         created_by=current_user.user_id
     )
     db.add(db_meeting)
-    db.commit()
-    db.refresh(db_meeting)
+    await db.commit()
     
     # Audit log
     log_meeting_create(current_user.username, db_meeting.meeting_id, db_meeting.meeting_title)
     
     # Reload with creator relationship
-    db_meeting = db.query(Meeting).options(joinedload(Meeting.creator)).filter(Meeting.meeting_id == db_meeting.meeting_id).first()
+    db_meeting = await _get_meeting_with_creator(db, db_meeting.meeting_id)
     return _populate_creator_fullname(db_meeting)
 
 @router.put("/{meeting_id}", response_model=MeetingResponse)
 async def update_meeting(
     meeting_id: int, 
     meeting: MeetingUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Update meeting (Admin and Group Admin allowed)"""
-    db_meeting = db.query(Meeting).options(joinedload(Meeting.creator)).filter(Meeting.meeting_id == meeting_id).first()
+    db_meeting = await _get_meeting_with_creator(db, meeting_id)
     if not db_meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
@@ -103,8 +165,8 @@ async def update_meeting(
         setattr(db_meeting, field, value)
     
     db_meeting.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_meeting)
+    await db.commit()
+    db_meeting = await _get_meeting_with_creator(db, meeting_id)
     
     # Audit log
     log_meeting_update(current_user.username, db_meeting.meeting_id, db_meeting.meeting_title)
@@ -114,19 +176,18 @@ async def update_meeting(
 @router.delete("/{meeting_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_meeting(
     meeting_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Delete meeting (Admin and Group Admin allowed)"""
-    db_meeting = db.query(Meeting).filter(Meeting.meeting_id == meeting_id).first()
+    db_meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
     if not db_meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
     # Store info for audit log before deletion
     meeting_title = db_meeting.meeting_title
     
-    db.delete(db_meeting)
-    db.commit()
+    await AsyncMeetingService.delete_meeting(db, meeting_id)
     
     # Audit log
     log_meeting_delete(current_user.username, meeting_id, meeting_title)
@@ -136,19 +197,19 @@ async def delete_meeting(
 @router.post("/{meeting_id}/close", response_model=MeetingResponse)
 async def close_meeting(
     meeting_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Close meeting (Admin and Group Admin allowed)"""
-    db_meeting = db.query(Meeting).options(joinedload(Meeting.creator)).filter(Meeting.meeting_id == meeting_id).first()
+    db_meeting = await _get_meeting_with_creator(db, meeting_id)
     if not db_meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
     db_meeting.status = "closed"
     db_meeting.closed_at = datetime.utcnow()
     db_meeting.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_meeting)
+    await db.commit()
+    db_meeting = await _get_meeting_with_creator(db, meeting_id)
     
     # Audit log
     log_meeting_close(current_user.username, db_meeting.meeting_id, db_meeting.meeting_title)
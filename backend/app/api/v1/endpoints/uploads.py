@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.rbac import require_any_admin
+from app.core.uploads import UploadTooLarge
+from app.models.upload_session import UploadSession
+from app.models.user import User
+from app.schemas.file import FileResponse as FileResponseSchema, UploadSessionCreate, UploadSessionResponse
+from app.services.resumable_upload_service import ChunkOffsetMismatch, ResumableUploadService
+
+router = APIRouter()
+
+def _session_response(upload_session: UploadSession, response: Response) -> dict:
+    response.headers["Upload-Offset"] = str(upload_session.received)
+    response.headers["Cache-Control"] = "no-store"
+    return {
+        "upload_id": upload_session.upload_id,
+        "agenda_id": upload_session.agenda_id,
+        "filename": upload_session.original_name,
+        "size": upload_session.total_size,
+        "offset": upload_session.received,
+        "expires_at": upload_session.expires_at,
+        "file_id": upload_session.file_id,
+    }
+
+async def _get_session(db: AsyncSession, upload_id: str, user: User) -> UploadSession:
+    upload_session = await ResumableUploadService.get_session(db, upload_id, user.user_id)
+    if upload_session is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return upload_session
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    data: UploadSessionCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_any_admin)
+):
+    """
+    Start a resumable upload for an agenda attachment.
+
+    Send the file with PATCH /uploads/{upload_id} (header Upload-Offset, raw
+    bytes as the body) in as many chunks as needed, then POST
+    /uploads/{upload_id}/finalize. After an interrupted chunk, GET the upload
+    to learn the offset to continue from.
+    """
+    try:
+        upload_session = await ResumableUploadService.create_session(db, data, current_user.user_id)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if upload_session is None:
+        raise HTTPException(status_code=404, detail="Agenda not found")
+    return _session_response(upload_session, response)
+
+@router.api_route("/{upload_id}", methods=["GET", "HEAD"], response_model=UploadSessionResponse)
+async def read_upload(
+    upload_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_any_admin)
+):
+    """Current state of an upload; Upload-Offset is where the next chunk starts"""
+    return _session_response(await _get_session(db, upload_id, current_user), response)
+
+@router.patch("/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_any_admin)
+):
+    """Append the request body at Upload-Offset (409 with the current offset if it does not match)"""
+    upload_session = await _get_session(db, upload_id, current_user)
+    try:
+        await ResumableUploadService.write_chunk(db, upload_session, upload_offset, request.stream())
+    except ChunkOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.expected)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _session_response(await _get_session(db, upload_id, current_user), response)
+
+@router.post("/{upload_id}/finalize", response_model=FileResponseSchema, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_any_admin)
+):
+    """Check the SHA-256 and attach the file to the agenda (safe to retry)"""
+    try:
+        file = await ResumableUploadService.finalize(db, upload_id, current_user.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if file is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return file
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_any_admin)
+):
+    """Abandon an upload and delete what was received"""
+    await ResumableUploadService.cancel(db, await _get_session(db, upload_id, current_user))
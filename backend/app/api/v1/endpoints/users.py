@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db
+from app.core.pagination import keyset_query, split_page, set_next_cursor
 from app.core.auth import get_current_active_user
 from app.core.rbac import require_admin, require_authenticated
 from app.models.user import User
@@ -16,23 +18,31 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
-    """Get all users (Admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    """Get all users (Admin only), by user_id; next page cursor in X-Next-Cursor"""
+    stmt = keyset_query(select(User), (User.user_id,), cursor)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit + 1))
+    users, next_cursor = split_page(result.scalars().all(), limit, lambda u: (u.user_id,))
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_authenticated)
 ):
     """Get user by ID"""
-    user = db.query(User).filter(User.user_id == user_id).first()
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    user = result.scalars().first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
\ No newline at end of file
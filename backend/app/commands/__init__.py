@@ -0,0 +1,5 @@
+"""
+Operational commands, run from the backend directory:
+
+    python -m app.commands.<name> --help
+"""
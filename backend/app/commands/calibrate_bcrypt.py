@@ -0,0 +1,51 @@
+"""
+Measure bcrypt cost on this machine and recommend BCRYPT_ROUNDS.
+
+Picks the highest cost whose median verify time stays within the latency
+budget. Run it on the production hardware, not a developer laptop.
+
+Usage:
+    python -m app.commands.calibrate_bcrypt [--budget-ms 250] [--samples 5]
+"""
+import argparse
+import statistics
+import time
+import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Median seconds for one bcrypt verification at the given cost"""
+    password = b"calibration-password"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate bcrypt rounds against a latency budget")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="max median verify time per login")
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    chosen = MIN_ROUNDS
+    print(f"{'rounds':>6}  {'median ms':>10}")
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed_ms = measure(rounds, args.samples) * 1000
+        print(f"{rounds:>6}  {elapsed_ms:>10.1f}")
+        if elapsed_ms > args.budget_ms:
+            break
+        chosen = rounds
+
+    print(f"\n✅ Recommended: BCRYPT_ROUNDS={chosen} (budget {args.budget_ms:.0f} ms)")
+    print("   Existing hashes below this cost are upgraded after each user's next login.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Extract attachment text outside the app: optionally queue every extractable
+file that has no document_texts row yet (e.g. after migrate_uploads), then
+work through the queue in a pool of worker processes until it is empty,
+reporting progress after each batch.
+
+Usage:
+    python -m app.commands.extract_texts [--backfill] [--workers 4] [--batch-size 20]
+"""
+import argparse
+import os
+import time
+from app.services.text_extraction_service import (
+    ExtractionPool, backfill_texts, count_pending_texts, process_pending_texts,
+)
+import app.models  # noqa: F401  (register tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the text of PDF, Word and Markdown attachments")
+    parser.add_argument("--backfill", action="store_true", help="queue existing files that have no text yet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="rows claimed at a time (default: 4 per worker)")
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"✅ Queued {backfill_texts()} files")
+    total = count_pending_texts()
+    print(f"  {total} documents to extract with {args.workers} workers")
+
+    totals = {"done": 0, "failed": 0}
+    started = time.monotonic()
+    with ExtractionPool(args.workers) as pool:
+        while True:
+            stats = process_pending_texts(batch_size=args.batch_size or args.workers * 4, pool=pool)
+            if not stats["claimed"]:
+                break
+            totals["done"] += stats["done"]
+            totals["failed"] += stats["failed"]
+            finished = totals["done"] + totals["failed"]
+            rate = finished / max(time.monotonic() - started, 1e-6)
+            print(f"  {finished}/{max(total, finished)} ({totals['failed']} failed, {rate:.1f}/s)")
+        if pool.restarts:
+            print(f"  worker pool restarted {pool.restarts} times after crashed extractions")
+    print(f"✅ Text extraction: {totals}")
+
+
+if __name__ == "__main__":
+    main()
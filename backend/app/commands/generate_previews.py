@@ -0,0 +1,34 @@
+"""
+Generate attachment previews outside the app: optionally queue every
+previewable file that has no job yet (e.g. after migrate_uploads), then work
+through the queue until it is empty.
+
+Usage:
+    python -m app.commands.generate_previews [--backfill] [--batch-size 20]
+"""
+import argparse
+from app.services.preview_service import backfill_previews, process_pending_previews
+import app.models  # noqa: F401  (register tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate attachment thumbnails and previews")
+    parser.add_argument("--backfill", action="store_true", help="queue existing files that have no previews yet")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"✅ Queued {backfill_previews()} files")
+    totals = {"done": 0, "failed": 0}
+    while True:
+        stats = process_pending_previews(batch_size=args.batch_size)
+        if not stats["claimed"]:
+            break
+        totals["done"] += stats["done"]
+        totals["failed"] += stats["failed"]
+        print(f"  {totals['done']} done, {totals['failed']} failed")
+    print(f"✅ Previews: {totals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Move attachments stored before the content-addressed layout into it, in
+batches, updating files.file_path in bulk. Safe to interrupt and rerun;
+--after-id resumes after the last file_id printed.
+
+Usage:
+    python -m app.commands.migrate_uploads [--batch-size 500] [--limit N] [--after-id ID]
+"""
+import argparse
+from app.core.database import Base, postgres_engine
+from app.services.upload_migration_service import migrate_uploads
+import app.models  # noqa: F401  (register tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate flat uploads/ files into content-addressed storage")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many rows")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this file_id")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=postgres_engine)
+    stats = migrate_uploads(
+        batch_size=args.batch_size,
+        after_id=args.after_id,
+        limit=args.limit,
+        on_batch=lambda s: print(f"   batch {s['batches']}: {s['migrated']} migrated, last file_id {s['last_file_id']}"),
+    )
+    print(f"✅ Upload migration: {stats}")
+    print(f"   Resume with --after-id {stats['last_file_id']}")
+
+
+if __name__ == "__main__":
+    main()
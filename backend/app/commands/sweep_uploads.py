@@ -0,0 +1,24 @@
+"""
+Reconcile the upload directory with the files table: clear abandoned staging
+directories, garbage-collect unreferenced blobs, delete unreferenced files,
+report rows whose file is missing.
+
+Usage:
+    python -m app.commands.sweep_uploads [--batch-size 1000]
+"""
+import argparse
+from app.services.upload_sweeper_service import sweep_uploads
+import app.models  # noqa: F401  (register tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile uploads/ with the files table")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    stats = sweep_uploads(batch_size=args.batch_size)
+    print(f"✅ Upload sweep: {stats}")
+
+
+if __name__ == "__main__":
+    main()
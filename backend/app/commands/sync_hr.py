@@ -0,0 +1,24 @@
+"""
+Sync hr.personnel (MariaDB) into the local hr_personnel_mirror table and users_local.
+
+Usage:
+    python -m app.commands.sync_hr [--batch-size 1000]
+"""
+import argparse
+from app.core.database import Base, postgres_engine
+from app.services.hr_sync_service import sync_hr_personnel
+import app.models  # noqa: F401  (register tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync hr.personnel into the local mirror")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=postgres_engine)
+    stats = sync_hr_personnel(batch_size=args.batch_size)
+    print(f"✅ HR personnel sync: {stats}")
+
+
+if __name__ == "__main__":
+    main()
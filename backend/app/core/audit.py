@@ -1,60 +1,249 @@
 """
 Audit logging system for security events
+
+Callers only enqueue: the "audit" logger has a single QueueHandler, and a
+background QueueListener thread groups records into batches (AUDIT_BATCH_SIZE
+or every AUDIT_FLUSH_INTERVAL_SECONDS, whichever comes first) and hands each
+batch to the sinks. The file sink writes one JSON object per line and rotates
+by size or by date. stop_audit_pipeline() drains the queue before returning.
 """
+import atexit
+import json
 import logging
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+from app.core.config import settings
+from app.core.request_context import get_request_id
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp the current request ID while still on the caller's thread/context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        return True
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level, event, request_id, then the event fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "event": getattr(record, "event", record.getMessage()),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class JsonLinesFileSink:
+    """
+    Writes a whole batch with one write() + flush(). Rotation reuses the
+    stdlib handlers: by size when `when` is "size", otherwise by time
+    (`when` is passed to TimedRotatingFileHandler, e.g. "midnight").
+    """
+
+    def __init__(self, path: str, when: str = "size", max_bytes: int = 0, backup_count: int = 0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if when == "size":
+            self.handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+        else:
+            self.handler = TimedRotatingFileHandler(
+                path, when=when, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+        self.handler.setFormatter(JsonLineFormatter())
+
+    def _should_rollover(self, first: logging.LogRecord, size: int) -> bool:
+        handler = self.handler
+        if isinstance(handler, TimedRotatingFileHandler):
+            return bool(handler.shouldRollover(first))
+        return handler.maxBytes > 0 and handler.stream.tell() > 0 and handler.stream.tell() + size >= handler.maxBytes
+
+    def write_batch(self, records: List[logging.LogRecord]):
+        handler = self.handler
+        data = "".join(handler.format(record) + "\n" for record in records)
+        handler.acquire()
+        try:
+            if handler.stream is None:
+                handler.stream = handler._open()
+            if self._should_rollover(records[0], len(data.encode("utf-8"))):
+                handler.doRollover()
+                if handler.stream is None:
+                    handler.stream = handler._open()
+            handler.stream.write(data)
+            handler.stream.flush()
+        finally:
+            handler.release()
+
+    def close(self):
+        self.handler.close()
+
+
+class BatchingHandler(logging.Handler):
+    """Buffers records and passes them to every sink in batches of up to `batch_size`"""
+
+    def __init__(self, sinks: list, batch_size: int = 100):
+        super().__init__()
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.buffer: List[logging.LogRecord] = []
+        self.batches = 0
+        self.records = 0
+        self.errors = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            batch, self.buffer = self.buffer, []
+        finally:
+            self.release()
+        if not batch:
+            return
+        for sink in self.sinks:
+            try:
+                sink.write_batch(batch)
+            except Exception:
+                # A failing sink must not take the others (or the listener thread) down
+                self.errors += 1
+                logging.getLogger(__name__).exception("Audit sink %s failed", type(sink).__name__)
+        self.batches += 1
+        self.records += len(batch)
+
+    def close(self):
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+        super().close()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue stays idle for `flush_interval`"""
+
+    def __init__(self, q: queue.Queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(q, *handlers, respect_handler_level=False)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+    def stop(self):
+        # The sentinel is queued behind every pending record, so this drains the queue
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
 
-# Create logs directory if it doesn't exist
-LOGS_DIR = Path("logs")
-LOGS_DIR.mkdir(exist_ok=True)
 
-# Configure audit logger
 audit_logger = logging.getLogger("audit")
 audit_logger.setLevel(logging.INFO)
+audit_logger.propagate = False
 
-# File handler for audit logs
-audit_handler = logging.FileHandler(LOGS_DIR / "audit.log")
-audit_handler.setLevel(logging.INFO)
+_audit_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_queue_handler = QueueHandler(_audit_queue)
+_queue_handler.addFilter(RequestIdFilter())
+audit_logger.addHandler(_queue_handler)
 
-# Formatter
-formatter = logging.Formatter(
-    '%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
+batching_handler = BatchingHandler(
+    [JsonLinesFileSink(
+        settings.AUDIT_LOG_PATH,
+        when=settings.AUDIT_ROTATE_WHEN,
+        max_bytes=settings.AUDIT_MAX_BYTES,
+        backup_count=settings.AUDIT_BACKUP_COUNT,
+    )],
+    batch_size=settings.AUDIT_BATCH_SIZE,
 )
-audit_handler.setFormatter(formatter)
-audit_logger.addHandler(audit_handler)
+
+_listener: Optional[BatchingQueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def start_audit_pipeline():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = BatchingQueueListener(
+                _audit_queue, batching_handler, flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+            )
+            _listener.start()
+
+
+def stop_audit_pipeline():
+    """Write out every queued event and stop the listener thread"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def add_audit_sink(sink):
+    """Register an extra sink; it receives the same batches via write_batch(records)"""
+    batching_handler.sinks.append(sink)
+
+
+def get_audit_stats() -> dict:
+    return {
+        "queued": _audit_queue.qsize(),
+        "buffered": len(batching_handler.buffer),
+        "batches": batching_handler.batches,
+        "records": batching_handler.records,
+        "errors": batching_handler.errors,
+    }
+
+
+start_audit_pipeline()
+atexit.register(stop_audit_pipeline)
+
+
+def _audit(level: int, event: str, **fields):
+    audit_logger.log(level, event, extra={"event": event, "fields": fields})
 
 def log_login_success(username: str, ip_address: str):
     """Log successful login attempt"""
-    audit_logger.info(f"LOGIN_SUCCESS | user={username} | ip={ip_address}")
+    _audit(logging.INFO, "LOGIN_SUCCESS", user=username, ip=ip_address)
 
 def log_login_failure(username: str, ip_address: str, reason: str = "Invalid credentials"):
     """Log failed login attempt"""
-    audit_logger.warning(f"LOGIN_FAILURE | user={username} | ip={ip_address} | reason={reason}")
+    _audit(logging.WARNING, "LOGIN_FAILURE", user=username, ip=ip_address, reason=reason)
 
 def log_meeting_create(username: str, meeting_id: int, meeting_title: str):
     """Log meeting creation"""
-    audit_logger.info(f"MEETING_CREATE | user={username} | meeting_id={meeting_id} | title={meeting_title}")
+    _audit(logging.INFO, "MEETING_CREATE", user=username, meeting_id=meeting_id, title=meeting_title)
 
 def log_meeting_update(username: str, meeting_id: int, meeting_title: str):
     """Log meeting update"""
-    audit_logger.info(f"MEETING_UPDATE | user={username} | meeting_id={meeting_id} | title={meeting_title}")
+    _audit(logging.INFO, "MEETING_UPDATE", user=username, meeting_id=meeting_id, title=meeting_title)
 
 def log_meeting_delete(username: str, meeting_id: int, meeting_title: str):
     """Log meeting deletion"""
-    audit_logger.warning(f"MEETING_DELETE | user={username} | meeting_id={meeting_id} | title={meeting_title}")
+    _audit(logging.WARNING, "MEETING_DELETE", user=username, meeting_id=meeting_id, title=meeting_title)
 
 def log_meeting_close(username: str, meeting_id: int, meeting_title: str):
     """Log meeting closure"""
-    audit_logger.info(f"MEETING_CLOSE | user={username} | meeting_id={meeting_id} | title={meeting_title}")
+    _audit(logging.INFO, "MEETING_CLOSE", user=username, meeting_id=meeting_id, title=meeting_title)
 
 def log_unauthorized_access(username: Optional[str], ip_address: str, endpoint: str):
     """Log unauthorized access attempt"""
     user = username or "anonymous"
-    audit_logger.warning(f"UNAUTHORIZED_ACCESS | user={user} | ip={ip_address} | endpoint={endpoint}")
+    _audit(logging.WARNING, "UNAUTHORIZED_ACCESS", user=user, ip=ip_address, endpoint=endpoint)
 
 def log_security_event(event_type: str, details: str):
     """Log general security event"""
-    audit_logger.warning(f"SECURITY_EVENT | type={event_type} | details={details}")
+    _audit(logging.WARNING, "SECURITY_EVENT", type=event_type, details=details)
@@ -1,24 +1,48 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache, register_cache
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 # from app.models.role import UserRole, Role
-from app.models import Role, UserRole
+from app.models import Role, UserRole, RoleVersion
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user together with the role names granted to it"""
+    user: User
+    roles: Tuple[str, ...]
+
+# Resolved principals keyed by token subject (username)
+principal_cache = register_cache(TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+))
+
+# Current role version per user_id, used to reject stale role claims
+role_version_cache = register_cache(TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.ROLE_VERSION_CACHE_TTL_SECONDS,
+    name="role_version",
+))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
+
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -29,26 +53,107 @@ def verify_token(token: str) -> Optional[dict]:
         username: str = payload.get("sub")
         if username is None:
             return None
-        return {"username": username, "user_id": payload.get("user_id")}
+        return {
+            "username": username,
+            "user_id": payload.get("user_id"),
+            "roles": payload.get("roles"),
+            "rv": payload.get("rv"),
+        }
     except JWTError:
         return None
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def build_token_claims(user: Optional[User], username: str, roles: List[str], db: Session) -> dict:
+    """
+    Claims for a new access token. With JWT_EMBED_ROLES enabled the user_id,
+    role set and current role version are signed in as well, so RoleChecker
+    can authorize without touching the database.
+    """
+    claims = {"sub": username}
+    if settings.JWT_EMBED_ROLES and user is not None:
+        claims.update({
+            "user_id": user.user_id,
+            "roles": list(roles),
+            "rv": get_role_version(user.user_id, db),
+        })
+    return claims
+
+def get_role_version(user_id: int, db: Session) -> int:
+    """Current role version for a user (cached for ROLE_VERSION_CACHE_TTL_SECONDS)"""
+    version = role_version_cache.get(user_id)
+    if version is None:
+        version = db.execute(
+            select(RoleVersion.version).where(RoleVersion.user_id == user_id)
+        ).scalar() or 0
+        role_version_cache.set(user_id, version)
+    return version
+
+def principal_from_claims(token_data: dict, db: Session) -> Optional[Principal]:
+    """
+    Build a principal straight from signed role claims. Returns None when the
+    token has no role claims or its role version is stale, in which case the
+    caller falls back to the database path.
+    """
+    user_id, roles, rv = token_data.get("user_id"), token_data.get("roles"), token_data.get("rv")
+    if user_id is None or roles is None or rv is None:
+        return None
+    if rv != get_role_version(user_id, db):
+        return None
+    # Transient user carrying only what the claims vouch for
+    return Principal(user=User(user_id=user_id, username=token_data["username"]), roles=tuple(roles))
+
+def load_principal(username: str, db: Session) -> Optional[Principal]:
+    """Resolve a principal, serving it from the principal cache when possible"""
+    cached = principal_cache.get(username)
+    if cached is None:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            return None
+        roles = tuple(get_user_roles(user, db))
+        # Detach a fully loaded snapshot so it can outlive this session
+        db.expunge(user)
+        cached = Principal(user=user, roles=roles)
+        principal_cache.set(username, cached)
+
+    # Attach a per-request copy without touching the database
+    return Principal(user=db.merge(cached.user, load=False), roles=cached.roles)
+
+def invalidate_principal(user_id: Optional[int] = None, username: Optional[str] = None):
+    """Drop cached principals for a user (call whenever its roles change)"""
+    if username is not None:
+        principal_cache.pop(username)
+    if user_id is not None:
+        principal_cache.pop_where(lambda p: p.user.user_id == user_id)
+
+def resolve_principal(token: str, db: Session, trust_claims: bool = False) -> Principal:
+    """Validate a bearer token and resolve its principal, raising 401 on failure"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     token_data = verify_token(token)
     if token_data is None:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.username == token_data["username"]).first()
-    if user is None:
+
+    if trust_claims:
+        principal = principal_from_claims(token_data, db)
+        if principal is not None:
+            return principal
+
+    principal = load_principal(token_data["username"], db)
+    if principal is None:
         raise credentials_exception
-    
-    return user
+
+    return principal
+
+# Plain function on purpose: FastAPI runs it in the threadpool, so a
+# principal-cache miss never blocks the event loop.
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    return resolve_principal(token, db)
+
+async def get_current_user(principal: Principal = Depends(get_current_principal)) -> User:
+    return principal.user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     # Add active check if needed
@@ -57,4 +162,42 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 def get_user_roles(user: User, db: Session) -> List[str]:
     """Get user roles from database"""
     user_roles = db.query(Role.role_name).join(UserRole).filter(UserRole.user_id == user.user_id).all()
-    return [role[0] for role in user_roles]
\ No newline at end of file
+    return [role[0] for role in user_roles]
+
+def bump_role_version(connection, user_id: int):
+    """Invalidate every role-bearing token issued to a user so far"""
+    stmt = pg_insert(RoleVersion).values(user_id=user_id, version=1, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RoleVersion.user_id],
+        set_={"version": RoleVersion.version + 1, "updated_at": datetime.utcnow()},
+    )
+    connection.execute(stmt)
+    role_version_cache.pop(user_id)
+
+# === Principal cache invalidation ===
+# Role assignments and profile changes evict the affected user as soon as
+# they are flushed, and again once the transaction commits so a concurrent
+# request cannot re-cache the pre-commit state. Role assignment changes
+# also bump the user's role version in the same transaction.
+@event.listens_for(Session, "after_flush")
+def _evict_changed_principals(session, flush_context):
+    changed = session.info.setdefault("principal_invalidations", set())
+    role_changes = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (User, UserRole)) and obj.user_id is not None:
+            changed.add(obj.user_id)
+            invalidate_principal(user_id=obj.user_id)
+            if isinstance(obj, UserRole):
+                role_changes.add(obj.user_id)
+    for user_id in role_changes:
+        bump_role_version(session.connection(), user_id)
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session):
+    for user_id in session.info.pop("principal_invalidations", ()):
+        invalidate_principal(user_id=user_id)
+        role_version_cache.pop(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session):
+    session.info.pop("principal_invalidations", None)
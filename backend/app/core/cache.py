@@ -0,0 +1,395 @@
+"""
+In-process caching primitives
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry.
+
+    Entries older than `ttl` seconds are treated as misses; once `maxsize`
+    entries are stored, the least recently used one is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def pop_where(self, predicate) -> int:
+        """Remove every entry whose value matches `predicate`"""
+        with self._lock:
+            keys = [k for k, (v, _) in self._data.items() if predicate(v)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Registry of named caches so they can be reported from one place
+_registry: Dict[str, Any] = {}
+
+
+def register_cache(cache):
+    _registry[cache.name] = cache
+    return cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return hit/miss/eviction counters for every registered cache"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+# === Two-tier tagged cache ===
+
+class InMemorySharedBackend:
+    """
+    Process-local stand-in for a shared backend (tests, single worker).
+    Same interface as RedisSharedBackend: get_many / set / incr.
+    """
+
+    blocking = False
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                value, expires_at = self._data.get(key, (None, None))
+                if expires_at is not None and expires_at <= now:
+                    del self._data[key]
+                    value = None
+                values.append(value)
+            return values
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value, _ = self._data.get(key, (0, None))
+            self._data[key] = (int(value) + 1, None)
+            return int(value) + 1
+
+
+class RedisSharedBackend:
+    """Shared tier in Redis (needs the optional `redis` package)"""
+
+    blocking = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_SHARED_BACKEND=redis requires the 'redis' package") from e
+        self.client = redis.Redis.from_url(url)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+
+class TaggedCache:
+    """
+    Two-tier cache with tag-based invalidation.
+
+    Tier 1 is a TTLCache in this process; tier 2 is an optional shared backend.
+    Every entry carries tags (e.g. "meeting:12", "objectives"). Invalidating a
+    tag drops matching local entries and increments the tag's generation in
+    the shared tier; shared entries stored under an older generation are then
+    treated as misses. Cached values are shared between callers and must not
+    be mutated.
+    """
+
+    def __init__(self, name: str, local: TTLCache, shared=None, shared_ttl: float = 300.0):
+        self.name = name
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.invalidations = 0
+        # Bumped on every invalidation so a value computed before one is not stored locally
+        self._generation = 0
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"tag:{tag}"
+
+    def lookup(self, key: str, tags: Iterable[str]) -> Tuple[bool, Any, tuple]:
+        """(hit, value, token); pass the token back to store() after a miss"""
+        entry = self.local.get(key, _MISSING)
+        if entry is not _MISSING:
+            return True, entry[0], ()
+
+        generation = self._generation
+        if self.shared is None:
+            return False, None, (generation, None)
+
+        tags = list(tags)
+        raw, *tag_gens = self.shared.get_many([self._entry_key(key)] + [self._tag_key(t) for t in tags])
+        tag_gens = tuple(int(g or 0) for g in tag_gens)
+        if raw is not None:
+            value, stored_gens = pickle.loads(raw)
+            if stored_gens == tag_gens:
+                self.shared_hits += 1
+                self.local.set(key, (value, frozenset(tags)))
+                return True, value, ()
+        self.shared_misses += 1
+        return False, None, (generation, tag_gens)
+
+    def store(self, key: str, value: Any, tags: Iterable[str], token: tuple, ttl: Optional[float] = None):
+        generation, tag_gens = token
+        tags = frozenset(tags)
+        if generation == self._generation:
+            self.local.set(key, (value, tags), ttl)
+        if self.shared is not None:
+            # Stored under the generations seen before computing: if a tag was
+            # invalidated meanwhile, the entry is already stale and never served
+            self.shared.set(self._entry_key(key), pickle.dumps((value, tag_gens)), self.shared_ttl)
+
+    def invalidate_local(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        self._generation += 1
+        self.invalidations += 1
+        return self.local.pop_where(lambda entry: not tags.isdisjoint(entry[1]))
+
+    def invalidate_shared(self, tags: Iterable[str]):
+        if self.shared is not None:
+            for tag in tags:
+                self.shared.incr(self._tag_key(tag))
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = list(tags)
+        self.invalidate_local(tags)
+        self.invalidate_shared(tags)
+
+    def clear(self):
+        self._generation += 1
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["invalidations"] = self.invalidations
+        if self.shared is not None:
+            lookups = self.shared_hits + self.shared_misses
+            stats["shared"] = {
+                "backend": type(self.shared).__name__,
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "hit_ratio": round(self.shared_hits / lookups, 4) if lookups else 0.0,
+            }
+        return stats
+
+
+def _tagged_caches() -> List[TaggedCache]:
+    return [c for c in _registry.values() if isinstance(c, TaggedCache)]
+
+
+def invalidate_tags(*tags: str):
+    """Invalidate `tags` in every registered TaggedCache (both tiers)"""
+    if tags:
+        for cache in _tagged_caches():
+            cache.invalidate(tags)
+
+
+def invalidate_local_tags(*tags: str) -> int:
+    """
+    Drop entries tagged with any of `tags` from the local tier only (the
+    writer has already bumped the shared tier); returns the entries dropped
+    """
+    if not tags:
+        return 0
+    return sum(cache.invalidate_local(tags) for cache in _tagged_caches())
+
+
+def _invalidate_shared(caches: List[TaggedCache], tags: Tuple[str, ...]):
+    for cache in caches:
+        cache.invalidate_shared(tags)
+
+
+def _log_shared_invalidation_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Shared cache invalidation failed: %s", future.exception())
+
+
+def invalidate_tags_off_loop(*tags: str):
+    """
+    invalidate_tags for code that may run on the event loop thread, such as
+    SQLAlchemy session events of an AsyncSession. The local tier is dropped
+    at once; increments in a blocking shared tier (Redis) go to the default
+    executor instead of stalling the loop. Called from a worker thread, it
+    does everything in place.
+    """
+    if not tags:
+        return
+    invalidate_local_tags(*tags)
+    shared = [cache for cache in _tagged_caches() if cache.shared is not None]
+    blocking = [cache for cache in shared if cache.shared.blocking]
+    _invalidate_shared([cache for cache in shared if not cache.shared.blocking], tags)
+    if not blocking:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _invalidate_shared(blocking, tags)
+    else:
+        loop.run_in_executor(None, _invalidate_shared, blocking, tags).add_done_callback(
+            _log_shared_invalidation_failure
+        )
+
+
+def flush_local_caches():
+    """Empty the local tier of every TaggedCache"""
+    for cache in _tagged_caches():
+        cache.clear()
+
+
+def cached(cache: TaggedCache, key: str, tags: Iterable[str] = (), ttl: Optional[float] = None):
+    """
+    Cache a service function's result in `cache`.
+
+    `key` and `tags` are format strings over the function's arguments (defaults
+    applied), e.g. key="meeting-agendas:{meeting_id}", tags=("meeting:{meeting_id}",).
+    `ttl` overrides the local tier's default TTL for these entries.
+    Works for sync and async functions; shared-tier I/O of an async function
+    runs in the threadpool when the backend is blocking.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def resolve(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            return key.format(**arguments), [t.format(**arguments) for t in tags]
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                entry_key, entry_tags = resolve(args, kwargs)
+                offload = cache.shared is not None and cache.shared.blocking
+                if offload:
+                    hit, value, token = await run_in_threadpool(cache.lookup, entry_key, entry_tags)
+                else:
+                    hit, value, token = cache.lookup(entry_key, entry_tags)
+                if hit:
+                    return value
+                value = await fn(*args, **kwargs)
+                if offload:
+                    await run_in_threadpool(cache.store, entry_key, value, entry_tags, token, ttl)
+                else:
+                    cache.store(entry_key, value, entry_tags, token, ttl)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            entry_key, entry_tags = resolve(args, kwargs)
+            hit, value, token = cache.lookup(entry_key, entry_tags)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            cache.store(entry_key, value, entry_tags, token, ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+def build_shared_backend():
+    if settings.CACHE_SHARED_BACKEND == "redis":
+        return RedisSharedBackend(settings.CACHE_REDIS_URL)
+    if settings.CACHE_SHARED_BACKEND == "memory":
+        return InMemorySharedBackend()
+    return None
+
+
+# Hot read endpoints (current meeting, objectives, agenda lists); see app.core.etag for invalidation
+response_cache = register_cache(TaggedCache(
+    "responses",
+    TTLCache(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES, ttl=settings.RESPONSE_CACHE_TTL_SECONDS, name="responses"),
+    shared=build_shared_backend(),
+    shared_ttl=settings.CACHE_SHARED_TTL_SECONDS,
+))
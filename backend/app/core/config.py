@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # Database
@@ -15,14 +15,83 @@ class Settings(BaseSettings):
     MARIADB_USER: str = "root"
     MARIADB_PASSWORD: str = "cjv671"
     
+    # HR personnel mirror (hr.personnel -> hr_personnel_mirror / users_local)
+    HR_FULLNAME_COLUMN: str = "fullname"
+    HR_DEPARTMENT_COLUMN: str = "department"
+    HR_SYNC_BATCH_SIZE: int = 1000
+    HR_SYNC_INTERVAL_MINUTES: int = 15  # 0 = only via `python -m app.commands.sync_hr`
+    HR_MIRROR_MAX_AGE_MINUTES: int = 60  # older mirror rows are not trusted at login (HR is asked); keep above the interval
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # calibrate with `python -m app.commands.calibrate_bcrypt`
+    
+    # Principal cache (resolved user + roles per token subject)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 2048
+    
+    # Signed role claims (user_id, roles, role version) in access tokens
+    JWT_EMBED_ROLES: bool = False
+    ROLE_VERSION_CACHE_TTL_SECONDS: int = 15
+    
+    # Login executors (bcrypt verification / HR lookups) and backpressure
+    LOGIN_HASH_WORKERS: int = 2
+    LOGIN_HR_WORKERS: int = 8
+    LOGIN_QUEUE_MAX: int = 32
+    LOGIN_RETRY_AFTER_SECONDS: int = 5
+    
+    # Rate limiting
+    RATE_LIMIT_ATTEMPTS: int = 5     # login attempts ...
+    RATE_LIMIT_WINDOW: int = 300     # ... per window (seconds)
+    RATE_LIMIT_RULES: Dict[str, str] = {}  # extra per-route limits, e.g. {"POST /api/v1/meetings/*": "30/60"}
+    RATE_LIMIT_BACKEND: str = "memory"     # "memory" (per worker) or "sqlite" (shared by workers on one host)
+    RATE_LIMIT_SQLITE_PATH: str = "./ratelimit.sqlite3"
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    
+    # Audit log pipeline (JSON lines, batched off the request path)
+    AUDIT_LOG_PATH: str = "logs/audit.log"
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_ROTATE_WHEN: str = "size"  # "size", or a TimedRotatingFileHandler `when` such as "midnight"
+    AUDIT_MAX_BYTES: int = 10485760  # 10MB, used when AUDIT_ROTATE_WHEN="size"
+    AUDIT_BACKUP_COUNT: int = 30
+    AUDIT_DB_ENABLED: bool = True  # also store events in the audit_events table
+    
+    # Response cache for hot read endpoints (in-process LRU + optional shared tier)
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    CACHE_SHARED_BACKEND: str = ""  # "", "memory" (single-process stand-in) or "redis"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_SHARED_TTL_SECONDS: int = 300
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"  # Postgres NOTIFY channel; "" disables the bus
+    CACHE_INVALIDATION_HEALTH_CHECK_SECONDS: int = 30
+    
+    # Routers serving responses through app.core.responses.FastJSON (orjson, no re-validation)
+    FAST_JSON_ROUTERS: List[str] = ["meetings", "meeting_admin"]
     
     # File Upload
     UPLOAD_PATH: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1048576  # 1MB per read/write when streaming uploads to disk
+    UPLOAD_SWEEP_INTERVAL_MINUTES: int = 0  # 0 = only via `python -m app.commands.sweep_uploads`; enable after migrate_uploads
+    UPLOAD_SWEEP_BATCH_SIZE: int = 1000
+    UPLOAD_STAGING_MAX_AGE_MINUTES: int = 60
+    UPLOAD_ORPHAN_GRACE_MINUTES: int = 60
+    RESUMABLE_UPLOAD_MAX_SIZE: int = 209715200  # 200MB, for uploads sent in chunks via /uploads
+    RESUMABLE_UPLOAD_EXPIRY_HOURS: int = 24  # since the last chunk; expired sessions are removed by the sweeper
+    DOWNLOAD_CHUNK_SIZE: int = 262144  # 256KB per read when the server cannot sendfile()
+    PREVIEW_WORKER_INTERVAL_SECONDS: int = 10  # idle poll; 0 = only via `python -m app.commands.generate_previews`
+    PREVIEW_BATCH_SIZE: int = 20
+    PREVIEW_MAX_ATTEMPTS: int = 3
+    PREVIEW_STALE_MINUTES: int = 10
+    TEXT_EXTRACTION_INTERVAL_SECONDS: int = 10  # idle poll; 0 = only via `python -m app.commands.extract_texts`
+    TEXT_EXTRACTION_BATCH_SIZE: int = 20
+    TEXT_EXTRACTION_WORKERS: int = 1  # child processes of each app worker for the in-app extraction
+    TEXT_EXTRACTION_MAX_CHARS: int = 1000000  # longer documents are cut (document_texts.truncated)
+    TEXT_EXTRACTION_MAX_ATTEMPTS: int = 3
+    TEXT_EXTRACTION_STALE_MINUTES: int = 10
     
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
@@ -13,6 +14,17 @@ POSTGRES_URL = (
 postgres_engine = create_engine(POSTGRES_URL, pool_pre_ping=True)
 PostgresSessionLocal = sessionmaker(bind=postgres_engine, autoflush=False, autocommit=False)
 
+# === PostgreSQL Async Connection (asyncpg) สำหรับ endpoint แบบ async def ===
+ASYNC_POSTGRES_URL = (
+    f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+    f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+)
+async_postgres_engine = create_async_engine(ASYNC_POSTGRES_URL, pool_pre_ping=True)
+# expire_on_commit=False: async sessions cannot lazy-load expired attributes
+AsyncPostgresSessionLocal = async_sessionmaker(
+    bind=async_postgres_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # === MariaDB Connection ===
 MARIADB_URL = (
     f"mysql+pymysql://{settings.MARIADB_USER}:{settings.MARIADB_PASSWORD}"
@@ -28,3 +40,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# === Dependency สำหรับ FastAPI แบบ async (ใช้กับ PostgreSQL ผ่าน asyncpg) ===
+async def get_async_db():
+    async with AsyncPostgresSessionLocal() as db:
+        yield db
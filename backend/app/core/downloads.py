@@ -0,0 +1,163 @@
+"""
+Attachment downloads: byte ranges, If-Range and zero-copy sending
+
+FileDownload serves one stored file without reading it into memory:
+- a single `Range: bytes=...` is answered with 206 and Content-Range, an
+  unsatisfiable one with 416; multi-range requests get the whole file (RFC
+  9110 lets a server ignore Range)
+- `If-Range` only honours Range when it matches the current ETag or
+  Last-Modified, so a resumed download never mixes two versions of a file
+- the body is handed to the server when it supports the ASGI
+  "http.response.zerocopysend" extension (os.sendfile from our descriptor) or,
+  for whole files, "http.response.pathsend"; otherwise it is read with
+  os.pread in DOWNLOAD_CHUNK_SIZE chunks in a worker thread, so one chunk per
+  download is held in memory
+
+Conditional GET (If-None-Match -> 304) is left to the endpoint, which knows
+the ETag before touching the disk.
+"""
+import os
+from email.utils import formatdate
+from typing import Optional, Tuple
+from urllib.parse import quote
+from anyio import to_thread
+from starlette.requests import Request
+from starlette.responses import Response
+from app.core.config import settings
+from app.core.etag import CACHE_CONTROL
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single `bytes=` range, or None when the header
+    should be ignored and the whole file sent. Raises RangeNotSatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    # ASCII digits only: str.isdigit() also accepts e.g. "²", which int() rejects
+    numeric = lambda value: value.isascii() and value.isdigit()
+    if not dash or not (numeric(first) or (not first and numeric(last))):
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and not numeric(last):
+        return None
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def content_disposition(filename: str, attachment: bool = False) -> str:
+    """Content-Disposition with an ASCII fallback and the UTF-8 name (RFC 6266 / 5987)"""
+    kind = "attachment" if attachment else "inline"
+    fallback = filename.encode("ascii", "ignore").decode().replace('"', "").replace("\\", "") or "download"
+    return f"{kind}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+class FileDownload(Response):
+    """
+    Response for the file at `path` (already stat()ed by the caller). Status,
+    Content-Range and Content-Length are decided from the request's Range and
+    If-Range headers.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        path: str,
+        stat: os.stat_result,
+        etag: str,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        attachment: bool = False,
+        cache_control: str = CACHE_CONTROL,
+    ):
+        self.path = path
+        self.size = stat.st_size
+        self.status_code = 200
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        self.body = b""
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        byte_range = None
+        range_header = request.headers.get("range")
+        if range_header and self._if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(range_header, self.size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+        self.start, end = byte_range or (0, self.size - 1)
+        self.length = 0 if self.status_code == 416 else end - self.start + 1
+
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Cache-Control": cache_control,
+            "Content-Length": str(self.length),
+        }
+        if self.status_code == 416:
+            headers["Content-Range"] = f"bytes */{self.size}"
+        elif byte_range:
+            self.status_code = 206
+            headers["Content-Range"] = f"bytes {self.start}-{end}/{self.size}"
+        if filename:
+            headers["Content-Disposition"] = content_disposition(filename, attachment)
+        self.init_headers(headers)
+        self.headers["content-type"] = self.media_type
+
+    @staticmethod
+    def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+        validator = request.headers.get("if-range")
+        if validator is None:
+            return True
+        validator = validator.strip()
+        # Strong comparison only: a weak ETag never matches
+        return validator == etag or validator == last_modified
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.pathsend" in extensions and self.length == self.size:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+
+        with open(self.path, "rb", buffering=0) as file:
+            if "http.response.zerocopysend" in extensions:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                })
+                return
+            fd = file.fileno()
+            offset, remaining = self.start, self.length
+            while remaining > 0:
+                chunk = await to_thread.run_sync(os.pread, fd, min(settings.DOWNLOAD_CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break  # truncated underneath us; Content-Length is already sent
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,157 @@
+"""
+Meeting versions, ETags and conditional GET handling
+"""
+import hashlib
+from typing import Iterable, Optional, Set
+from fastapi import Request, Response, status
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.cache import cached, invalidate_local_tags, invalidate_tags_off_loop, response_cache
+from app.core.invalidation import publish_invalidation
+from app.models.agenda import Agenda
+from app.models.file import File
+from app.models.meeting import Meeting
+from app.models.objective import AgendaObjective, AgendaObjectiveMap
+
+# Authenticated data: browsers may keep it, but must revalidate on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given parts (kind, id, version, updated_at, ...)"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+# === Meeting version bumps and cache invalidation ===
+# Every flushed change to a meeting, one of its agendas, an agenda's files or
+# objective links increments meetings.version in the same transaction, so an
+# ETag built from it changes whenever anything a client can see changes.
+# The same changes invalidate the response cache tags "meeting:{id}" and
+# "meetings" ("objectives" for objective changes): in the local tier once on
+# flush and again after commit, so a concurrent read cannot re-cache the
+# pre-commit state; in the shared tier once, after commit (entries stored
+# meanwhile carry the old tag generation). For an AsyncSession these hooks
+# run on the event loop, so blocking (Redis) increments go to a thread.
+# Other workers get the tags through a NOTIFY in the same transaction
+# (app.core.invalidation), which PostgreSQL delivers only on commit.
+# Core statements bypass this hook; callers using them must also touch the
+# owning agenda or meeting through the ORM.
+def _loaded(obj, key):
+    """Attribute value without triggering a load (None when not loaded)"""
+    return inspect(obj).dict.get(key)
+
+
+def _changed_owners(session: Session):
+    meeting_ids, agenda_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Meeting):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            if obj not in session.new and obj not in session.deleted:
+                meeting_ids.add(_loaded(obj, "meeting_id"))
+        elif isinstance(obj, Agenda):
+            # Both the old and the new meeting when an agenda is moved
+            history = inspect(obj).attrs.meeting_id.history
+            meeting_ids.update(history.added or ())
+            meeting_ids.update(history.deleted or ())
+            meeting_ids.update(history.unchanged or ())
+        elif isinstance(obj, (File, AgendaObjectiveMap)):
+            agenda_ids.add(_loaded(obj, "agenda_id"))
+    meeting_ids.discard(None)
+    agenda_ids.discard(None)
+    return meeting_ids, agenda_ids
+
+
+def bump_meeting_versions(connection, meeting_ids: Iterable[int] = (), agenda_ids: Iterable[int] = ()) -> Set[int]:
+    """Increment the version of the given meetings and of the agendas' meetings; returns the meeting ids"""
+    meeting_ids, agenda_ids = list(meeting_ids), list(agenda_ids)
+    if not meeting_ids and not agenda_ids:
+        return set()
+    meetings = Meeting.__table__
+    conditions = []
+    if meeting_ids:
+        conditions.append(meetings.c.meeting_id.in_(meeting_ids))
+    if agenda_ids:
+        conditions.append(meetings.c.meeting_id.in_(
+            select(Agenda.__table__.c.meeting_id).where(Agenda.__table__.c.agenda_id.in_(agenda_ids))
+        ))
+    stmt = update(meetings).where(or_(*conditions)).values(version=meetings.c.version + 1)
+    return set(connection.execute(stmt.returning(meetings.c.meeting_id)).scalars())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_meeting_changes(session, flush_context):
+    meeting_ids, agenda_ids = _changed_owners(session)
+    # New and deleted meetings are not bumped, but still change lists and "current"
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Meeting):
+            meeting_ids.add(_loaded(obj, "meeting_id"))
+    meeting_ids.discard(None)
+    meeting_ids |= bump_meeting_versions(session.connection(), meeting_ids, agenda_ids)
+
+    tags = {f"meeting:{meeting_id}" for meeting_id in meeting_ids}
+    if tags:
+        tags.add("meetings")
+    if any(isinstance(obj, AgendaObjective) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        tags.add("objectives")
+    if tags:
+        session.info.setdefault("cache_invalidations", set()).update(tags)
+        invalidate_local_tags(*tags)
+        publish_invalidation(session.connection(), tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    invalidate_tags_off_loop(*session.info.pop("cache_invalidations", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session):
+    session.info.pop("cache_invalidations", None)
+
+
+async def meeting_etag_state(db, meeting_id: Optional[int] = None, current: bool = False):
+    """
+    (meeting_id, version, updated_at) for one meeting, or for the current
+    active meeting. None if there is no such meeting.
+    """
+    if current:
+        return await _current_meeting_state(db)
+    return await _meeting_state(db, meeting_id)
+
+
+_STATE_COLUMNS = (Meeting.meeting_id, Meeting.version, Meeting.updated_at)
+
+
+@cached(response_cache, key="meeting-state:{meeting_id}", tags=("meeting:{meeting_id}",))
+async def _meeting_state(db, meeting_id: int):
+    row = (await db.execute(select(*_STATE_COLUMNS).where(Meeting.meeting_id == meeting_id))).first()
+    return tuple(row) if row else None
+
+
+@cached(response_cache, key="meeting-state:current", tags=("meetings",))
+async def _current_meeting_state(db):
+    stmt = select(*_STATE_COLUMNS).where(Meeting.status == "active").order_by(Meeting.meeting_date.desc()).limit(1)
+    row = (await db.execute(stmt)).first()
+    return tuple(row) if row else None
@@ -0,0 +1,119 @@
+"""
+Dedicated, bounded executors for blocking work on the login path
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+from app.core.config import settings
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing when an executor's backlog is full"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} executor is saturated")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Executor wrapper with queue-depth backpressure.
+
+    At most `max_workers` jobs run and `max_queue` more may wait; anything
+    beyond that is rejected with ExecutorSaturated so callers can answer
+    503 + Retry-After instead of piling up requests. The underlying pool is
+    created lazily on first use, and recreated if a worker process dies
+    (a broken pool would otherwise fail every later call).
+    """
+
+    def __init__(self, name: str, factory: Callable[[int], Executor], max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory(self.max_workers)
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name, settings.LOGIN_RETRY_AFTER_SECONDS)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for _ in range(2):
+                executor = self.executor
+                try:
+                    return await loop.run_in_executor(executor, fn, *args)
+                except BrokenExecutor:
+                    self._discard(executor)
+            # The job broke a fresh pool too: shed it like an overloaded executor
+            raise ExecutorSaturated(self.name, settings.LOGIN_RETRY_AFTER_SECONDS)
+        finally:
+            self._pending -= 1
+
+    def _discard(self, broken: Executor):
+        """Drop a broken pool so the next call creates a new one"""
+        with self._lock:
+            if self._executor is not broken:
+                return  # another caller already replaced it
+            self._executor = None
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# bcrypt is CPU-bound and holds the GIL, so it gets its own processes.
+# "spawn" keeps the children from inheriting the server's threads and sockets.
+password_executor = BoundedExecutor(
+    "password_hash",
+    lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn")),
+    max_workers=settings.LOGIN_HASH_WORKERS,
+    max_queue=settings.LOGIN_QUEUE_MAX,
+)
+
+# HR (MariaDB) lookups are I/O-bound: a small thread pool of their own keeps
+# a slow HR host from exhausting the default anyio threadpool.
+hr_lookup_executor = BoundedExecutor(
+    "hr_lookup",
+    lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="hr-lookup"),
+    max_workers=settings.LOGIN_HR_WORKERS,
+    max_queue=settings.LOGIN_QUEUE_MAX,
+)
+
+
+def get_executor_stats() -> dict:
+    return {e.name: e.stats() for e in (password_executor, hr_lookup_executor)}
+
+
+def shutdown_executors():
+    for executor in (password_executor, hr_lookup_executor):
+        executor.shutdown()
@@ -0,0 +1,176 @@
+"""
+Cross-worker cache invalidation over PostgreSQL LISTEN/NOTIFY
+
+Writers publish the tags they invalidate with pg_notify() inside their own
+transaction, so other workers only hear about committed changes and nothing
+is sent for a rollback. Every worker runs one InvalidationListener on a
+dedicated asyncpg connection and drops matching entries from its local cache
+tier. Notifications sent while a listener is not connected are lost, so after
+every (re)connect the listener empties the local tiers before carrying on.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Iterable, List, Optional
+from sqlalchemy import func, select
+from app.core.cache import flush_local_caches, invalidate_local_tags
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in published messages; a worker ignores its own
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# NOTIFY payloads must be shorter than 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+
+def encode_messages(tags: Iterable[str], origin: str = WORKER_ID) -> List[str]:
+    """JSON payloads {"origin", "tags"}, split so each stays under MAX_PAYLOAD_BYTES"""
+    messages, batch, size = [], [], 0
+    for tag in sorted(set(tags)):
+        tag_size = len(json.dumps(tag, ensure_ascii=False).encode("utf-8")) + 2
+        if batch and size + tag_size > MAX_PAYLOAD_BYTES:
+            messages.append(json.dumps({"origin": origin, "tags": batch}, ensure_ascii=False))
+            batch, size = [], 0
+        batch.append(tag)
+        size += tag_size
+    if batch:
+        messages.append(json.dumps({"origin": origin, "tags": batch}, ensure_ascii=False))
+    return messages
+
+
+def publish_invalidation(connection, tags: Iterable[str]):
+    """Queue a NOTIFY for `tags` in the connection's current transaction (PostgreSQL only)"""
+    channel = settings.CACHE_INVALIDATION_CHANNEL
+    if not channel or connection.dialect.name != "postgresql":
+        return
+    for payload in encode_messages(tags):
+        connection.execute(select(func.pg_notify(channel, payload)))
+
+
+class InvalidationListener:
+    """
+    Background LISTEN loop for one worker.
+
+    Reconnects with exponential backoff. A lost connection is noticed through
+    asyncpg's termination callback or, failing that, a SELECT 1 every
+    `health_check_interval` seconds.
+    """
+
+    def __init__(self, dsn: str, channel: str, health_check_interval: float = 30.0,
+                 min_backoff: float = 0.5, max_backoff: float = 30.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.health_check_interval = health_check_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self.evicted = 0
+        self.full_flushes = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+            tags = message["tags"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation message: %.200s", payload)
+            return
+        if message.get("origin") == WORKER_ID:
+            return
+        self.messages += 1
+        self.evicted += invalidate_local_tags(*tags)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self.handle(payload)
+
+    def full_flush(self):
+        flush_local_caches()
+        self.full_flushes += 1
+
+    async def _listen(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        lost = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _: lost.set())
+            await connection.add_listener(self.channel, self._on_notification)
+            # Anything published before LISTEN took effect was missed
+            self.full_flush()
+            self.connected = True
+            self.connects += 1
+            logger.info("Listening for cache invalidations on %r", self.channel)
+            while True:
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.health_check_interval)
+                    raise ConnectionError("invalidation listener connection closed")
+                except asyncio.TimeoutError:
+                    await asyncio.wait_for(connection.fetchval("SELECT 1"), timeout=self.health_check_interval)
+        finally:
+            self.connected = False
+            if not connection.is_closed():
+                connection.terminate()
+
+    async def run(self):
+        backoff = self.min_backoff
+        while True:
+            connects = self.connects
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e) or type(e).__name__
+            if self.connects > connects:
+                # The connection worked before it dropped: retry quickly
+                backoff = self.min_backoff
+            logger.warning("Cache invalidation listener disconnected (%s); retrying in %.1fs", self.last_error, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stats(self) -> dict:
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "connects": self.connects,
+            "messages": self.messages,
+            "evicted": self.evicted,
+            "full_flushes": self.full_flushes,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_listener: Optional[InvalidationListener] = None
+
+
+def listener_dsn() -> str:
+    """Plain libpq-style URL for asyncpg, from the async engine's URL"""
+    from app.core.database import async_postgres_engine
+    return async_postgres_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def run_invalidation_listener():
+    """Background task started from app startup when CACHE_INVALIDATION_CHANNEL is set"""
+    global _listener
+    _listener = InvalidationListener(
+        listener_dsn(),
+        settings.CACHE_INVALIDATION_CHANNEL,
+        health_check_interval=settings.CACHE_INVALIDATION_HEALTH_CHECK_SECONDS,
+    )
+    await _listener.run()
+
+
+def get_invalidation_stats() -> dict:
+    if _listener is None:
+        return {"channel": settings.CACHE_INVALIDATION_CHANNEL or None, "connected": False}
+    return _listener.stats()
@@ -1,65 +1,114 @@
 """
 Security middleware for FastAPI application
 """
-from fastapi import Request, HTTPException, status
+import re
+import uuid
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict
-from datetime import datetime, timedelta
-import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.ratelimit import rate_limiter
+from app.core.request_context import request_id_var
 
-# Rate limiting storage (in-memory, use Redis in production)
-login_attempts = defaultdict(list)
-RATE_LIMIT_ATTEMPTS = 5
-RATE_LIMIT_WINDOW = 300  # 5 minutes in seconds
+# Security headers
+SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "Referrer-Policy": "no-referrer",
+    "X-XSS-Protection": "1; mode=block",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Add security headers to all responses
+
+    Pure ASGI: headers are set on the http.response.start message, so the
+    body is passed through untouched and streaming responses stay streamed.
     """
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Security headers
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        
-        return response
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in SECURITY_HEADERS.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+class RateLimitMiddleware:
     """
-    Rate limiting for login attempts
+    Per-route rate limiting (see app.core.ratelimit for rules and backends)
+
+    Pure ASGI: rejected requests are answered with a 429 before the
+    application is called; allowed requests pass through unchanged.
     """
-    async def dispatch(self, request: Request, call_next):
-        # Only apply rate limiting to login endpoint
-        if request.url.path == "/api/v1/auth/login" and request.method == "POST":
-            client_ip = request.client.host
-            
-            # Clean old attempts
-            current_time = time.time()
-            login_attempts[client_ip] = [
-                attempt_time for attempt_time in login_attempts[client_ip]
-                if current_time - attempt_time < RATE_LIMIT_WINDOW
-            ]
-            
-            # Check rate limit
-            if len(login_attempts[client_ip]) >= RATE_LIMIT_ATTEMPTS:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": f"Too many login attempts. Please try again in {RATE_LIMIT_WINDOW // 60} minutes."
-                    }
-                )
-            
-            # Record this attempt
-            login_attempts[client_ip].append(current_time)
-        
-        response = await call_next(request)
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            rule = rate_limiter.match(scope["method"], scope["path"])
+            if rule is not None:
+                client = scope.get("client")
+                client_ip = client[0] if client else "unknown"
+                allowed, retry_after = await rate_limiter.hit(rule, client_ip)
+
+                if not allowed:
+                    response = JSONResponse(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        content={
+                            "detail": f"Too many requests. Please try again in {retry_after} seconds."
+                        },
+                        headers={"Retry-After": str(retry_after)}
+                    )
+                    await response(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class RequestIDMiddleware:
+    """
+    Give every request an ID (the client's X-Request-ID when it is sane,
+    otherwise a new one), expose it through app.core.request_context for
+    audit records, and echo it on the response.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
 
 def sanitize_error_message(error: Exception) -> str:
     """
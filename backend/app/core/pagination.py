@@ -0,0 +1,97 @@
+"""
+Opaque keyset (cursor) tokens for list endpoints
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Lists that stay plain JSON arrays for compatibility return the next cursor here
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def _decode_value(obj: dict):
+    if "dt" in obj:
+        return datetime.fromisoformat(obj["dt"])
+    if "d" in obj:
+        return date.fromisoformat(obj["d"])
+    return obj
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page, e.g. (event_time, event_id)"""
+    raw = json.dumps(list(values), default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _coerce(value: Any, python_type: type):
+    """`value` as the key column's Python type; ValueError/TypeError if it is not one"""
+    if python_type is datetime:
+        value = datetime.fromisoformat(value) if isinstance(value, str) else value
+        if isinstance(value, datetime):
+            return value
+    elif python_type is date:
+        value = date.fromisoformat(value) if isinstance(value, str) else value
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return value
+    elif python_type is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif isinstance(value, python_type):
+        return value
+    raise TypeError(f"expected {python_type.__name__}")
+
+
+def decode_cursor(cursor: str, size: int, types: Optional[Sequence[type]] = None) -> list:
+    """
+    Inverse of encode_cursor; any malformed token is a 400, including values
+    that do not match `types` (the key columns' Python types), which would
+    otherwise reach the database as a mistyped parameter
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw, object_hook=_decode_value)
+        if isinstance(values, list) and len(values) == size and types is not None:
+            values = [_coerce(value, python_type) for value, python_type in zip(values, types)]
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def keyset_query(stmt, columns: Sequence, cursor: Optional[str] = None, descending: bool = False):
+    """
+    Order `stmt` by `columns` (the last one must be unique, e.g. the primary
+    key) and, when a cursor is given, continue right after the row it came from.
+    Needs an index on the same columns to stay flat at any depth.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, len(columns), [c.type.python_type for c in columns]))
+        stmt = stmt.where(key < values if descending else key > values)
+    return stmt.order_by(*(c.desc() if descending else c.asc() for c in columns))
+
+
+def split_page(rows: Sequence, limit: int, key: Callable[[Any], Sequence]) -> Tuple[List, Optional[str]]:
+    """Trim rows fetched with limit + 1 to a page and build the cursor for the next one"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,12 @@
+"""
+PDFium access for the preview and text extraction workers
+
+PDFium, and so pypdfium2, is not thread-safe: two threads inside it at once
+can crash the whole process. Every pypdfium2 call, including closing
+documents, pages and bitmaps, must hold pdfium_lock, wherever it runs (the
+preview worker thread, inline text extraction). Separate processes
+(ExtractionPool) each have their own PDFium and lock.
+"""
+import threading
+
+pdfium_lock = threading.Lock()
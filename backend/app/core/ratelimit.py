@@ -0,0 +1,200 @@
+"""
+Rate limiting with fixed-memory sliding-window counters and pluggable state backends
+"""
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """`limit` requests per `window` seconds for one route (method + path)"""
+    method: str
+    path: str
+    limit: int
+    window: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method not in ("*", method):
+            return False
+        if self.path.endswith("*"):
+            return path.startswith(self.path[:-1])
+        return path == self.path
+
+    @classmethod
+    def parse(cls, route: str, spec: str) -> "RateLimitRule":
+        """Parse ("POST /api/v1/auth/login", "5/300") into a rule"""
+        method, _, path = route.strip().partition(" ")
+        limit, _, window = spec.partition("/")
+        return cls(method=method.upper(), path=path.strip(), limit=int(limit), window=int(window))
+
+
+def _slide(state: List[float], now: float, window: int) -> Tuple[float, float]:
+    """
+    Roll a [window_start, current, previous] counter forward to `now` and
+    return (estimated count in the sliding window, window_start).
+    """
+    window_start = now - (now % window)
+    if state[0] != window_start:
+        # Previous window only counts if it is the one right before this one
+        state[2] = state[1] if window_start - state[0] == window else 0
+        state[1] = 0
+        state[0] = window_start
+    weight = 1 - (now - window_start) / window
+    return state[2] * weight + state[1], window_start
+
+
+def _hit(state: List[float], now: float, limit: int, window: int) -> Tuple[bool, int]:
+    estimated, window_start = _slide(state, now, window)
+    if estimated >= limit:
+        return False, max(1, math.ceil(window_start + window - now))
+    state[1] += 1
+    return True, 0
+
+
+class InMemoryBackend:
+    """
+    Per-process state: three numbers per key, least recently used keys are
+    evicted once `max_keys` is reached. Fine for a single worker.
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._state: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        now = time.time()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = [0.0, 0, 0]
+                self._state[key] = state
+                while len(self._state) > self.max_keys:
+                    self._state.popitem(last=False)
+            else:
+                self._state.move_to_end(key)
+            return _hit(state, now, limit, window)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+class SQLiteBackend:
+    """
+    State shared by every worker on one host through a SQLite file (WAL mode).
+    Each hit is one short IMMEDIATE transaction; idle keys are pruned and the
+    table is capped at `max_keys` rows (least recently used first).
+    """
+
+    PRUNE_EVERY = 1000
+    blocking = True
+
+    def __init__(self, path: str, max_keys: int = 10000):
+        self.path = path
+        self.max_keys = max_keys
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit ("
+                " key TEXT PRIMARY KEY, window_start REAL, current INTEGER,"
+                " previous INTEGER, touched_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limit_touched ON rate_limit (touched_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, current, previous FROM rate_limit WHERE key = ?", (key,)
+            ).fetchone()
+            state = list(row) if row else [0.0, 0, 0]
+            allowed, retry_after = _hit(state, now, limit, window)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit (key, window_start, current, previous, touched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, state[0], state[1], state[2], now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            self.prune(now - 2 * window)
+        return allowed, retry_after
+
+    def prune(self, idle_before: float):
+        conn = self._connect()
+        conn.execute("DELETE FROM rate_limit WHERE touched_at < ?", (idle_before,))
+        conn.execute(
+            "DELETE FROM rate_limit WHERE key IN ("
+            " SELECT key FROM rate_limit ORDER BY touched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_keys,),
+        )
+
+
+class RateLimiter:
+    """Applies the first matching rule per request, keyed by rule + client IP"""
+
+    def __init__(self, rules: List[RateLimitRule], backend):
+        self.rules = rules
+        self.backend = backend
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def hit(self, rule: RateLimitRule, client: str) -> Tuple[bool, int]:
+        """Record a request against `rule`; returns (allowed, retry_after_seconds)"""
+        key = f"{rule.name}|{client}"
+        if self.backend.blocking:
+            return await run_in_threadpool(self.backend.hit, key, rule.limit, rule.window)
+        return self.backend.hit(key, rule.limit, rule.window)
+
+
+def build_rules() -> List[RateLimitRule]:
+    """Login rule from RATE_LIMIT_ATTEMPTS/WINDOW plus any RATE_LIMIT_RULES"""
+    rules: Dict[str, RateLimitRule] = {}
+    login = RateLimitRule("POST", "/api/v1/auth/login", settings.RATE_LIMIT_ATTEMPTS, settings.RATE_LIMIT_WINDOW)
+    rules[login.name] = login
+    for route, spec in settings.RATE_LIMIT_RULES.items():
+        rule = RateLimitRule.parse(route, spec)
+        rules[rule.name] = rule
+    return list(rules.values())
+
+
+def build_backend():
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    return InMemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(build_rules(), build_backend())
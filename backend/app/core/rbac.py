@@ -2,7 +2,7 @@ from functools import wraps
 from typing import List, Union
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
-from app.core.auth import get_current_active_user, get_user_roles
+from app.core.auth import oauth2_scheme, resolve_principal
 from app.core.database import get_db
 from app.models.user import User
 
@@ -12,15 +12,16 @@ class RoleChecker:
             allowed_roles = [allowed_roles]
         self.allowed_roles = allowed_roles
 
-    def __call__(self, user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-        user_roles = get_user_roles(user, db)
-        
-        if not any(role in user_roles for role in self.allowed_roles):
+    def __call__(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+        # Signed role claims are trusted when their role version is current;
+        # otherwise roles come with the (cached) principal from the database
+        principal = resolve_principal(token, db, trust_claims=True)
+        if not any(role in principal.roles for role in self.allowed_roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Operation requires one of these roles: {', '.join(self.allowed_roles)}"
             )
-        return user
+        return principal.user
 
 # Role-based decorators
 def require_roles(roles: Union[str, List[str]]):
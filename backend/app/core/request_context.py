@@ -0,0 +1,11 @@
+"""
+Per-request context shared with code that has no access to the Request
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+# Set by RequestIDMiddleware; copied into threadpool calls by anyio
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
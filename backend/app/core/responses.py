@@ -0,0 +1,40 @@
+"""
+Fast JSON response path, switched on per router via FAST_JSON_ROUTERS
+"""
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.core.config import settings
+
+
+class FastJSON:
+    """
+    Per-router switch between FastAPI's normal response handling and a fast path.
+
+    When enabled, endpoints return an ORJSONResponse directly, so FastAPI skips
+    validating the content against response_model a second time (response_model
+    is still used for the OpenAPI schema). Content passed in must therefore
+    already have the response_model's shape, e.g. dicts built from row tuples.
+    When disabled, the content is returned as-is and FastAPI validates and
+    encodes it as before.
+
+        respond = FastJSON("meetings")
+        router = APIRouter(default_response_class=respond.response_class)
+        ...
+        return respond(rows, response)
+    """
+
+    def __init__(self, router_name: str):
+        self.router_name = router_name
+        self.enabled = router_name in settings.FAST_JSON_ROUTERS
+        self.response_class = ORJSONResponse if self.enabled else JSONResponse
+
+    def __call__(self, content: Any, response: Optional[Response] = None, status_code: int = 200):
+        if not self.enabled:
+            return content
+        # Headers set on the injected Response (e.g. X-Next-Cursor) are only
+        # merged by FastAPI when it builds the response itself
+        headers = None
+        if response is not None:
+            headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        return ORJSONResponse(content, status_code=status_code, headers=headers)
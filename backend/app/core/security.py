@@ -2,32 +2,60 @@
 Security utilities for password hashing and verification
 """
 import hashlib
+import hmac
+import re
 from passlib.context import CryptContext
+from app.core.config import settings
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context using bcrypt; hashes below BCRYPT_ROUNDS are
+# reported by needs_rehash() and upgraded after the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+_BCRYPT_RE = re.compile(r"^\$2[abxy]?\$\d{2}\$[./A-Za-z0-9]{53}$")
+_MD5_RE = re.compile(r"^[0-9a-fA-F]{32}$")
+
+def detect_hash_scheme(hashed_password: str) -> str:
+    """
+    Identify the stored hash format: "bcrypt", "md5" or "unknown".
+    """
+    if not hashed_password:
+        return "unknown"
+    if _BCRYPT_RE.match(hashed_password):
+        return "bcrypt"
+    if _MD5_RE.match(hashed_password):
+        return "md5"
+    return "unknown"
+
+def _verify_md5(plain_password: str, hashed_password: str) -> bool:
+    md5_hash = hashlib.md5(plain_password.encode()).hexdigest()
+    return hmac.compare_digest(md5_hash, hashed_password)
+
+def _verify_bcrypt(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except Exception:
+        return False
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
     Supports both bcrypt (new) and MD5 (legacy) for backward compatibility.
+    The hash format is detected first, so legacy MD5 hashes no longer pay
+    for a failed bcrypt attempt.
     """
-    # Try bcrypt first (new secure method)
-    try:
-        if pwd_context.verify(plain_password, hashed_password):
-            return True
-    except Exception:
-        pass
-    
-    # Fallback to MD5 for legacy passwords
-    try:
-        md5_hash = hashlib.md5(plain_password.encode()).hexdigest()
-        if md5_hash == hashed_password:
-            return True
-    except Exception:
-        pass
-    
-    return False
+    scheme = detect_hash_scheme(hashed_password)
+    if scheme == "md5":
+        return _verify_md5(plain_password, hashed_password)
+    if scheme == "bcrypt":
+        return _verify_bcrypt(plain_password, hashed_password)
+
+    # Unrecognised format: keep the old try-both behaviour
+    return _verify_bcrypt(plain_password, hashed_password) or _verify_md5(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
@@ -37,15 +65,12 @@ def get_password_hash(password: str) -> str:
 
 def needs_rehash(hashed_password: str) -> bool:
     """
-    Check if a password hash needs to be rehashed (e.g., MD5 -> bcrypt).
+    Check if a password hash needs to be rehashed (e.g., MD5 -> bcrypt,
+    or bcrypt below the configured BCRYPT_ROUNDS).
     """
-    # If it's 32 characters, it's likely MD5
-    if len(hashed_password) == 32:
-        try:
-            int(hashed_password, 16)  # Check if it's hex
-            return True
-        except ValueError:
-            pass
-    
+    scheme = detect_hash_scheme(hashed_password)
+    if scheme != "bcrypt":
+        return True
+
     # Check if bcrypt hash needs update
     return pwd_context.needs_update(hashed_password)
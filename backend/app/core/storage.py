@@ -0,0 +1,93 @@
+"""
+Attachment storage
+
+The one place that knows where attachments live on disk: services ask it for
+the path of a content hash, or hand it a stored File.file_path, and never
+build paths themselves.
+
+Layout under the root (UPLOAD_PATH):
+    objects/<aa>/<bb>/<sha256>   content-addressed files, two-level hash fan-out
+    objects/<aa>/<bb>/<sha256>.<variant>.jpg   generated previews of that file
+    .staging/<request id>/...    uploads waiting for their transaction to commit
+    .partial/<upload id>         resumable uploads still being received
+Anything else directly under the root predates the layout and is moved into
+it by `python -m app.commands.migrate_uploads`.
+"""
+import os
+import re
+from typing import BinaryIO, Iterator, Optional
+from app.core.config import settings
+from app.core.uploads import STAGING_DIRNAME, UploadStaging, link_or_copy, upload_staging
+
+OBJECTS_DIRNAME = "objects"
+PARTIAL_DIRNAME = ".partial"
+_PREVIEW_NAME = re.compile(r"^([0-9a-f]{64})\.[a-z]+\.jpg$")
+
+
+class LocalStorage:
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+
+    def path_for(self, content_hash: str) -> str:
+        """File.file_path for content with this SHA-256"""
+        return os.path.join(self.root, OBJECTS_DIRNAME, content_hash[:2], content_hash[2:4], content_hash)
+
+    def preview_path(self, content_hash: str, variant: str) -> str:
+        """Generated preview `variant` of the content, stored next to it"""
+        return f"{self.path_for(content_hash)}.{variant}.jpg"
+
+    def preview_source(self, path: str) -> Optional[str]:
+        """The content a preview file was generated from (None if `path` is not a preview)"""
+        match = _PREVIEW_NAME.match(os.path.basename(path))
+        return self.path_for(match.group(1)) if match else None
+
+    def partial_path(self, upload_id: str) -> str:
+        """Where the bytes received so far for a resumable upload are kept"""
+        return os.path.join(self.root, PARTIAL_DIRNAME, upload_id)
+
+    @staticmethod
+    def in_layout(file_path: Optional[str], content_hash: Optional[str]) -> bool:
+        """True if `file_path` is the content-addressed location of `content_hash` (under any root)"""
+        if not file_path or not content_hash:
+            return False
+        suffix = "/".join((OBJECTS_DIRNAME, content_hash[:2], content_hash[2:4], content_hash))
+        return file_path.replace(os.sep, "/").endswith("/" + suffix)
+
+    def exists(self, file_path: str) -> bool:
+        return os.path.isfile(file_path)
+
+    def open(self, file_path: str) -> BinaryIO:
+        return open(file_path, "rb")
+
+    def delete(self, file_path: str) -> bool:
+        try:
+            os.unlink(file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def staging(self, session) -> UploadStaging:
+        """Staging area for `session`'s transaction; staged files appear on commit"""
+        return upload_staging(session, self.root)
+
+    def adopt(self, source_path: str, content_hash: str) -> str:
+        """
+        Make an existing file available at its content-addressed path (the
+        source is left in place) and return that path. Hard-links when the
+        filesystem allows it, otherwise copies via a temporary file.
+        """
+        target = self.path_for(content_hash)
+        if not self.exists(target):
+            link_or_copy(source_path, target)
+        return target
+
+    def walk(self) -> Iterator[str]:
+        """Every stored file (including pre-layout ones), excluding staged and partial uploads"""
+        for directory, subdirs, names in os.walk(self.root):
+            if directory == self.root:
+                subdirs[:] = [d for d in subdirs if d not in (STAGING_DIRNAME, PARTIAL_DIRNAME)]
+            for name in names:
+                yield os.path.join(directory, name)
+
+
+storage = LocalStorage(settings.UPLOAD_PATH)
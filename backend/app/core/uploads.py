@@ -0,0 +1,178 @@
+"""
+Streaming writer for uploaded files
+
+Copies an upload in fixed-size chunks, so memory use per upload does not
+depend on the file size. The size limit is checked as bytes arrive (the copy
+stops at the first chunk over the limit) and the SHA-256 is computed in the
+same pass. Data goes to a temporary file next to the destination, which is
+fsynced and renamed into place, so readers never see a partial file.
+Blocking: call it from a worker thread (run_in_threadpool) in async code.
+
+UploadStaging keeps a request's files in a private staging directory until
+the database transaction that records them commits; they are then moved to
+their final paths, or deleted if the transaction rolls back or is abandoned.
+Files already on disk (e.g. a finished resumable upload) are staged by hard
+link, or by copy where links are not possible.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Dict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Under the upload root; the sweeper (app.services.upload_sweeper_service) skips it when scanning
+STAGING_DIRNAME = ".staging"
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeded the size limit; nothing was left on disk"""
+
+    def __init__(self, filename: str, max_size: int):
+        super().__init__(f"File {filename} exceeds {max_size / (1024 * 1024):g} MB limit")
+        self.filename = filename
+        self.max_size = max_size
+
+
+@dataclass
+class WrittenFile:
+    path: str
+    size: int
+    sha256: str
+
+
+def stream_to_file(
+    source: BinaryIO,
+    dest_path: str,
+    max_size: int,
+    filename: str = "",
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+) -> WrittenFile:
+    """Copy `source` (from its start) to `dest_path`; raises UploadTooLarge past `max_size` bytes"""
+    directory = os.path.dirname(dest_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    source.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(filename or os.path.basename(dest_path), max_size)
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return WrittenFile(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+def link_or_copy(source_path: str, dest_path: str):
+    """Make `dest_path` a hard link to `source_path`, or a copy (via a temporary file) across filesystems"""
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    try:
+        os.link(source_path, dest_path)
+        return
+    except FileExistsError:
+        return
+    except OSError:
+        pass
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path) or ".", prefix=".copy-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out, open(source_path, "rb") as source:
+            shutil.copyfileobj(source, out, settings.UPLOAD_CHUNK_SIZE)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class UploadStaging:
+    """
+    Files written for one request, held in <root>/.staging/<id>/ at their
+    final path relative to `root` until promote() moves them into place.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.directory = os.path.join(root, STAGING_DIRNAME, uuid.uuid4().hex)
+        self.pending: Dict[str, str] = {}  # staged path -> final path
+
+    def stage(self, source: BinaryIO, final_path: str, max_size: int, filename: str = "") -> WrittenFile:
+        staged_path = os.path.join(self.directory, os.path.relpath(final_path, self.root))
+        written = stream_to_file(source, staged_path, max_size, filename)
+        self.pending[staged_path] = final_path
+        return WrittenFile(path=final_path, size=written.size, sha256=written.sha256)
+
+    def stage_file(self, source_path: str, final_path: str):
+        """Stage a file that is already on disk; `source_path` is left in place"""
+        staged_path = os.path.join(self.directory, os.path.relpath(final_path, self.root))
+        link_or_copy(source_path, staged_path)
+        self.pending[staged_path] = final_path
+
+    def promote(self):
+        """Move every staged file to its final path (after the DB commit)"""
+        pending, self.pending = self.pending, {}
+        for staged_path, final_path in pending.items():
+            try:
+                os.makedirs(os.path.dirname(final_path) or ".", exist_ok=True)
+                os.replace(staged_path, final_path)
+            except OSError:
+                # Left in staging; the sweeper promotes it once it sees the File row
+                logger.exception("Could not promote staged upload %s", staged_path)
+                return
+        self.discard()
+
+    def discard(self):
+        """Delete the staging directory and whatever is still in it"""
+        self.pending = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def upload_staging(session, root: str) -> UploadStaging:
+    """The staging area bound to `session`'s current transaction (created on first use)"""
+    staging = session.info.get("upload_staging")
+    if staging is None:
+        staging = session.info["upload_staging"] = UploadStaging(root)
+    return staging
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_staged_uploads(session):
+    staging = session.info.pop("upload_staging", None)
+    if staging is not None:
+        staging.promote()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged_uploads(session, transaction):
+    # Root transaction ended without a commit: rollback, or close() of an open session
+    if transaction.parent is not None:
+        return
+    staging = session.info.pop("upload_staging", None)
+    if staging is not None:
+        staging.discard()
@@ -1,12 +1,18 @@
+import asyncio
 from fastapi import FastAPI, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from app.core.audit import get_audit_stats, stop_audit_pipeline
+from app.core.cache import get_cache_stats
 from app.core.config import settings
+from app.core.executors import get_executor_stats, shutdown_executors
+from app.core.invalidation import get_invalidation_stats
 from app.core.database import get_db
-from app.core.middleware import SecurityHeadersMiddleware, RateLimitMiddleware, sanitize_error_message
+from app.core.middleware import RequestIDMiddleware, SecurityHeadersMiddleware, RateLimitMiddleware, sanitize_error_message
 from app.api.v1.api import api_router
 from app.services.auth_service import create_dummy_users
+from app.services.hr_auth_service import get_rehash_stats
 
 app = FastAPI(
     title="Meeting Management System",
@@ -25,11 +31,16 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # Specific origin only
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],  # Specific methods only
-    allow_headers=["Authorization", "Content-Type"],  # Specific headers only
+    # PATCH and HEAD (and Upload-Offset) for resumable uploads at /uploads
+    allow_methods=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"],  # Specific methods only
+    allow_headers=["Authorization", "Content-Type", "Upload-Offset"],  # Specific headers only
     max_age=3600,  # Cache preflight requests for 1 hour
+    expose_headers=["X-Request-ID", "X-Next-Cursor", "Upload-Offset"],
 )
 
+# Request ID Middleware (outermost, so every response and audit record carries the ID)
+app.add_middleware(RequestIDMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -54,6 +65,15 @@ def startup_event():
     Base.metadata.create_all(bind=postgres_engine)
     print("✅ Database tables created")
 
+    if settings.AUDIT_DB_ENABLED:
+        from datetime import datetime
+        from app.core.audit import add_audit_sink
+        from app.services.audit_store_service import AuditDatabaseSink, ensure_audit_partitions
+
+        ensure_audit_partitions(postgres_engine, [datetime.utcnow().date().replace(day=1)])
+        add_audit_sink(AuditDatabaseSink(postgres_engine))
+        print("✅ Audit events stored in audit_events")
+
     db = PostgresSessionLocal()
     try:
         create_dummy_users(db)
@@ -67,6 +87,49 @@ def startup_event():
     finally:
         db.close()
 
+# Background tasks started on startup, cancelled on shutdown
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    from app.services.hr_sync_service import run_periodic_hr_sync
+    from app.services.upload_sweeper_service import run_periodic_upload_sweep
+    from app.services.preview_service import run_periodic_preview_worker
+    from app.services.text_extraction_service import run_periodic_text_extraction
+
+    if settings.HR_SYNC_INTERVAL_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_hr_sync(settings.HR_SYNC_INTERVAL_MINUTES)))
+        print(f"✅ HR personnel sync every {settings.HR_SYNC_INTERVAL_MINUTES} min")
+    else:
+        print("⚠️ HR personnel sync disabled: run `python -m app.commands.sync_hr`, or logins use MariaDB "
+              "and password hash upgrades are skipped")
+
+    if settings.UPLOAD_SWEEP_INTERVAL_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_upload_sweep(settings.UPLOAD_SWEEP_INTERVAL_MINUTES)))
+        print(f"✅ Upload directory sweep every {settings.UPLOAD_SWEEP_INTERVAL_MINUTES} min")
+
+    if settings.PREVIEW_WORKER_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_preview_worker(settings.PREVIEW_WORKER_INTERVAL_SECONDS)))
+        print("✅ Attachment preview worker started")
+
+    if settings.TEXT_EXTRACTION_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_text_extraction(settings.TEXT_EXTRACTION_INTERVAL_SECONDS)))
+        print("✅ Attachment text extraction worker started")
+
+    if settings.CACHE_INVALIDATION_CHANNEL:
+        from app.core.invalidation import run_invalidation_listener
+
+        background_tasks.append(asyncio.create_task(run_invalidation_listener()))
+        print(f"✅ Listening for cache invalidations on '{settings.CACHE_INVALIDATION_CHANNEL}'")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    shutdown_executors()
+    # Last, so events logged during shutdown are still written
+    stop_audit_pipeline()
+
 
 @app.get("/")
 async def root():
@@ -74,4 +137,15 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": "3.5.1"}
\ No newline at end of file
+    return {"status": "healthy", "version": "3.5.1"}
+
+@app.get("/metrics")
+async def metrics():
+    """In-process cache, executor, audit pipeline and password rehash counters for this worker"""
+    return {
+        "caches": get_cache_stats(),
+        "invalidation": get_invalidation_stats(),
+        "executors": get_executor_stats(),
+        "audit": get_audit_stats(),
+        "password_rehash": get_rehash_stats(),
+    }
\ No newline at end of file
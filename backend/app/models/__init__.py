@@ -2,23 +2,37 @@
 from app.models.user import User
 from app.models.role import Role
 from app.models.user_role import UserRole
+from app.models.role_version import RoleVersion
+from app.models.hr_personnel import HrPersonnelMirror
 from app.models.meeting import Meeting
 from app.models.agenda import Agenda
 from app.models.file import File
+from app.models.file_blob import FileBlob
+from app.models.upload_session import UploadSession
+from app.models.preview_job import PreviewJob
+from app.models.document_text import DocumentText
 from app.models.report import Report
 from app.models.objective import AgendaObjective, AgendaObjectiveMap
 from .search_log import SearchLog
+from app.models.audit_event import AuditEvent
 
 # Import all models to ensure they are registered with SQLAlchemy
 __all__ = [
     "User",
     "Role",
     "UserRole",
+    "RoleVersion",
+    "HrPersonnelMirror",
     "Meeting",
     "Agenda",
     "File",
+    "FileBlob",
+    "UploadSession",
+    "PreviewJob",
+    "DocumentText",
     "Report",
     "SearchLog",
+    "AuditEvent",
     "AgendaObjective",
     "AgendaObjectiveMap"
 ]
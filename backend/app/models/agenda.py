@@ -43,6 +43,7 @@ class Agenda(Base):
     # ───────────────────────────────
     __table_args__ = (
         Index('idx_agenda_meeting_order', 'meeting_id', 'agenda_order'),
+        Index('idx_agenda_meeting_id', 'meeting_id', 'agenda_id'),  # keyset pagination
         Index('idx_agenda_meeting_status', 'meeting_id', 'status'),
         Index('idx_agenda_user', 'user_id'),
         Index('idx_agenda_type', 'agenda_type'),
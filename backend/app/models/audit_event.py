@@ -0,0 +1,53 @@
+from sqlalchemy import BigInteger, String, DateTime, Identity, Index, JSON, PrimaryKeyConstraint, DDL, event
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class AuditEvent(Base):
+    """
+    Append-only store of app.core.audit events (LOGIN_SUCCESS, MEETING_DELETE, ...).
+
+    On PostgreSQL the table is range-partitioned by month on event_time; monthly
+    partitions are created by app.services.audit_store_service and a DEFAULT
+    partition catches anything outside them. UPDATE and DELETE are rejected by
+    a trigger; old months are removed by dropping their partition.
+    """
+    __tablename__ = "audit_events"
+
+    event_id: Mapped[int] = mapped_column(BigInteger, Identity())
+    event_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    level: Mapped[str] = mapped_column(String(10), nullable=False)
+    username: Mapped[Optional[str]] = mapped_column(String(100))
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45))
+    request_id: Mapped[Optional[str]] = mapped_column(String(64))
+    details: Mapped[Optional[dict]] = mapped_column(JSON)
+
+    # The partition key has to be part of the primary key
+    __table_args__ = (
+        PrimaryKeyConstraint('event_id', 'event_time'),
+        Index('idx_audit_events_type_time', 'event_type', 'event_time', 'event_id'),
+        Index('idx_audit_events_user_time', 'username', 'event_time', 'event_id'),
+        {"postgresql_partition_by": "RANGE (event_time)"},
+    )
+
+event.listen(
+    AuditEvent.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_events_default PARTITION OF audit_events DEFAULT").execute_if(dialect="postgresql"),
+)
+event.listen(
+    AuditEvent.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION audit_events_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'audit_events is append-only';
+        END;
+        $$ LANGUAGE plpgsql;
+        CREATE TRIGGER audit_events_append_only
+            AFTER UPDATE OR DELETE ON audit_events
+            FOR EACH ROW EXECUTE FUNCTION audit_events_append_only();
+    """).execute_if(dialect="postgresql"),
+)
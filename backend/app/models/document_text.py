@@ -0,0 +1,35 @@
+from sqlalchemy import String, Integer, DateTime, Boolean, Text, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class DocumentText(Base):
+    """
+    Plain text of one stored attachment body (app.services.text_extraction_service).
+
+    Keyed by content hash like FileBlob, so every File with that content_hash
+    shares one row and deduplicated files are extracted once. The row is also
+    the extraction job: pending -> running -> done (text filled in, at most
+    TEXT_EXTRACTION_MAX_CHARS characters, `truncated` if there was more), or
+    back to pending after an error until TEXT_EXTRACTION_MAX_ATTEMPTS is
+    reached (then failed). Removed with the blob by collect_blobs.
+    """
+    __tablename__ = "document_texts"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    content: Mapped[Optional[str]] = mapped_column(Text)
+    char_count: Mapped[Optional[int]] = mapped_column(Integer)
+    truncated: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500))
+    run_after: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    extracted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_document_text_queue', 'status', 'created_at', postgresql_where=text("status IN ('pending', 'running')")),
+    )
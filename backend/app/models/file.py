@@ -15,6 +15,7 @@ class File(Base):
     file_type: Mapped[str] = mapped_column(String(20), nullable=False)
     file_size: Mapped[Optional[int]] = mapped_column(BigInteger)
     mime_type: Mapped[Optional[str]] = mapped_column(String(100))
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64))  # SHA-256 hex of the stored bytes
     uploaded_by: Mapped[int] = mapped_column(Integer, ForeignKey("users_local.user_id"), nullable=False)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     is_deleted: Mapped[bool] = mapped_column(default=False)
@@ -23,6 +24,13 @@ class File(Base):
     # Relationships
     agenda: Mapped["Agenda"] = relationship("Agenda", back_populates="files")
     uploader: Mapped["User"] = relationship("User", back_populates="uploaded_files")
+    # Extracted text, shared by every file with the same content
+    document_text: Mapped[Optional["DocumentText"]] = relationship(
+        "DocumentText",
+        primaryjoin="foreign(File.content_hash) == DocumentText.content_hash",
+        viewonly=True,
+        uselist=False,
+    )
     
     # Indexes
     __table_args__ = (
@@ -31,4 +39,5 @@ class File(Base):
         Index('idx_file_type', 'file_type'),
         Index('idx_file_uploaded_at', 'uploaded_at'),
         Index('idx_file_deleted', 'is_deleted'),
+        Index('idx_file_content_hash', 'content_hash'),
     )
\ No newline at end of file
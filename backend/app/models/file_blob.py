@@ -0,0 +1,27 @@
+from sqlalchemy import String, Integer, DateTime, BigInteger, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class FileBlob(Base):
+    """
+    One stored attachment body per distinct SHA-256 (content-addressed storage).
+
+    ref_count is the number of live (not soft-deleted) File rows pointing at
+    the blob; app.services.blob_service keeps it up to date on every flush.
+    A blob whose count reached zero is removed by garbage collection once it
+    has been unreferenced for longer than the grace period (released_at).
+    """
+    __tablename__ = "file_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    released_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        Index('idx_file_blob_released', 'released_at', postgresql_where=text("ref_count <= 0")),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class HrPersonnelMirror(Base):
+    """
+    Local copy of hr.personnel (MariaDB) used for login verification.
+    Kept up to date by app.services.hr_sync_service; row_hash is the SHA-256
+    of the source row so unchanged rows are skipped on each sync.
+    """
+    __tablename__ = "hr_personnel_mirror"
+
+    username: Mapped[str] = mapped_column(String(50), primary_key=True)
+    password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    fullname: Mapped[Optional[str]] = mapped_column(String(100))
+    department: Mapped[Optional[str]] = mapped_column(String(100))
+    row_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_hr_mirror_synced_at', 'synced_at'),
+    )
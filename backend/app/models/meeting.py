@@ -21,6 +21,8 @@ class Meeting(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
     closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # Bumped on every change to the meeting, its agendas or their files (see app.core.etag)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
     
     # Relationships
     creator: Mapped["User"] = relationship("User", foreign_keys=[created_by])
@@ -30,6 +32,7 @@ class Meeting(Base):
     # Indexes
     __table_args__ = (
         Index('idx_meeting_date_status', 'meeting_date', 'status'),
+        Index('idx_meeting_date_id', 'meeting_date', 'meeting_id'),  # keyset pagination
         Index('idx_meeting_status', 'status'),
         Index('idx_meeting_created_at', 'created_at'),
         Index('idx_meeting_created_by', 'created_by'),
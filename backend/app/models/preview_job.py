@@ -0,0 +1,31 @@
+from sqlalchemy import String, Integer, DateTime, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class PreviewJob(Base):
+    """
+    Preview generation for one stored attachment body (app.services.preview_service).
+
+    Keyed by content hash, so deduplicated files are rendered once. Status:
+    pending -> running -> done, or back to pending (retried from run_after,
+    a minute later per attempt) after an error until PREVIEW_MAX_ATTEMPTS is
+    reached (then failed). A running job whose worker died is picked up
+    again once locked_at is older than PREVIEW_STALE_MINUTES.
+    """
+    __tablename__ = "preview_jobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500))
+    run_after: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_preview_job_queue', 'status', 'created_at', postgresql_where=text("status IN ('pending', 'running')")),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Integer, ForeignKey, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.core.database import Base
+
+class RoleVersion(Base):
+    """
+    Per-user role version, bumped whenever the user's role assignments change.
+    Tokens carrying an older version are no longer trusted on the fast path.
+    """
+    __tablename__ = "role_versions"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users_local.user_id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
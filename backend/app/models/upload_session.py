@@ -0,0 +1,34 @@
+from sqlalchemy import String, Integer, ForeignKey, DateTime, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from app.core.database import Base
+
+class UploadSession(Base):
+    """
+    A resumable upload in progress (app.services.resumable_upload_service).
+
+    The bytes received so far live at storage.partial_path(upload_id);
+    `received` is how many of them are safely on disk, i.e. the offset the
+    next chunk must start at. A finished session keeps file_id until it
+    expires, so a retried finalize returns the same File.
+    """
+    __tablename__ = "upload_sessions"
+
+    upload_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # Deleting the agenda (or user) abandons its uploads; the sweeper removes the partial files
+    agenda_id: Mapped[int] = mapped_column(Integer, ForeignKey("agendas.agenda_id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users_local.user_id", ondelete="CASCADE"), nullable=False)
+    original_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    mime_type: Mapped[Optional[str]] = mapped_column(String(100))
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # expected SHA-256, checked on finalize
+    received: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    file_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("files.file_id", ondelete="SET NULL"))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_upload_session_expires', 'expires_at'),
+    )
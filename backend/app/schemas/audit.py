@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class AuditEventResponse(BaseModel):
+    event_id: int
+    event_time: datetime
+    event_type: str
+    level: str
+    username: Optional[str] = None
+    ip_address: Optional[str] = None
+    request_id: Optional[str] = None
+    details: Optional[dict] = None
+
+    class Config:
+        from_attributes = True
+
+class AuditEventPage(BaseModel):
+    items: List[AuditEventResponse]
+    next_cursor: Optional[str] = None
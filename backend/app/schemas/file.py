@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -19,10 +19,27 @@ class FileResponse(FileBase):
     file_path: str
     uploaded_by: int
     uploaded_at: datetime
+    content_hash: Optional[str] = None
     is_deleted: bool
     
     class Config:
         from_attributes = True
 
 class FileUpload(BaseModel):
-    agenda_id: int
\ No newline at end of file
+    agenda_id: int
+
+class UploadSessionCreate(BaseModel):
+    agenda_id: int
+    filename: str = Field(..., max_length=255)
+    size: int = Field(..., ge=1)
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$")
+    mime_type: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    agenda_id: int
+    filename: str
+    size: int
+    offset: int
+    expires_at: datetime
+    file_id: Optional[int] = None
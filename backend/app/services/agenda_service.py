@@ -1,18 +1,49 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Tuple
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 import os
-import uuid
 from datetime import datetime
+from app.core.cache import cached, response_cache
+from app.core.config import settings
+from app.core.pagination import keyset_query, split_page
+from app.core.storage import storage
+from app.core.uploads import UploadStaging, UploadTooLarge
+from app.services.blob_service import find_blob_query, hash_upload
+import app.services.preview_service  # noqa: F401  (new attachments queue their previews)
+import app.services.text_extraction_service  # noqa: F401  (... and their text extraction)
 from app.models.agenda import Agenda
 from app.models.file import File
-from app.models.objective import AgendaObjectiveMap
+from app.models.objective import AgendaObjective, AgendaObjectiveMap
 from app.schemas.agenda import AgendaCreate, AgendaUpdate
 
+# Loader options for every agenda read path (sync and async). Listing a meeting
+# costs three queries however many agendas it has: agendas, their files, and
+# their objective maps joined to the objectives.
+AGENDA_LOAD_OPTIONS = (
+    selectinload(Agenda.files),
+    selectinload(Agenda.objective_maps).joinedload(AgendaObjectiveMap.objective),
+)
+
+# AgendaResponse fields read straight from rows (files/objectives added per agenda)
+AGENDA_ROW_COLUMNS = (
+    Agenda.agenda_id,
+    Agenda.meeting_id,
+    Agenda.user_id,
+    Agenda.agenda_title,
+    Agenda.agenda_detail,
+    Agenda.agenda_type,
+    Agenda.agenda_order,
+    Agenda.status,
+    Agenda.created_at,
+    Agenda.updated_at,
+)
+
 class AgendaService:
-    UPLOAD_DIR = "uploads"
     ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.md', '.jpg', '.jpeg', '.png'}
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+    MAX_FILE_SIZE = settings.MAX_FILE_SIZE  # 10 MB by default
     MAX_FILES = 10
     
     @staticmethod
@@ -56,57 +87,81 @@ class AgendaService:
     
     @staticmethod
     def _save_files(db: Session, agenda_id: int, files: List[UploadFile], user_id: int):
-        """Save uploaded files"""
+        """Save uploaded files (deduplicated, staged until db.commit(); see app.services.blob_service)"""
         if len(files) > AgendaService.MAX_FILES:
             raise ValueError(f"Maximum {AgendaService.MAX_FILES} files allowed")
         
-        # Create upload directory if not exists
-        os.makedirs(AgendaService.UPLOAD_DIR, exist_ok=True)
-        
+        staging = storage.staging(db)
         for upload_file in files:
-            # Validate file extension
-            file_ext = os.path.splitext(upload_file.filename)[1].lower()
-            if file_ext not in AgendaService.ALLOWED_EXTENSIONS:
-                raise ValueError(f"File type {file_ext} not allowed")
-            
-            # Validate file size
-            upload_file.file.seek(0, 2)  # Seek to end
-            file_size = upload_file.file.tell()
-            upload_file.file.seek(0)  # Reset to beginning
-            
-            if file_size > AgendaService.MAX_FILE_SIZE:
-                raise ValueError(f"File {upload_file.filename} exceeds 10 MB limit")
-            
-            # Generate unique filename
-            unique_filename = f"{uuid.uuid4()}{file_ext}"
-            file_path = os.path.join(AgendaService.UPLOAD_DIR, unique_filename)
-            
-            # Save file
-            with open(file_path, "wb") as f:
-                f.write(upload_file.file.read())
-            
-            # Create file record
-            file_record = File(
-                agenda_id=agenda_id,
-                file_name=unique_filename,
-                original_name=upload_file.filename,
-                file_path=file_path,
-                file_type=file_ext,
-                file_size=file_size,
-                mime_type=upload_file.content_type,
-                uploaded_by=user_id
-            )
-            db.add(file_record)
+            file_ext, content_hash, file_size = AgendaService._inspect_upload(upload_file)
+            stored_path = db.execute(find_blob_query(content_hash)).scalar()
+            db.add(AgendaService._store_upload(
+                staging, agenda_id, upload_file, user_id, file_ext, content_hash, file_size, stored_path
+            ))
+    
+    @staticmethod
+    def _inspect_upload(upload_file: UploadFile) -> Tuple[str, str, int]:
+        """Validate one upload and hash it in chunks: (extension, sha256, size). Blocking."""
+        # Validate file extension
+        file_ext = os.path.splitext(upload_file.filename)[1].lower()
+        if file_ext not in AgendaService.ALLOWED_EXTENSIONS:
+            raise ValueError(f"File type {file_ext} not allowed")
+        
+        # Reject early when the parser already knows the size; otherwise the
+        # limit is enforced while hashing
+        if upload_file.size is not None and upload_file.size > AgendaService.MAX_FILE_SIZE:
+            raise UploadTooLarge(upload_file.filename, AgendaService.MAX_FILE_SIZE)
+        
+        content_hash, file_size = hash_upload(upload_file.file, AgendaService.MAX_FILE_SIZE, upload_file.filename)
+        return file_ext, content_hash, file_size
+    
+    @staticmethod
+    def _store_upload(
+        staging: UploadStaging,
+        agenda_id: int,
+        upload_file: UploadFile,
+        user_id: int,
+        file_ext: str,
+        content_hash: str,
+        file_size: int,
+        stored_path: Optional[str],
+    ) -> File:
+        """
+        File row for an inspected upload. Content that is already stored is
+        not written again; anything else is streamed into `staging` at its
+        content-addressed path. Touches no session (safe in a worker thread).
+        """
+        file_path = stored_path
+        if not (stored_path and storage.exists(stored_path)):
+            file_path = storage.path_for(content_hash)
+            written = staging.stage(upload_file.file, file_path, AgendaService.MAX_FILE_SIZE, upload_file.filename)
+            if written.sha256 != content_hash:
+                raise ValueError(f"File {upload_file.filename} changed while it was being stored")
+        
+        return File(
+            agenda_id=agenda_id,
+            file_name=content_hash,
+            original_name=upload_file.filename,
+            file_path=file_path,
+            file_type=file_ext,
+            file_size=file_size,
+            content_hash=content_hash,
+            mime_type=upload_file.content_type,
+            uploaded_by=user_id
+        )
     
     @staticmethod
     def get_agenda(db: Session, agenda_id: int) -> Agenda:
         """Get agenda by ID with files and objectives"""
-        return db.query(Agenda).filter(Agenda.agenda_id == agenda_id).first()
+        return db.query(Agenda).options(*AGENDA_LOAD_OPTIONS).filter(Agenda.agenda_id == agenda_id).first()
     
     @staticmethod
     def get_meeting_agendas(db: Session, meeting_id: int) -> List[Agenda]:
-        """Get all agendas for a meeting"""
-        return db.query(Agenda).filter(Agenda.meeting_id == meeting_id).all()
+        """Get all agendas for a meeting with files and objectives"""
+        return (
+            db.query(Agenda).options(*AGENDA_LOAD_OPTIONS)
+            .filter(Agenda.meeting_id == meeting_id).order_by(Agenda.agenda_id).all()
+        )
     
     @staticmethod
     def update_agenda(
@@ -124,6 +179,9 @@ class AgendaService:
         update_data = agenda_data.model_dump(exclude_unset=True, exclude={'objective_ids'})
         for field, value in update_data.items():
             setattr(agenda, field, value)
+        # Always touch the agenda: objective links are removed with a bulk
+        # delete, which the meeting version hook would not see on its own
+        agenda.updated_at = datetime.utcnow()
         
         # Update objectives if provided
         if agenda_data.objective_ids is not None:
@@ -157,4 +215,191 @@ class AgendaService:
         
         db.delete(agenda)
         db.commit()
-        return True
\ No newline at end of file
+        return True
+
+
+class AsyncAgendaService:
+    """Async counterpart of AgendaService for use with get_async_db"""
+
+    @staticmethod
+    def _with_relations(stmt):
+        """Eager-load files and objectives (async sessions cannot lazy-load)"""
+        return stmt.options(*AGENDA_LOAD_OPTIONS)
+
+    @staticmethod
+    async def create_agenda(
+        db: AsyncSession,
+        meeting_id: int,
+        agenda_data: AgendaCreate,
+        user_id: int,
+        files: List[UploadFile] = None
+    ) -> Agenda:
+        """Create a new agenda with optional file uploads"""
+
+        # Create agenda
+        agenda = Agenda(
+            meeting_id=meeting_id,
+            user_id=user_id,
+            agenda_title=agenda_data.agenda_title,
+            agenda_detail=agenda_data.agenda_detail,
+            agenda_type=agenda_data.agenda_type,
+            status="pending"
+        )
+        db.add(agenda)
+        await db.flush()  # Get agenda_id
+
+        # Link objectives
+        if agenda_data.objective_ids:
+            for objective_id in agenda_data.objective_ids:
+                db.add(AgendaObjectiveMap(
+                    agenda_id=agenda.agenda_id,
+                    objective_id=objective_id
+                ))
+
+        # Handle file uploads (disk I/O stays off the event loop)
+        if files:
+            await AsyncAgendaService._save_files(db, agenda.agenda_id, files, user_id)
+
+        await db.commit()
+        return await AsyncAgendaService.get_agenda(db, agenda.agenda_id)
+
+    @staticmethod
+    async def _save_files(db: AsyncSession, agenda_id: int, files: List[UploadFile], user_id: int):
+        """Save uploaded files: hashing and copying run in a worker thread, the session is only used here"""
+        if len(files) > AgendaService.MAX_FILES:
+            raise ValueError(f"Maximum {AgendaService.MAX_FILES} files allowed")
+
+        staging = storage.staging(db)
+        for upload_file in files:
+            file_ext, content_hash, file_size = await run_in_threadpool(AgendaService._inspect_upload, upload_file)
+            stored_path = (await db.execute(find_blob_query(content_hash))).scalar()
+            db.add(await run_in_threadpool(
+                AgendaService._store_upload,
+                staging, agenda_id, upload_file, user_id, file_ext, content_hash, file_size, stored_path,
+            ))
+
+    @staticmethod
+    async def get_agenda(db: AsyncSession, agenda_id: int) -> Agenda:
+        """Get agenda by ID with files and objectives"""
+        stmt = AsyncAgendaService._with_relations(
+            select(Agenda).where(Agenda.agenda_id == agenda_id)
+        ).execution_options(populate_existing=True)
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_meeting_agendas(db: AsyncSession, meeting_id: int) -> List[Agenda]:
+        """Get all agendas for a meeting with files and objectives"""
+        stmt = AsyncAgendaService._with_relations(
+            select(Agenda).where(Agenda.meeting_id == meeting_id).order_by(Agenda.agenda_id)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    @staticmethod
+    @cached(response_cache, key="meeting-agendas:{meeting_id}:{limit}:{cursor}", tags=("meeting:{meeting_id}", "objectives"))
+    async def get_meeting_agenda_rows(
+        db: AsyncSession, meeting_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        A meeting's agendas as AgendaResponse-shaped dicts built from row tuples
+        (no ORM objects): three queries for agendas, files and objectives.
+        Without `limit` every agenda is returned. Cached under the meeting's tag.
+        """
+        stmt = keyset_query(select(*AGENDA_ROW_COLUMNS).where(Agenda.meeting_id == meeting_id), (Agenda.agenda_id,), cursor)
+        next_cursor = None
+        if limit is None:
+            rows = (await db.execute(stmt)).all()
+            scope = Agenda.meeting_id == meeting_id
+        else:
+            rows, next_cursor = split_page((await db.execute(stmt.limit(limit + 1))).all(), limit, lambda r: (r.agenda_id,))
+            scope = Agenda.agenda_id.in_([row.agenda_id for row in rows])
+
+        agendas = {}
+        for row in rows:
+            agenda = dict(row._mapping)
+            agenda["files"] = []
+            agenda["objectives"] = []
+            agendas[row.agenda_id] = agenda
+        if not agendas:
+            return [], next_cursor
+
+        files = await db.execute(
+            select(File.agenda_id, File.file_id, File.original_name, File.file_path, File.uploaded_at)
+            .join(Agenda, File.agenda_id == Agenda.agenda_id)
+            .where(scope)
+            .order_by(File.file_id)
+        )
+        for agenda_id, file_id, original_name, file_path, uploaded_at in files:
+            agendas[agenda_id]["files"].append({
+                "file_id": file_id,
+                "filename": original_name,
+                "file_path": file_path,
+                "uploaded_at": uploaded_at,
+            })
+
+        objectives = await db.execute(
+            select(AgendaObjectiveMap.agenda_id, AgendaObjective.objective_id, AgendaObjective.objective_name)
+            .join(AgendaObjective, AgendaObjectiveMap.objective_id == AgendaObjective.objective_id)
+            .join(Agenda, AgendaObjectiveMap.agenda_id == Agenda.agenda_id)
+            .where(scope)
+        )
+        for agenda_id, objective_id, objective_name in objectives:
+            agendas[agenda_id]["objectives"].append({
+                "objective_id": objective_id,
+                "objective_name": objective_name,
+            })
+
+        return list(agendas.values()), next_cursor
+
+    @staticmethod
+    async def update_agenda(
+        db: AsyncSession,
+        agenda_id: int,
+        agenda_data: AgendaUpdate,
+        files: List[UploadFile] = None
+    ) -> Agenda:
+        """Update agenda"""
+        agenda = await AsyncAgendaService.get_agenda(db, agenda_id)
+        if not agenda:
+            return None
+
+        # Update basic fields
+        update_data = agenda_data.model_dump(exclude_unset=True, exclude={'objective_ids'})
+        for field, value in update_data.items():
+            setattr(agenda, field, value)
+        # Always touch the agenda: objective links are removed with a bulk
+        # delete, which the meeting version hook would not see on its own
+        agenda.updated_at = datetime.utcnow()
+
+        # Update objectives if provided
+        if agenda_data.objective_ids is not None:
+            # Remove old mappings
+            await db.execute(
+                delete(AgendaObjectiveMap).where(AgendaObjectiveMap.agenda_id == agenda_id)
+            )
+
+            # Add new mappings
+            for objective_id in agenda_data.objective_ids:
+                db.add(AgendaObjectiveMap(
+                    agenda_id=agenda_id,
+                    objective_id=objective_id
+                ))
+
+        # Add new files if provided
+        if files:
+            await AsyncAgendaService._save_files(db, agenda_id, files, agenda.user_id)
+
+        await db.commit()
+        return await AsyncAgendaService.get_agenda(db, agenda_id)
+
+    @staticmethod
+    async def delete_agenda(db: AsyncSession, agenda_id: int) -> bool:
+        """Delete agenda"""
+        agenda = await AsyncAgendaService.get_agenda(db, agenda_id)
+        if not agenda:
+            return False
+
+        await db.delete(agenda)
+        await db.commit()
+        return True
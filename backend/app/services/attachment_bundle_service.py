@@ -0,0 +1,73 @@
+"""
+All attachments of a meeting as one ZIP, one folder per agenda
+
+    01 - <agenda title>/<original file name>
+    02 - <agenda title>/...
+
+Rows are read up front (one query); the archive itself is streamed by
+app.core.zipstream.stream_zip while the files are read from storage.
+"""
+import re
+from datetime import datetime
+from typing import Iterator, List, Set
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.zipstream import ZipMember, stream_zip
+from app.models.agenda import Agenda
+from app.models.file import File
+
+_UNSAFE = re.compile(r'[\x00-\x1f<>:"/\\|?*]+')
+
+
+def _safe_name(name: str, limit: int = 100) -> str:
+    name = _UNSAFE.sub("_", name).strip(" .")
+    return name[:limit].strip(" .") or "_"
+
+
+def _unique(name: str, taken: Set[str], prefix: str = "", extension: bool = True) -> str:
+    """
+    `name`, or `name (2)`, `name (3)`... if `prefix + name` is already in the
+    archive (case-insensitive); `extension=False` for folder names
+    """
+    stem, dot, suffix = name.rpartition(".") if extension else ("", "", "")
+    if not dot:
+        stem, suffix = name, ""
+    candidate, n = name, 1
+    while (prefix + candidate).lower() in taken:
+        n += 1
+        candidate = f"{stem} ({n}){dot}{suffix}"
+    taken.add((prefix + candidate).lower())
+    return candidate
+
+
+async def get_bundle_rows(db: AsyncSession, meeting_id: int):
+    """Live attachments of the meeting, in agenda order"""
+    result = await db.execute(
+        select(
+            Agenda.agenda_id, Agenda.agenda_order, Agenda.agenda_title,
+            File.original_name, File.file_path, File.uploaded_at,
+        )
+        .join(File, File.agenda_id == Agenda.agenda_id)
+        .where(Agenda.meeting_id == meeting_id, File.is_deleted.is_(False))
+        .order_by(Agenda.agenda_order.is_(None), Agenda.agenda_order, Agenda.agenda_id, File.file_id)
+    )
+    return result.all()
+
+
+def bundle_members(rows) -> List[ZipMember]:
+    # One set for the whole archive (folders keyed as "/<folder>"): two agendas
+    # with the same order and title must not produce the same paths
+    members, taken = [], set()
+    folder, agenda_id, position = None, None, 0
+    for row in rows:
+        if row.agenda_id != agenda_id:
+            agenda_id, position = row.agenda_id, position + 1
+            folder = _unique(f"{row.agenda_order or position:02d} - {_safe_name(row.agenda_title)}", taken,
+                             extension=False, prefix="/")
+        name = _unique(_safe_name(row.original_name, limit=150), taken, prefix=f"{folder}/")
+        members.append(ZipMember(f"{folder}/{name}", row.file_path, row.uploaded_at or datetime.utcnow()))
+    return members
+
+
+def stream_bundle(rows) -> Iterator[bytes]:
+    return stream_zip(bundle_members(rows))
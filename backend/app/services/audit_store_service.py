@@ -0,0 +1,120 @@
+"""
+Persistence and search for audit events (see app.models.audit_event)
+"""
+import logging
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import postgres_engine
+from app.core.pagination import keyset_query, split_page
+from app.models.audit_event import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def ensure_audit_partitions(engine: Engine, months: Iterable[date]) -> Set[date]:
+    """
+    Create the monthly partitions for `months` (and the month after each).
+    Returns the months that now exist; a month that cannot be created (e.g. its
+    rows already landed in the DEFAULT partition) is logged and keeps using DEFAULT.
+    """
+    if engine.dialect.name != "postgresql":
+        return set(months)
+
+    created = set()
+    for month in sorted({m for month in months for m in (month, _next_month(month))}):
+        ddl = text(
+            f"CREATE TABLE IF NOT EXISTS audit_events_{month:%Y_%m} PARTITION OF audit_events "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(ddl)
+            created.add(month)
+        except Exception as e:
+            logger.error("Could not create audit partition for %s: %s", month, e)
+    return created
+
+def record_to_row(record: logging.LogRecord) -> dict:
+    """Map an app.core.audit record onto audit_events columns; other fields go to details"""
+    fields = dict(getattr(record, "fields", {}))
+    return {
+        "event_time": datetime.utcfromtimestamp(record.created),
+        "event_type": getattr(record, "event", record.getMessage())[:50],
+        "level": record.levelname,
+        "username": fields.pop("user", None),
+        "ip_address": fields.pop("ip", None),
+        "request_id": getattr(record, "request_id", None),
+        "details": fields or None,
+    }
+
+class AuditDatabaseSink:
+    """
+    Audit pipeline sink (app.core.audit.add_audit_sink) writing each batch
+    with a single multi-row INSERT. The JSON lines file stays the fallback
+    record if the database is unavailable.
+    """
+
+    # A month whose partition could not be created is tried again after this
+    # long, not on every batch (which would repeat the DDL and the error)
+    PARTITION_RETRY_SECONDS = 3600
+
+    def __init__(self, engine: Engine = None):
+        self.engine = engine or postgres_engine
+        self._months: Set[date] = set()
+        self._retry_at: Dict[date, float] = {}
+
+    def write_batch(self, records: List[logging.LogRecord]):
+        rows = [record_to_row(record) for record in records]
+        now = time.monotonic()
+        missing = {
+            month for month in {_month_start(row["event_time"]) for row in rows} - self._months
+            if self._retry_at.get(month, 0) <= now
+        }
+        if missing:
+            created = ensure_audit_partitions(self.engine, missing)
+            self._months |= created
+            for month in missing:
+                if month in created:
+                    self._retry_at.pop(month, None)
+                else:
+                    self._retry_at[month] = now + self.PARTITION_RETRY_SECONDS
+        with self.engine.begin() as conn:
+            conn.execute(insert(AuditEvent).values(rows))
+
+    def close(self):
+        pass
+
+class AuditStoreService:
+    @staticmethod
+    async def search_events(
+        db: AsyncSession,
+        event_type: Optional[str] = None,
+        username: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[AuditEvent], Optional[str]]:
+        """Newest first, keyset-paginated on (event_time, event_id)"""
+        stmt = select(AuditEvent)
+        if event_type:
+            stmt = stmt.where(AuditEvent.event_type == event_type)
+        if username:
+            stmt = stmt.where(AuditEvent.username == username)
+        if since:
+            stmt = stmt.where(AuditEvent.event_time >= since)
+        if until:
+            stmt = stmt.where(AuditEvent.event_time < until)
+
+        stmt = keyset_query(stmt, (AuditEvent.event_time, AuditEvent.event_id), cursor, descending=True)
+        events = (await db.execute(stmt.limit(limit + 1))).scalars().all()
+        return split_page(events, limit, lambda e: (e.event_time, e.event_id))
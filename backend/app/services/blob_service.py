@@ -0,0 +1,152 @@
+"""
+Content-addressed, deduplicated attachment storage
+
+Each distinct attachment body is stored once, at the path app.core.storage
+gives its SHA-256. File rows with the same content share the stored file and
+the file_blobs row that counts them.
+
+- Upload: the body is hashed first. A known hash skips the disk write and the
+  new File row just points at the existing blob; the blob row is read FOR
+  SHARE so garbage collection cannot remove it before the request commits.
+- Reference counts are maintained by a session after_flush hook: +1 for a new
+  File, -1 for a deleted or soft-deleted one (and +1 when a soft delete is
+  undone). Only rows stored in this layout are counted.
+- Garbage collection (collect_blobs, run by the upload sweeper) deletes
+  blobs that have been at zero references for UPLOAD_ORPHAN_GRACE_MINUTES,
+  row first (with the extracted text), file second, in one transaction.
+"""
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Optional, Tuple
+from sqlalchemy import case, delete, event, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.storage import LocalStorage, storage
+from app.core.uploads import UploadTooLarge
+from app.models.document_text import DocumentText
+from app.models.file import File
+from app.models.file_blob import FileBlob
+
+def hash_upload(source: BinaryIO, max_size: int, filename: str = "",
+                chunk_size: int = settings.UPLOAD_CHUNK_SIZE) -> Tuple[str, int]:
+    """(sha256, size) of `source` read in chunks; raises UploadTooLarge past `max_size`. Blocking."""
+    source.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLarge(filename, max_size)
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest(), size
+
+
+def find_blob_query(content_hash: str):
+    """Path of a stored blob, locking its row against garbage collection until commit"""
+    return select(FileBlob.file_path).where(FileBlob.content_hash == content_hash).with_for_update(read=True)
+
+
+# === Reference counting ===
+
+BlobInfo = Tuple[str, Optional[int]]  # (file_path, file_size) used when a blob row is created
+
+
+def _counted(file: File) -> bool:
+    return LocalStorage.in_layout(file.file_path, file.content_hash)
+
+
+def _reference_changes(session) -> Tuple[Counter, Dict[str, BlobInfo]]:
+    deltas: Counter = Counter()
+    added: Dict[str, BlobInfo] = {}
+    for obj in session.new:
+        if isinstance(obj, File) and _counted(obj) and not obj.is_deleted:
+            deltas[obj.content_hash] += 1
+            added[obj.content_hash] = (obj.file_path, obj.file_size)
+    for obj in session.deleted:
+        if isinstance(obj, File) and _counted(obj) and not obj.is_deleted:
+            deltas[obj.content_hash] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, File) and _counted(obj) and obj not in session.deleted:
+            history = inspect(obj).attrs.is_deleted.history
+            if history.added and history.deleted and bool(history.added[0]) != bool(history.deleted[0]):
+                deltas[obj.content_hash] += -1 if history.added[0] else 1
+                added.setdefault(obj.content_hash, (obj.file_path, obj.file_size))
+    return deltas, added
+
+
+def apply_reference_deltas(connection, deltas: Counter, added: Dict[str, BlobInfo]):
+    """
+    Add each delta to file_blobs.ref_count, creating blob rows on first
+    reference. Callers that change File rows with Core/bulk statements (which
+    skip the flush hook below) must call this themselves.
+    """
+    table = FileBlob.__table__
+    now = datetime.utcnow()
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    for content_hash, delta in sorted(deltas.items()):
+        if delta > 0:
+            file_path, file_size = added[content_hash]
+            stmt = insert(table).values(
+                content_hash=content_hash, file_path=file_path, file_size=file_size,
+                ref_count=delta, created_at=now, released_at=None,
+            )
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.content_hash],
+                set_={"ref_count": table.c.ref_count + delta, "released_at": None},
+            ))
+        elif delta < 0:
+            remaining = table.c.ref_count + delta
+            connection.execute(
+                update(table).where(table.c.content_hash == content_hash).values(
+                    ref_count=remaining,
+                    released_at=case((remaining <= 0, now), else_=table.c.released_at),
+                )
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _count_blob_references(session, flush_context):
+    deltas, added = _reference_changes(session)
+    deltas = Counter({h: d for h, d in deltas.items() if d})
+    if deltas:
+        apply_reference_deltas(session.connection(), deltas, added)
+
+
+# === Garbage collection ===
+
+def collect_blobs(db: Session, grace_minutes: int, batch_size: int) -> int:
+    """Delete blobs unreferenced for longer than `grace_minutes`; returns how many were removed"""
+    cutoff = datetime.utcnow() - timedelta(minutes=grace_minutes)
+    removed = 0
+    while True:
+        candidates = (
+            select(FileBlob.content_hash)
+            .where(FileBlob.ref_count <= 0, FileBlob.released_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        # Re-checked in the DELETE: an upload may have taken a reference meanwhile
+        deleted = db.execute(
+            delete(FileBlob)
+            .where(FileBlob.content_hash.in_(candidates), FileBlob.ref_count <= 0)
+            .returning(FileBlob.content_hash, FileBlob.file_path)
+        ).all()
+        if not deleted:
+            db.commit()
+            return removed
+        # Text of content nobody has any more is no longer searchable
+        db.execute(delete(DocumentText).where(DocumentText.content_hash.in_([row.content_hash for row in deleted])))
+        paths = [row.file_path for row in deleted]
+        # Files go before the commit: a concurrent upload of the same content
+        # waits on the deleted rows, then writes and promotes a fresh copy
+        for path in paths:
+            storage.delete(path)
+        db.commit()
+        removed += len(paths)
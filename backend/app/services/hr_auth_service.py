@@ -1,12 +1,17 @@
-from sqlalchemy import text
-from app.core.database import MariaDBSessionLocal
-from app.core.security import verify_password
+import logging
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text, update
+from app.core.database import MariaDBSessionLocal, PostgresSessionLocal
+from app.core.executors import ExecutorSaturated, hr_lookup_executor, password_executor
+from app.core.security import verify_password, get_password_hash, needs_rehash
+from app.models.hr_personnel import HrPersonnelMirror
+from app.services.hr_sync_service import fetch_mirrored_password_hash
 
-def verify_hr_user(username: str, password: str) -> bool:
-    """
-    ตรวจสอบผู้ใช้จากฐาน hr.personnel (MariaDB)
-    รองรับทั้ง MD5 (legacy) และ bcrypt (secure)
-    """
+logger = logging.getLogger(__name__)
+
+def fetch_hr_password_hash(username: str) -> Optional[str]:
+    """ดึง password hash ของผู้ใช้จาก hr.personnel (MariaDB)"""
     with MariaDBSessionLocal() as db:
         query = text("""
             SELECT password FROM hr.personnel
@@ -14,9 +19,85 @@ def verify_hr_user(username: str, password: str) -> bool:
             LIMIT 1
         """)
         result = db.execute(query, {"u": username}).fetchone()
-        
-        if not result:
-            return False
-        
-        stored_hash = result[0]
-        return verify_password(password, stored_hash)
+        return result[0] if result else None
+
+def verify_hr_user(username: str, password: str) -> bool:
+    """
+    ตรวจสอบผู้ใช้จาก hr_personnel_mirror (PostgreSQL) ก่อน
+    ถ้าไม่พบ, แถวเก่ากว่า HR_MIRROR_MAX_AGE_MINUTES หรือรหัสไม่ตรง (อาจเพิ่งเปลี่ยนใน HR)
+    จึงถาม hr.personnel (MariaDB)
+    รองรับทั้ง MD5 (legacy) และ bcrypt (secure)
+    """
+    mirrored_hash = fetch_mirrored_password_hash(username)
+    if mirrored_hash and verify_password(password, mirrored_hash):
+        return True
+
+    stored_hash = fetch_hr_password_hash(username)
+    if not stored_hash or stored_hash == mirrored_hash:
+        return False
+    return verify_password(password, stored_hash)
+
+async def match_hr_password_async(username: str, password: str) -> Optional[str]:
+    """
+    เหมือน verify_hr_user แต่แยก executor: HR lookup ใช้ thread pool ของตัวเอง
+    และ bcrypt ใช้ process pool (ไม่แย่ง GIL / threadpool หลัก)
+    คืนค่า hash ที่ตรวจผ่าน (ใช้ตัดสินว่าต้อง rehash หรือไม่) หรือ None
+    Raises ExecutorSaturated เมื่อคิวเต็ม
+    """
+    mirrored_hash = await hr_lookup_executor.run(fetch_mirrored_password_hash, username)
+    if mirrored_hash and await password_executor.run(verify_password, password, mirrored_hash):
+        return mirrored_hash
+
+    stored_hash = await hr_lookup_executor.run(fetch_hr_password_hash, username)
+    if not stored_hash or stored_hash == mirrored_hash:
+        return None
+    if await password_executor.run(verify_password, password, stored_hash):
+        return stored_hash
+    return None
+
+async def verify_hr_user_async(username: str, password: str) -> bool:
+    return await match_hr_password_async(username, password) is not None
+
+# Counters for /metrics: upgrades written, or lost because the user is not
+# mirrored (HR sync not running) or the hash executor was saturated
+rehash_stats = {"upgraded": 0, "not_mirrored": 0, "saturated": 0}
+
+def store_upgraded_hash(username: str, new_hash: str) -> bool:
+    """
+    เขียน hash ใหม่ลง hr_personnel_mirror เท่านั้น (hr.personnel เป็นของระบบ HR)
+    row_hash ยังเป็นของแถวต้นทาง จึงไม่ถูก sync ทับจนกว่า HR จะเปลี่ยนข้อมูลจริง
+    ต้องเปิด HR sync (HR_SYNC_INTERVAL_MINUTES > 0 หรือ `python -m app.commands.sync_hr`)
+    ผู้ใช้ที่ยังไม่มีแถวใน mirror จะไม่ถูกอัปเกรด (คืนค่า False)
+    """
+    with PostgresSessionLocal() as pg:
+        result = pg.execute(
+            update(HrPersonnelMirror)
+            .where(HrPersonnelMirror.username == username)
+            .values(password_hash=new_hash)
+        )
+        pg.commit()
+        return result.rowcount > 0
+
+async def upgrade_password_hash(username: str, password: str, matched_hash: str):
+    """
+    Background task หลัง login สำเร็จ: อัปเกรด MD5 / bcrypt rounds เก่า เป็น bcrypt ปัจจุบัน
+    ถ้า executor เต็มก็ข้ามไป (จะลองใหม่ใน login ครั้งถัดไป) โดยนับไว้ใน rehash_stats
+    """
+    if not needs_rehash(matched_hash):
+        return
+    try:
+        new_hash = await password_executor.run(get_password_hash, password)
+    except ExecutorSaturated:
+        rehash_stats["saturated"] += 1
+        logger.info("Password hash upgrade for %s dropped: hash executor saturated", username)
+        return
+    if await run_in_threadpool(store_upgraded_hash, username, new_hash):
+        rehash_stats["upgraded"] += 1
+    else:
+        rehash_stats["not_mirrored"] += 1
+        logger.warning(
+            "Password hash upgrade for %s skipped: not in hr_personnel_mirror (is the HR sync running?)", username
+        )
+
+def get_rehash_stats() -> dict:
+    return dict(rehash_stats)
@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import text, select, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.auth import invalidate_principal
+from app.core.config import settings
+from app.core.database import MariaDBSessionLocal, PostgresSessionLocal
+from app.models.hr_personnel import HrPersonnelMirror
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+def _row_hash(username: str, password: str, fullname: str, department: str) -> str:
+    """SHA-256 over the mirrored columns, used for change detection"""
+    payload = "\x1f".join(v or "" for v in (username, password, fullname, department))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _source_query():
+    # Column names for name/department differ between HR installs
+    return text(f"""
+        SELECT TRIM(username) AS username,
+               password,
+               {settings.HR_FULLNAME_COLUMN} AS fullname,
+               {settings.HR_DEPARTMENT_COLUMN} AS department
+        FROM hr.personnel
+        WHERE username IS NOT NULL AND TRIM(username) <> ''
+    """)
+
+def _apply_batch(pg, batch: List[dict], stats: Dict[str, int]) -> List[str]:
+    """Write only new or changed rows of one batch to the mirror and users_local"""
+    usernames = [row["username"] for row in batch]
+    known = dict(pg.execute(
+        select(HrPersonnelMirror.username, HrPersonnelMirror.row_hash)
+        .where(HrPersonnelMirror.username.in_(usernames))
+    ).all())
+
+    changed, unchanged = [], []
+    for row in batch:
+        previous = known.get(row["username"])
+        if previous == row["row_hash"]:
+            stats["unchanged"] += 1
+            unchanged.append(row["username"])
+            continue
+        stats["updated" if previous else "inserted"] += 1
+        changed.append(row)
+
+    now = datetime.utcnow()
+    # Still current in HR: keeps the row within HR_MIRROR_MAX_AGE_MINUTES
+    if unchanged:
+        pg.execute(
+            update(HrPersonnelMirror).where(HrPersonnelMirror.username.in_(unchanged)).values(synced_at=now)
+        )
+    if not changed:
+        return []
+
+    mirror_stmt = pg_insert(HrPersonnelMirror).values([{**row, "synced_at": now} for row in changed])
+    pg.execute(mirror_stmt.on_conflict_do_update(
+        index_elements=[HrPersonnelMirror.username],
+        set_={
+            "password_hash": mirror_stmt.excluded.password_hash,
+            "fullname": mirror_stmt.excluded.fullname,
+            "department": mirror_stmt.excluded.department,
+            "row_hash": mirror_stmt.excluded.row_hash,
+            "synced_at": mirror_stmt.excluded.synced_at,
+        },
+    ))
+
+    # Profile columns only; roles and email stay managed locally
+    user_stmt = pg_insert(User).values([
+        {"username": row["username"], "fullname": row["fullname"], "department": row["department"], "created_at": now}
+        for row in changed
+    ])
+    pg.execute(user_stmt.on_conflict_do_update(
+        index_elements=[User.username],
+        set_={
+            "fullname": user_stmt.excluded.fullname,
+            "department": user_stmt.excluded.department,
+            "updated_at": now,
+        },
+    ))
+    return [row["username"] for row in changed]
+
+def sync_hr_personnel(batch_size: int = None) -> Dict[str, int]:
+    """
+    Copy hr.personnel into hr_personnel_mirror and users_local.
+
+    Rows are streamed from MariaDB in batches; a row is written only when its
+    row hash differs from the mirrored one. Mirror rows whose username no
+    longer exists in HR are removed (users_local rows are kept because
+    meetings and agendas reference them).
+    """
+    batch_size = batch_size or settings.HR_SYNC_BATCH_SIZE
+    stats = {"scanned": 0, "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    seen = set()
+    touched = []
+
+    with MariaDBSessionLocal() as hr, PostgresSessionLocal() as pg:
+        result = hr.execute(_source_query(), execution_options={"stream_results": True})
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+
+            batch = {}
+            for username, password, fullname, department in rows:
+                if not password:
+                    continue
+                batch[username] = {
+                    "username": username,
+                    "password_hash": password,
+                    "fullname": fullname,
+                    "department": department,
+                    "row_hash": _row_hash(username, password, fullname, department),
+                }
+            stats["scanned"] += len(rows)
+            seen.update(batch)
+
+            touched.extend(_apply_batch(pg, list(batch.values()), stats))
+            pg.commit()
+
+        stale = set(pg.execute(select(HrPersonnelMirror.username)).scalars()) - seen
+        if stale:
+            pg.execute(delete(HrPersonnelMirror).where(HrPersonnelMirror.username.in_(stale)))
+            pg.commit()
+            stats["deleted"] = len(stale)
+
+    # Core upserts bypass the ORM session hooks, so evict explicitly
+    for username in touched:
+        invalidate_principal(username=username)
+
+    logger.info("HR personnel sync finished: %s", stats)
+    return stats
+
+def fetch_mirrored_password_hash(username: str):
+    """
+    Password hash from the local mirror, or None when the user is not mirrored
+    or the row was last confirmed by a sync more than HR_MIRROR_MAX_AGE_MINUTES
+    ago (the sync is not running, or the user has left HR)
+    """
+    max_age = timedelta(minutes=settings.HR_MIRROR_MAX_AGE_MINUTES)
+    with PostgresSessionLocal() as pg:
+        return pg.execute(
+            select(HrPersonnelMirror.password_hash).where(
+                HrPersonnelMirror.username == username,
+                HrPersonnelMirror.synced_at >= datetime.utcnow() - max_age,
+            )
+        ).scalar()
+
+async def run_periodic_hr_sync(interval_minutes: int):
+    """Background loop for HR_SYNC_INTERVAL_MINUTES > 0 (started from app startup)"""
+    while True:
+        try:
+            await asyncio.to_thread(sync_hr_personnel)
+        except Exception as e:
+            logger.error("HR personnel sync failed: %s", e)
+        await asyncio.sleep(interval_minutes * 60)
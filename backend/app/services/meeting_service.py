@@ -1,7 +1,52 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
+from typing import List, Optional, Tuple
+from app.core.cache import cached, response_cache
+from app.core.pagination import keyset_query, split_page
+from app.models.agenda import Agenda
 from app.models.meeting import Meeting
+from app.models.user import User
 from app.schemas.meeting import MeetingCreate, MeetingUpdate
+import app.services.blob_service  # noqa: F401  (File reference counts follow cascaded deletes)
+
+# Newest first; meeting_id breaks ties between meetings on the same date
+MEETING_KEYSET = (Meeting.meeting_date, Meeting.meeting_id)
+
+def meetings_page_query(stmt, limit: int, cursor: Optional[str] = None, skip: int = 0):
+    """
+    One page of meetings (fetches limit + 1 rows; pass them to split_meetings_page).
+    With a cursor the page is found through idx_meeting_date_id; skip is only
+    honoured without one, for clients still paging by offset.
+    """
+    stmt = keyset_query(stmt, MEETING_KEYSET, cursor, descending=True)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit + 1)
+
+def split_meetings_page(rows, limit: int) -> Tuple[List[Meeting], Optional[str]]:
+    return split_page(rows, limit, lambda m: (m.meeting_date, m.meeting_id))
+
+# Exactly the MeetingResponse fields, creator's name joined in
+MEETING_ROW_COLUMNS = (
+    Meeting.meeting_id,
+    Meeting.meeting_title,
+    Meeting.meeting_date,
+    Meeting.start_time,
+    Meeting.end_time,
+    Meeting.location,
+    Meeting.description,
+    Meeting.status,
+    Meeting.created_by,
+    User.fullname.label("created_by_fullname"),
+    Meeting.created_at,
+    Meeting.updated_at,
+    Meeting.closed_at,
+)
+
+def meeting_rows_query():
+    return select(*MEETING_ROW_COLUMNS).outerjoin(User, Meeting.created_by == User.user_id)
 
 class MeetingService:
     @staticmethod
@@ -30,7 +75,15 @@ class MeetingService:
     @staticmethod
     def get_meetings(db: Session, skip: int = 0, limit: int = 100) -> list[Meeting]:
         """Get all meetings with pagination"""
-        return db.query(Meeting).offset(skip).limit(limit).all()
+        return MeetingService.get_meetings_page(db, limit, skip=skip)[0]
+
+    @staticmethod
+    def get_meetings_page(
+        db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0
+    ) -> Tuple[List[Meeting], Optional[str]]:
+        """A page of meetings, newest first, and the cursor for the next page (None on the last)"""
+        rows = db.execute(meetings_page_query(select(Meeting), limit, cursor, skip)).scalars().all()
+        return split_meetings_page(rows, limit)
     
     @staticmethod
     def update_meeting(db: Session, meeting_id: int, meeting_data: MeetingUpdate) -> Meeting:
@@ -69,4 +122,114 @@ class MeetingService:
         meeting.closed_at = datetime.utcnow()
         db.commit()
         db.refresh(meeting)
-        return meeting
\ No newline at end of file
+        return meeting
+
+
+class AsyncMeetingService:
+    """Async counterpart of MeetingService for use with get_async_db"""
+
+    @staticmethod
+    async def create_meeting(db: AsyncSession, meeting_data: MeetingCreate, user_id: int) -> Meeting:
+        """Create a new meeting"""
+        meeting = Meeting(
+            meeting_title=meeting_data.meeting_title,
+            meeting_date=meeting_data.meeting_date,
+            start_time=meeting_data.start_time,
+            end_time=meeting_data.end_time,
+            location=meeting_data.location,
+            description=meeting_data.description,
+            created_by=user_id,
+            status="active"
+        )
+        db.add(meeting)
+        await db.commit()
+        await db.refresh(meeting)
+        return meeting
+
+    @staticmethod
+    async def get_meeting(db: AsyncSession, meeting_id: int) -> Meeting:
+        """Get meeting by ID"""
+        result = await db.execute(select(Meeting).where(Meeting.meeting_id == meeting_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_meetings(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Meeting]:
+        """Get all meetings with pagination"""
+        return (await AsyncMeetingService.get_meetings_page(db, limit, skip=skip))[0]
+
+    @staticmethod
+    async def get_meetings_page(
+        db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, skip: int = 0
+    ) -> Tuple[List[Meeting], Optional[str]]:
+        """A page of meetings, newest first, and the cursor for the next page (None on the last)"""
+        stmt = meetings_page_query(select(Meeting), limit, cursor, skip)
+        result = await db.execute(stmt)
+        return split_meetings_page(result.scalars().all(), limit)
+
+    @staticmethod
+    async def get_meeting_rows_page(
+        db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, skip: int = 0
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Like get_meetings_page, but as MeetingResponse-shaped dicts straight from row tuples"""
+        result = await db.execute(meetings_page_query(meeting_rows_query(), limit, cursor, skip))
+        rows, next_cursor = split_meetings_page(result.all(), limit)
+        return [dict(row._mapping) for row in rows], next_cursor
+
+    @staticmethod
+    @cached(response_cache, key="current-meeting", tags=("meetings",))
+    async def get_current_meeting_row(db: AsyncSession) -> Optional[dict]:
+        """Latest active meeting as a MeetingResponse-shaped dict (cached, tag "meetings")"""
+        stmt = meeting_rows_query().where(Meeting.status == "active").order_by(Meeting.meeting_date.desc()).limit(1)
+        row = (await db.execute(stmt)).first()
+        return dict(row._mapping) if row else None
+
+    @staticmethod
+    async def update_meeting(db: AsyncSession, meeting_id: int, meeting_data: MeetingUpdate) -> Meeting:
+        """Update meeting"""
+        meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
+        if not meeting:
+            return None
+
+        update_data = meeting_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(meeting, field, value)
+
+        await db.commit()
+        await db.refresh(meeting)
+        return meeting
+
+    @staticmethod
+    async def delete_meeting(db: AsyncSession, meeting_id: int) -> bool:
+        """Delete meeting"""
+        # ORM cascades need the child collections loaded up front; async
+        # sessions cannot lazy-load them during the delete
+        result = await db.execute(
+            select(Meeting)
+            .where(Meeting.meeting_id == meeting_id)
+            .options(
+                selectinload(Meeting.agendas).selectinload(Agenda.files),
+                selectinload(Meeting.agendas).selectinload(Agenda.objective_maps),
+                selectinload(Meeting.reports),
+            )
+            .execution_options(populate_existing=True)
+        )
+        meeting = result.scalars().first()
+        if not meeting:
+            return False
+
+        await db.delete(meeting)
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def close_meeting(db: AsyncSession, meeting_id: int) -> Meeting:
+        """Close meeting"""
+        meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
+        if not meeting:
+            return None
+
+        meeting.status = "closed"
+        meeting.closed_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(meeting)
+        return meeting
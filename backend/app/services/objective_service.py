@@ -1,4 +1,7 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache import cached, response_cache
 from app.models.objective import AgendaObjective
 from app.schemas.objective import ObjectiveCreate
 
@@ -45,4 +48,42 @@ class ObjectiveService:
                 objective = AgendaObjective(objective_name=obj_name)
                 db.add(objective)
         
-        db.commit()
\ No newline at end of file
+        db.commit()
+
+
+class AsyncObjectiveService:
+    """Async counterpart of ObjectiveService for use with get_async_db"""
+
+    @staticmethod
+    async def create_objective(db: AsyncSession, objective_data: ObjectiveCreate) -> AgendaObjective:
+        """Create a new objective"""
+        objective = AgendaObjective(
+            objective_name=objective_data.objective_name
+        )
+        db.add(objective)
+        await db.commit()
+        await db.refresh(objective)
+        return objective
+
+    @staticmethod
+    async def get_objectives(db: AsyncSession) -> list[AgendaObjective]:
+        """Get all objectives"""
+        result = await db.execute(select(AgendaObjective))
+        return list(result.scalars().all())
+
+    @staticmethod
+    @cached(response_cache, key="objectives", tags=("objectives",))
+    async def get_objective_rows(db: AsyncSession) -> list[dict]:
+        """All objectives as ObjectiveResponse-shaped dicts (cached, tag "objectives")"""
+        result = await db.execute(
+            select(AgendaObjective.objective_id, AgendaObjective.objective_name).order_by(AgendaObjective.objective_id)
+        )
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def get_objective(db: AsyncSession, objective_id: int) -> AgendaObjective:
+        """Get objective by ID"""
+        result = await db.execute(
+            select(AgendaObjective).where(AgendaObjective.objective_id == objective_id)
+        )
+        return result.scalars().first()
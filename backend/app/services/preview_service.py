@@ -0,0 +1,253 @@
+"""
+Thumbnails and web-sized previews of image and PDF attachments
+
+- Queue: a session after_flush hook adds a preview_jobs row (keyed by content
+  hash, so a deduplicated body is rendered once) for every new File of a
+  previewable type in the content-addressed layout. The row commits with the
+  File, so queued work survives restarts.
+- Workers: run_periodic_preview_worker (started with the app) claims pending
+  jobs with FOR UPDATE SKIP LOCKED, so several app workers share the queue,
+  and renders them in a worker thread, outside any request.
+- Output: one JPEG per PREVIEW_SIZES variant at storage.preview_path(hash,
+  variant), next to the original. Images are scaled down (EXIF orientation
+  applied); PDFs are rendered from their first page.
+- GET /files/{id}/preview serves them, and queues a job itself for content
+  that has none (e.g. uploads from before this pipeline) or whose preview
+  files were removed.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import and_, event, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import PostgresSessionLocal
+from app.core.pdfium import pdfium_lock
+from app.core.storage import LocalStorage, storage as default_storage
+from app.models.file import File
+from app.models.preview_job import PreviewJob
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels
+PREVIEW_SIZES = {"thumb": 256, "web": 1280}
+IMAGE_TYPES = {".jpg", ".jpeg", ".png"}
+PDF_TYPES = {".pdf"}
+PREVIEWABLE_TYPES = IMAGE_TYPES | PDF_TYPES
+# A file's content never changes, so neither do its previews
+PREVIEW_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+# === Queue ===
+
+def enqueue_previews(connection, jobs: Dict[str, str]):
+    """Queue {content_hash: file_type}; content that already has a job is left alone"""
+    if not jobs:
+        return
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    connection.execute(
+        insert(PreviewJob.__table__)
+        .values([
+            {"content_hash": content_hash, "file_type": file_type, "status": "pending", "attempts": 0, "created_at": now}
+            for content_hash, file_type in sorted(jobs.items())
+        ])
+        .on_conflict_do_nothing(index_elements=[PreviewJob.__table__.c.content_hash])
+    )
+
+
+def previewable(file_type: Optional[str], file_path: Optional[str], content_hash: Optional[str]) -> bool:
+    return (file_type or "").lower() in PREVIEWABLE_TYPES and LocalStorage.in_layout(file_path, content_hash)
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_new_file_previews(session, flush_context):
+    jobs = {
+        obj.content_hash: obj.file_type.lower()
+        for obj in session.new
+        if isinstance(obj, File) and previewable(obj.file_type, obj.file_path, obj.content_hash)
+    }
+    if jobs:
+        enqueue_previews(session.connection(), jobs)
+
+
+def requeue_preview(db: Session, content_hash: str, file_type: str) -> str:
+    """
+    Queue (again) content whose previews are missing and return the job
+    status; a pending, running or failed job is left as it is. Caller commits.
+    """
+    job = db.get(PreviewJob, content_hash, with_for_update=True)
+    if job is None:
+        enqueue_previews(db.connection(), {content_hash: file_type.lower()})
+        return "pending"
+    if job.status == "done":
+        job.status, job.attempts, job.last_error, job.run_after = "pending", 0, None, None
+    return job.status
+
+
+# === Rendering ===
+
+def _load_image(source_path: str, file_type: str, max_size: int):
+    from PIL import Image, ImageOps
+
+    if file_type in PDF_TYPES:
+        import pypdfium2
+
+        with pdfium_lock:
+            pdf = pypdfium2.PdfDocument(source_path)
+            try:
+                page = pdf[0]
+                width, height = page.get_size()
+                bitmap = page.render(scale=max_size / max(width, height, 1))
+                # A copy, so no PDFium memory is freed later outside the lock
+                image = bitmap.to_pil().copy()
+                bitmap.close()
+                page.close()
+            finally:
+                pdf.close()
+        return image
+
+    image = Image.open(source_path)
+    # JPEG can decode straight to a reduced size
+    image.draft("RGB", (max_size, max_size))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_previews(source_path: str, file_type: str, content_hash: str, storage: LocalStorage = default_storage):
+    """Write every PREVIEW_SIZES variant of the content (atomically). Blocking."""
+    image = _load_image(source_path, file_type, max(PREVIEW_SIZES.values()))
+    for variant, size in sorted(PREVIEW_SIZES.items(), key=lambda item: -item[1]):
+        preview = image.copy()
+        preview.thumbnail((size, size))
+        target = storage.preview_path(content_hash, variant)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".preview-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                preview.save(out, "JPEG", quality=82, optimize=True, progressive=True)
+            os.replace(temp_path, target)
+        except BaseException:
+            storage.delete(temp_path)
+            raise
+
+
+# === Workers ===
+
+def claim_jobs(db: Session, batch_size: int, stale_minutes: int):
+    """
+    Mark up to `batch_size` pending (or abandoned running) jobs as running;
+    returns them. An abandoned job that has used up its attempts is failed
+    instead: PDFium renders in the app process, so a PDF that crashed it
+    would crash the next worker too.
+    """
+    now = datetime.utcnow()
+    stale = and_(PreviewJob.status == "running", PreviewJob.locked_at < now - timedelta(minutes=stale_minutes))
+    db.execute(
+        update(PreviewJob)
+        .where(stale, PreviewJob.attempts >= settings.PREVIEW_MAX_ATTEMPTS)
+        .values(status="failed", locked_at=None, last_error="Worker stopped while rendering this preview")
+    )
+    jobs = db.execute(
+        select(PreviewJob)
+        .where(or_(
+            and_(PreviewJob.status == "pending", or_(PreviewJob.run_after.is_(None), PreviewJob.run_after <= now)),
+            and_(stale, PreviewJob.attempts < settings.PREVIEW_MAX_ATTEMPTS),
+        ))
+        .order_by(PreviewJob.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for job in jobs:
+        job.status, job.locked_at, job.attempts = "running", now, job.attempts + 1
+    db.commit()
+    return jobs
+
+
+def _finish(db: Session, job: PreviewJob, error: Optional[Exception]):
+    if error is None:
+        job.status, job.last_error = "done", None
+    else:
+        job.status = "failed" if job.attempts >= settings.PREVIEW_MAX_ATTEMPTS else "pending"
+        # e.g. the file is claimed between the upload's commit and its promotion
+        job.run_after = datetime.utcnow() + timedelta(minutes=job.attempts)
+        job.last_error = (str(error) or type(error).__name__)[:500]
+    job.locked_at = None
+    db.commit()
+
+
+def process_jobs(db: Session, jobs: Iterable[PreviewJob], storage: LocalStorage, stats: Dict[str, int]):
+    for job in jobs:
+        source_path = storage.path_for(job.content_hash)
+        try:
+            if not storage.exists(source_path):
+                raise FileNotFoundError(f"{source_path} is missing")
+            render_previews(source_path, job.file_type, job.content_hash, storage)
+        except Exception as e:
+            logger.warning("Preview for %s failed (attempt %s): %s", job.content_hash, job.attempts, e)
+            _finish(db, job, e)
+            stats["failed"] += 1
+        else:
+            _finish(db, job, None)
+            stats["done"] += 1
+
+
+def process_pending_previews(storage: LocalStorage = default_storage, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Claim and render one batch of jobs; returns counters"""
+    stats = {"claimed": 0, "done": 0, "failed": 0}
+    db = PostgresSessionLocal()
+    try:
+        jobs = claim_jobs(db, batch_size or settings.PREVIEW_BATCH_SIZE, settings.PREVIEW_STALE_MINUTES)
+        stats["claimed"] = len(jobs)
+        process_jobs(db, jobs, storage, stats)
+    finally:
+        db.close()
+    return stats
+
+
+def backfill_previews(batch_size: int = 1000) -> int:
+    """Queue every live, previewable file that has no job yet; returns how many contents were queued"""
+    queued, last_id = 0, 0
+    db = PostgresSessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(File.file_id, File.content_hash, File.file_type, File.file_path)
+                .outerjoin(PreviewJob, PreviewJob.content_hash == File.content_hash)
+                .where(File.file_id > last_id, File.is_deleted.is_(False), PreviewJob.content_hash.is_(None))
+                .order_by(File.file_id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return queued
+            jobs = {
+                row.content_hash: row.file_type.lower() for row in rows
+                if previewable(row.file_type, row.file_path, row.content_hash)
+            }
+            enqueue_previews(db.connection(), jobs)
+            db.commit()
+            queued += len(jobs)
+            last_id = rows[-1].file_id
+    finally:
+        db.close()
+
+
+async def run_periodic_preview_worker(interval_seconds: int):
+    """Background loop for PREVIEW_WORKER_INTERVAL_SECONDS > 0: drains the queue, then polls"""
+    while True:
+        try:
+            stats = await asyncio.to_thread(process_pending_previews)
+        except Exception as e:
+            logger.error("Preview worker failed: %s", e)
+            stats = None
+        if not stats or not stats["claimed"]:
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,260 @@
+"""
+Resumable uploads: large attachments sent in chunks over several requests
+
+1. create_session: the client announces agenda, file name, size and SHA-256;
+   an empty partial file is created at storage.partial_path(upload_id).
+2. write_chunk: bytes are written at the offset the client names, which must
+   be the session's `received` count (ChunkOffsetMismatch carries the offset
+   to resume from). Bytes that arrived before a dropped connection are kept.
+   No database connection is held while the body streams in; `received` is
+   advanced with a compare-and-set UPDATE, so of two racing writers for one
+   session only the first is counted.
+3. finalize: the complete file is hashed and checked against the announced
+   SHA-256, then attached to the agenda as a File through the same
+   content-addressed, staged-until-commit storage as multipart uploads. A
+   finalized session remembers its file_id, so a retried finalize (response
+   lost on the way back) returns the same File.
+
+Sessions expire RESUMABLE_UPLOAD_EXPIRY_HOURS after their last chunk; the
+upload sweeper removes them and their partial files (collect_upload_sessions).
+"""
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+from app.core.config import settings
+from app.core.storage import PARTIAL_DIRNAME, LocalStorage, storage
+from app.core.uploads import UploadTooLarge
+from app.models.agenda import Agenda
+from app.models.file import File
+from app.models.upload_session import UploadSession
+from app.schemas.file import UploadSessionCreate
+from app.services.agenda_service import AgendaService
+from app.services.blob_service import find_blob_query, hash_upload
+
+
+class ChunkOffsetMismatch(ValueError):
+    """The chunk does not start where the upload left off"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload is at offset {expected}")
+        self.expected = expected
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+def _expiry() -> datetime:
+    return datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS)
+
+
+def _create_partial(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "xb"):
+        pass
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view, offset = view[written:], offset + written
+
+
+def _hash_file(path: str, max_size: int):
+    with open(path, "rb") as source:
+        return hash_upload(source, max_size)
+
+
+class ResumableUploadService:
+    @staticmethod
+    async def create_session(db: AsyncSession, data: UploadSessionCreate, user_id: int) -> Optional[UploadSession]:
+        """New upload session for an existing agenda (None if the agenda does not exist)"""
+        file_ext = os.path.splitext(data.filename)[1].lower()
+        if file_ext not in AgendaService.ALLOWED_EXTENSIONS:
+            raise ValueError(f"File type {file_ext} not allowed")
+        if data.size > settings.RESUMABLE_UPLOAD_MAX_SIZE:
+            raise UploadTooLarge(data.filename, settings.RESUMABLE_UPLOAD_MAX_SIZE)
+        if await db.get(Agenda, data.agenda_id) is None:
+            return None
+
+        upload_session = UploadSession(
+            upload_id=uuid.uuid4().hex,
+            agenda_id=data.agenda_id,
+            user_id=user_id,
+            original_name=data.filename,
+            file_type=file_ext,
+            mime_type=data.mime_type,
+            total_size=data.size,
+            content_hash=data.sha256.lower(),
+            received=0,
+            expires_at=_expiry(),
+        )
+        # A partial file left by a failed commit is removed by the sweeper
+        await run_in_threadpool(_create_partial, storage.partial_path(upload_session.upload_id))
+        db.add(upload_session)
+        await db.commit()
+        return upload_session
+
+    @staticmethod
+    async def get_session(db: AsyncSession, upload_id: str, user_id: int, for_update: bool = False) -> Optional[UploadSession]:
+        """The user's unexpired session, fresh from the database"""
+        stmt = (
+            select(UploadSession)
+            .where(
+                UploadSession.upload_id == upload_id,
+                UploadSession.user_id == user_id,
+                UploadSession.expires_at > datetime.utcnow(),
+            )
+            .execution_options(populate_existing=True)
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        return (await db.execute(stmt)).scalars().first()
+
+    @staticmethod
+    async def write_chunk(
+        db: AsyncSession, upload_session: UploadSession, offset: int, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """Write the streamed chunk at `offset`; returns the new offset"""
+        if upload_session.file_id is not None:
+            raise ValueError("Upload is already finalized")
+        if offset != upload_session.received:
+            raise ChunkOffsetMismatch(upload_session.received)
+        upload_id, total = upload_session.upload_id, upload_session.total_size
+        # Release the connection while a possibly slow client sends the body
+        await db.commit()
+
+        written = await ResumableUploadService._receive(
+            storage.partial_path(upload_id), offset, total, chunks
+        )
+        result = await db.execute(
+            update(UploadSession)
+            .where(UploadSession.upload_id == upload_id, UploadSession.received == offset)
+            .values(received=offset + written, expires_at=_expiry())
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            current = await db.get(UploadSession, upload_id, populate_existing=True)
+            raise ChunkOffsetMismatch(current.received if current else 0)
+        return offset + written
+
+    @staticmethod
+    async def _receive(path: str, offset: int, total: int, chunks: AsyncIterator[bytes]) -> int:
+        """Write arriving bytes at `offset` in UPLOAD_CHUNK_SIZE blocks; returns how many are on disk (fsynced)"""
+        fd = await run_in_threadpool(os.open, path, os.O_WRONLY)
+        written, buffer = 0, bytearray()
+        try:
+            try:
+                async for piece in chunks:
+                    if offset + written + len(buffer) + len(piece) > total:
+                        raise ValueError(f"Chunk runs past the announced size of {total} bytes")
+                    buffer += piece
+                    if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                        await run_in_threadpool(_pwrite_all, fd, bytes(buffer), offset + written)
+                        written += len(buffer)
+                        buffer.clear()
+            except ClientDisconnect:
+                pass  # Keep what arrived; the client asks for the offset and resumes from there
+            if buffer:
+                await run_in_threadpool(_pwrite_all, fd, bytes(buffer), offset + written)
+                written += len(buffer)
+            await run_in_threadpool(os.fsync, fd)
+        finally:
+            os.close(fd)
+        return written
+
+    @staticmethod
+    async def finalize(db: AsyncSession, upload_id: str, user_id: int) -> Optional[File]:
+        """Verify the checksum and attach the upload to its agenda (None if there is no such session)"""
+        upload_session = await ResumableUploadService.get_session(db, upload_id, user_id, for_update=True)
+        if upload_session is None:
+            return None
+        if upload_session.file_id is not None:
+            return await db.get(File, upload_session.file_id)
+        if upload_session.received != upload_session.total_size:
+            raise ValueError(
+                f"Upload is incomplete: {upload_session.received} of {upload_session.total_size} bytes received"
+            )
+
+        partial_path = storage.partial_path(upload_id)
+        content_hash, file_size = await run_in_threadpool(_hash_file, partial_path, upload_session.total_size)
+        if content_hash != upload_session.content_hash:
+            # Start over: the bytes on disk cannot be trusted past any offset
+            upload_session.received = 0
+            await db.commit()
+            await run_in_threadpool(os.truncate, partial_path, 0)
+            raise ChecksumMismatch(f"Checksum mismatch for {upload_session.original_name}; upload it again")
+
+        stored_path = (await db.execute(find_blob_query(content_hash))).scalar()
+        file_path = stored_path
+        if not (stored_path and storage.exists(stored_path)):
+            file_path = storage.path_for(content_hash)
+            await run_in_threadpool(storage.staging(db).stage_file, partial_path, file_path)
+
+        file = File(
+            agenda_id=upload_session.agenda_id,
+            file_name=content_hash,
+            original_name=upload_session.original_name,
+            file_path=file_path,
+            file_type=upload_session.file_type,
+            file_size=file_size,
+            content_hash=content_hash,
+            mime_type=upload_session.mime_type,
+            uploaded_by=user_id,
+        )
+        db.add(file)
+        await db.flush()
+        upload_session.file_id = file.file_id
+        await db.commit()
+        await run_in_threadpool(storage.delete, partial_path)
+        return file
+
+    @staticmethod
+    async def cancel(db: AsyncSession, upload_session: UploadSession):
+        upload_id = upload_session.upload_id
+        await db.delete(upload_session)
+        await db.commit()
+        await run_in_threadpool(storage.delete, storage.partial_path(upload_id))
+
+
+# === Garbage collection ===
+
+def collect_upload_sessions(db: Session, storage: LocalStorage, grace_minutes: int, batch_size: int) -> int:
+    """
+    Delete expired sessions and their partial files, then partial files that
+    have no session (older than `grace_minutes`); returns the number of
+    expired sessions removed.
+    """
+    removed = 0
+    while True:
+        expired = select(UploadSession.upload_id).where(UploadSession.expires_at < datetime.utcnow()).limit(batch_size)
+        upload_ids = db.execute(
+            delete(UploadSession).where(UploadSession.upload_id.in_(expired)).returning(UploadSession.upload_id)
+        ).scalars().all()
+        db.commit()
+        for upload_id in upload_ids:
+            storage.delete(storage.partial_path(upload_id))
+        removed += len(upload_ids)
+        if len(upload_ids) < batch_size:
+            break
+
+    partial_root = os.path.join(storage.root, PARTIAL_DIRNAME)
+    if os.path.isdir(partial_root):
+        cutoff = time.time() - grace_minutes * 60
+        names = [entry.name for entry in os.scandir(partial_root) if entry.stat().st_mtime < cutoff]
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            known = set(db.execute(select(UploadSession.upload_id).where(UploadSession.upload_id.in_(batch))).scalars())
+            for name in batch:
+                if name not in known:
+                    storage.delete(os.path.join(partial_root, name))
+        db.commit()
+    return removed
@@ -0,0 +1,384 @@
+"""
+Plain text of PDF, Word (.docx) and Markdown attachments, for document search
+
+- Queue: a session after_flush hook adds a document_texts row (keyed by
+  content hash, so a deduplicated body is extracted once) for every new File
+  of an extractable type in the content-addressed layout. The row commits
+  with the File, so queued work survives restarts; it holds the text once
+  extracted.
+- Workers: run_periodic_text_extraction (started with the app) claims pending
+  rows with FOR UPDATE SKIP LOCKED and extracts them in a small pool of
+  child processes (ExtractionPool), outside any request;
+  `python -m app.commands.extract_texts` works through a backlog the same
+  way with more processes. The database work stays in the parent; a
+  document that crashes its process is failed on its own and the pool
+  restarted.
+- Text is capped at TEXT_EXTRACTION_MAX_CHARS characters; extraction stops
+  reading once the cap is reached, so a huge document costs no more than a
+  long one.
+"""
+import asyncio
+import logging
+import multiprocessing
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+from sqlalchemy import and_, event, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import PostgresSessionLocal
+from app.core.pdfium import pdfium_lock
+from app.core.storage import LocalStorage, storage as default_storage
+from app.models.document_text import DocumentText
+from app.models.file import File
+
+logger = logging.getLogger(__name__)
+
+EXTRACTABLE_TYPES = {".pdf", ".docx", ".md"}
+
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+# === Queue ===
+
+def enqueue_texts(connection, jobs: Dict[str, str]):
+    """Queue {content_hash: file_type}; content that already has a row is left alone"""
+    if not jobs:
+        return
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    connection.execute(
+        insert(DocumentText.__table__)
+        .values([
+            {"content_hash": content_hash, "file_type": file_type, "status": "pending", "attempts": 0,
+             "truncated": False, "created_at": now}
+            for content_hash, file_type in sorted(jobs.items())
+        ])
+        .on_conflict_do_nothing(index_elements=[DocumentText.__table__.c.content_hash])
+    )
+
+
+def extractable(file_type: Optional[str], file_path: Optional[str], content_hash: Optional[str]) -> bool:
+    return (file_type or "").lower() in EXTRACTABLE_TYPES and LocalStorage.in_layout(file_path, content_hash)
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_new_file_texts(session, flush_context):
+    jobs = {
+        obj.content_hash: obj.file_type.lower()
+        for obj in session.new
+        if isinstance(obj, File) and extractable(obj.file_type, obj.file_path, obj.content_hash)
+    }
+    if jobs:
+        enqueue_texts(session.connection(), jobs)
+
+
+# === Extraction ===
+
+def _pdf_parts(path: str, max_chars: int) -> List[str]:
+    import pypdfium2
+
+    parts, length = [], 0
+    with pdfium_lock:
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range() + "\n\n")
+                textpage.close()
+                page.close()
+                length += len(parts[-1])
+                if length > max_chars:
+                    break
+        finally:
+            pdf.close()
+    return parts
+
+
+def _docx_parts(path: str, max_chars: int) -> List[str]:
+    parts, length = [], 0
+    with zipfile.ZipFile(path) as package, package.open("word/document.xml") as document:
+        for _, element in ElementTree.iterparse(document):
+            if element.tag == _WORD + "t":
+                part = element.text or ""
+            elif element.tag == _WORD + "tab":
+                part = "\t"
+            elif element.tag in (_WORD + "br", _WORD + "cr", _WORD + "p"):
+                part = "\n"
+            else:
+                continue
+            parts.append(part)
+            length += len(part)
+            if element.tag == _WORD + "p":
+                # The paragraph's runs are read; drop them to keep memory flat
+                element.clear()
+                if length > max_chars:
+                    break
+    return parts
+
+
+def _markdown_parts(path: str, max_chars: int) -> List[str]:
+    # UTF-8 needs at most 4 bytes per character, so this is always enough
+    with open(path, "rb") as source:
+        data = source.read(max_chars * 4 + 4)
+    return [data.decode("utf-8-sig", errors="replace")]
+
+
+_EXTRACTORS = {".pdf": _pdf_parts, ".docx": _docx_parts, ".md": _markdown_parts}
+
+
+def extract_text(path: str, file_type: str, max_chars: int) -> Tuple[str, bool]:
+    """
+    Plain text of the file and whether it was cut at `max_chars`. Blocking
+    and database-free, so it can run in another process.
+    """
+    text = "".join(_EXTRACTORS[file_type.lower()](path, max_chars))
+    # PostgreSQL text cannot hold NUL
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "").strip()
+    return text[:max_chars], len(text) > max_chars
+
+
+# === Workers ===
+
+def claim_jobs(db: Session, batch_size: int, stale_minutes: int):
+    """
+    Mark up to `batch_size` pending (or abandoned running) rows as running;
+    returns them. An abandoned row that has used up its attempts is failed
+    instead: its worker may have died on it, and would again.
+    """
+    now = datetime.utcnow()
+    stale = and_(DocumentText.status == "running", DocumentText.locked_at < now - timedelta(minutes=stale_minutes))
+    db.execute(
+        update(DocumentText)
+        .where(stale, DocumentText.attempts >= settings.TEXT_EXTRACTION_MAX_ATTEMPTS)
+        .values(status="failed", locked_at=None, last_error="Worker stopped while extracting this document")
+    )
+    jobs = db.execute(
+        select(DocumentText)
+        .where(or_(
+            and_(DocumentText.status == "pending", or_(DocumentText.run_after.is_(None), DocumentText.run_after <= now)),
+            and_(stale, DocumentText.attempts < settings.TEXT_EXTRACTION_MAX_ATTEMPTS),
+        ))
+        .order_by(DocumentText.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for job in jobs:
+        job.status, job.locked_at, job.attempts = "running", now, job.attempts + 1
+    db.commit()
+    return jobs
+
+
+def _finish(
+    db: Session, job: DocumentText, result: Optional[Tuple[str, bool]], error: Optional[Exception],
+    permanent: bool = False,
+):
+    if error is None:
+        job.content, job.truncated = result
+        job.char_count, job.status, job.last_error = len(job.content), "done", None
+        job.extracted_at = datetime.utcnow()
+    else:
+        retry = not permanent and job.attempts < settings.TEXT_EXTRACTION_MAX_ATTEMPTS
+        job.status = "pending" if retry else "failed"
+        # e.g. the file is claimed between the upload's commit and its promotion
+        job.run_after = datetime.utcnow() + timedelta(minutes=job.attempts)
+        job.last_error = (str(error) or type(error).__name__)[:500]
+    job.locked_at = None
+    db.commit()
+
+
+class ExtractionPool:
+    """
+    Worker processes for extract_text that outlive a crashing worker.
+
+    A document that kills its process (e.g. a malformed PDF crashing PDFium)
+    breaks the whole ProcessPoolExecutor; restart() replaces it.
+    """
+
+    def __init__(self, workers: int, factory: Optional[Callable[[int], Executor]] = None):
+        self.workers = workers
+        self.restarts = 0
+        # "spawn": the children only run extract_text and never touch the database
+        self._factory = factory or (
+            lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn"))
+        )
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory(self.workers)
+        return self._executor
+
+    def restart(self):
+        self.shutdown()
+        self.restarts += 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def _extract_in_pool(db: Session, work: List[Tuple[DocumentText, str]], pool: ExtractionPool, stats: Dict[str, int]):
+    """Extract `work` in the pool; returns what was left unfinished because the pool broke"""
+    max_chars = settings.TEXT_EXTRACTION_MAX_CHARS
+    futures, unfinished = {}, []
+    for job, source_path in work:
+        try:
+            futures[pool.executor.submit(extract_text, source_path, job.file_type, max_chars)] = (job, source_path)
+        except BrokenProcessPool:
+            unfinished.append((job, source_path))
+    for future in as_completed(futures):
+        job, source_path = futures[future]
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            unfinished.append((job, source_path))
+        except Exception as e:
+            _fail(db, job, e, stats)
+        else:
+            _finish(db, job, result, None)
+            stats["done"] += 1
+    return unfinished
+
+
+def process_jobs(
+    db: Session, jobs: Iterable[DocumentText], storage: LocalStorage, stats: Dict[str, int],
+    pool: Optional[ExtractionPool] = None,
+):
+    """
+    Extract the claimed rows, in `pool` if given, else inline.
+
+    When a worker process dies, the rows it left unfinished are extracted
+    again one at a time in a restarted pool: the row that kills a process on
+    its own is marked failed (no retries), the others complete. Rows still
+    unfinished when this is interrupted go back to pending.
+    """
+    max_chars = settings.TEXT_EXTRACTION_MAX_CHARS
+    work = []
+    for job in jobs:
+        source_path = storage.path_for(job.content_hash)
+        if storage.exists(source_path):
+            work.append((job, source_path))
+        else:
+            _fail(db, job, FileNotFoundError(f"{source_path} is missing"), stats)
+
+    if pool is None:
+        for job, source_path in work:
+            try:
+                result = extract_text(source_path, job.file_type, max_chars)
+            except Exception as e:
+                _fail(db, job, e, stats)
+            else:
+                _finish(db, job, result, None)
+                stats["done"] += 1
+        return
+
+    unfinished = list(work)
+    try:
+        unfinished = _extract_in_pool(db, work, pool, stats)
+        if unfinished:
+            pool.restart()
+            logger.warning("Text extraction process died; retrying %s documents one at a time", len(unfinished))
+        while unfinished:
+            job, _ = unfinished[0]
+            # Alone in the pool, so a crash can only be this document's
+            crashed = _extract_in_pool(db, unfinished[:1], pool, stats)
+            unfinished.pop(0)
+            if crashed:
+                pool.restart()
+                _fail(db, job, RuntimeError("Text extraction process crashed on this document"), stats, permanent=True)
+    finally:
+        released = [job for job, _ in unfinished if job.status == "running"]
+        for job in released:
+            job.status, job.locked_at, job.attempts = "pending", None, job.attempts - 1
+        if released:
+            db.commit()
+
+
+def _fail(db: Session, job: DocumentText, error: Exception, stats: Dict[str, int], permanent: bool = False):
+    logger.warning("Text extraction for %s failed (attempt %s): %s", job.content_hash, job.attempts, error)
+    _finish(db, job, None, error, permanent)
+    stats["failed"] += 1
+
+
+def process_pending_texts(
+    storage: LocalStorage = default_storage, batch_size: Optional[int] = None, pool: Optional[ExtractionPool] = None,
+) -> Dict[str, int]:
+    """Claim and extract one batch of rows; returns counters"""
+    stats = {"claimed": 0, "done": 0, "failed": 0}
+    db = PostgresSessionLocal()
+    try:
+        jobs = claim_jobs(db, batch_size or settings.TEXT_EXTRACTION_BATCH_SIZE, settings.TEXT_EXTRACTION_STALE_MINUTES)
+        stats["claimed"] = len(jobs)
+        process_jobs(db, jobs, storage, stats, pool)
+    finally:
+        db.close()
+    return stats
+
+
+def count_pending_texts() -> int:
+    db = PostgresSessionLocal()
+    try:
+        return db.execute(
+            select(func.count()).select_from(DocumentText).where(DocumentText.status.in_(("pending", "running")))
+        ).scalar_one()
+    finally:
+        db.close()
+
+
+def backfill_texts(batch_size: int = 1000) -> int:
+    """Queue every live, extractable file that has no row yet; returns how many contents were queued"""
+    queued, last_id = 0, 0
+    db = PostgresSessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(File.file_id, File.content_hash, File.file_type, File.file_path)
+                .outerjoin(DocumentText, DocumentText.content_hash == File.content_hash)
+                .where(File.file_id > last_id, File.is_deleted.is_(False), DocumentText.content_hash.is_(None))
+                .order_by(File.file_id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return queued
+            jobs = {
+                row.content_hash: row.file_type.lower() for row in rows
+                if extractable(row.file_type, row.file_path, row.content_hash)
+            }
+            enqueue_texts(db.connection(), jobs)
+            db.commit()
+            queued += len(jobs)
+            last_id = rows[-1].file_id
+    finally:
+        db.close()
+
+
+async def run_periodic_text_extraction(interval_seconds: int):
+    """
+    Background loop for TEXT_EXTRACTION_INTERVAL_SECONDS > 0: drains the
+    queue, then polls. Documents are parsed in TEXT_EXTRACTION_WORKERS child
+    processes, so one that crashes its parser cannot take the app down.
+    """
+    with ExtractionPool(settings.TEXT_EXTRACTION_WORKERS) as pool:
+        while True:
+            try:
+                stats = await asyncio.to_thread(process_pending_texts, pool=pool)
+            except Exception as e:
+                logger.error("Text extraction worker failed: %s", e)
+                stats = None
+            if not stats or not stats["claimed"]:
+                await asyncio.sleep(interval_seconds)
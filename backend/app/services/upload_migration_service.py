@@ -0,0 +1,105 @@
+"""
+Move pre-layout attachments (flat uploads/<uuid>.<ext>) into content-addressed storage
+
+Rows are processed in file_id order, one transaction per batch:
+1. each old file is hashed (unless its content_hash is already known) and
+   linked or copied to storage.path_for(hash); the old file stays in place
+2. one bulk UPDATE sets file_path/content_hash for the whole batch, and the
+   blob reference counts, meeting versions and cache tags are updated with it
+3. after the commit the old files are deleted
+
+Every row points at an existing file at every step, so the migration can be
+stopped at any time. Rerunning it picks up the rows still outside the layout;
+--after-id skips straight past the last finished batch. Old files left behind
+by a crash between commit and delete are removed by the upload sweeper.
+"""
+import sys
+from collections import Counter
+from typing import Callable, Dict, Optional
+from sqlalchemy import or_, select, update
+from app.core.cache import invalidate_tags
+from app.core.config import settings
+from app.core.database import PostgresSessionLocal
+from app.core.etag import bump_meeting_versions
+from app.core.invalidation import publish_invalidation
+from app.core.storage import OBJECTS_DIRNAME, LocalStorage, storage as default_storage
+from app.models.file import File
+from app.services.blob_service import apply_reference_deltas, hash_upload
+
+
+def _pending(db, after_id: int, batch_size: int):
+    return db.execute(
+        select(File.file_id, File.agenda_id, File.file_path, File.content_hash, File.file_size, File.is_deleted)
+        .where(
+            File.file_id > after_id,
+            or_(File.content_hash.is_(None), File.file_path.notlike(f"%{OBJECTS_DIRNAME}%")),
+        )
+        .order_by(File.file_id)
+        .limit(batch_size)
+    ).all()
+
+
+def migrate_batch(db, storage: LocalStorage, rows, stats: Dict[str, int]):
+    updates, deltas, blobs, agenda_ids, old_paths = [], Counter(), {}, set(), []
+    for row in rows:
+        if storage.in_layout(row.file_path, row.content_hash):
+            continue
+        if not storage.exists(row.file_path):
+            stats["missing"] += 1
+            continue
+        content_hash, size = row.content_hash, row.file_size
+        if not content_hash:
+            with storage.open(row.file_path) as source:
+                content_hash, size = hash_upload(source, sys.maxsize, chunk_size=settings.UPLOAD_CHUNK_SIZE)
+        if storage.exists(storage.path_for(content_hash)):
+            stats["deduplicated"] += 1
+        new_path = storage.adopt(row.file_path, content_hash)
+
+        updates.append({"file_id": row.file_id, "file_path": new_path, "content_hash": content_hash, "file_size": size})
+        if not row.is_deleted:
+            deltas[content_hash] += 1
+            blobs.setdefault(content_hash, (new_path, size))
+        agenda_ids.add(row.agenda_id)
+        old_paths.append(row.file_path)
+
+    if not updates:
+        return
+    # Bulk UPDATE by primary key skips the flush hooks, so do their work here
+    db.execute(update(File), updates)
+    connection = db.connection()
+    apply_reference_deltas(connection, deltas, blobs)
+    tags = {f"meeting:{meeting_id}" for meeting_id in bump_meeting_versions(connection, agenda_ids=agenda_ids)}
+    tags.add("meetings")
+    publish_invalidation(connection, tags)
+    db.commit()
+    invalidate_tags(*tags)
+
+    for path in old_paths:
+        storage.delete(path)
+    stats["migrated"] += len(updates)
+
+
+def migrate_uploads(
+    storage: LocalStorage = default_storage,
+    batch_size: int = 500,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    on_batch: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """Migrate up to `limit` rows with file_id > `after_id`; returns counters incl. last_file_id"""
+    stats = {"migrated": 0, "deduplicated": 0, "missing": 0, "batches": 0, "last_file_id": after_id}
+    db = PostgresSessionLocal()
+    try:
+        while limit is None or stats["migrated"] + stats["missing"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["migrated"] - stats["missing"])
+            rows = _pending(db, stats["last_file_id"], size)
+            if not rows:
+                break
+            migrate_batch(db, storage, rows, stats)
+            stats["batches"] += 1
+            stats["last_file_id"] = rows[-1].file_id
+            if on_batch:
+                on_batch(stats)
+    finally:
+        db.close()
+    return stats
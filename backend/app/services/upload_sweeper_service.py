@@ -0,0 +1,165 @@
+"""
+Reconcile the upload directory with the files table
+
+- Staging directories older than UPLOAD_STAGING_MAX_AGE_MINUTES belong to
+  requests that crashed or never committed. A staged file whose File row
+  exists (the process died between commit and promotion) is moved into
+  place; everything else is deleted.
+- Files under the upload root that no File row references are deleted once
+  they are older than UPLOAD_ORPHAN_GRACE_MINUTES. Paths are compared
+  relative to the upload root, so rows that store a cwd-relative path
+  (`uploads/<name>`) still protect their file when UPLOAD_PATH is absolute. Previews count as
+  referenced while the file they were generated from is.
+- Content-addressed blobs unreferenced for UPLOAD_ORPHAN_GRACE_MINUTES are
+  garbage-collected (app.services.blob_service.collect_blobs).
+- Expired resumable upload sessions are deleted with their partial files
+  (app.services.resumable_upload_service.collect_upload_sessions).
+- File rows whose file is missing are counted and logged, never deleted.
+
+Disk entries and rows are processed in batches of UPLOAD_SWEEP_BATCH_SIZE,
+one IN (...) query per batch.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import PostgresSessionLocal
+from app.core.storage import LocalStorage, storage as default_storage
+from app.core.uploads import STAGING_DIRNAME
+from app.models.file import File
+from app.models.file_blob import FileBlob
+from app.services.blob_service import collect_blobs
+from app.services.resumable_upload_service import collect_upload_sessions
+
+logger = logging.getLogger(__name__)
+
+
+def _batched(items: Iterator[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _key(storage: LocalStorage, path: str) -> str:
+    """`path` relative to the upload root, however it was spelled"""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(storage.root))
+
+
+def _spellings(path: str) -> set:
+    """
+    Ways a File row may store `path`: rows written before the layout hold
+    `uploads/<name>` (or `./uploads/<name>`) relative to the working
+    directory, while UPLOAD_PATH may be absolute, or the other way round
+    """
+    absolute = os.path.abspath(path)
+    relative = os.path.relpath(absolute)
+    return {path, absolute, relative, os.path.join(".", relative)}
+
+
+def _referenced(db, storage: LocalStorage, paths: List[str]) -> set:
+    """Keys (see _key) of the paths that a File row or a (possibly not yet collected) blob still points at"""
+    candidates = list(set().union(*map(_spellings, paths)))
+    files = select(File.file_path).where(File.file_path.in_(candidates))
+    blobs = select(FileBlob.file_path).where(FileBlob.file_path.in_(candidates))
+    return {_key(storage, path) for path in db.execute(files.union(blobs)).scalars()}
+
+
+def _older_than(path: str, cutoff: float) -> bool:
+    try:
+        return os.stat(path).st_mtime < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def sweep_staging(db, storage: LocalStorage, max_age_minutes: int, stats: Dict[str, int]):
+    root = storage.root
+    staging_root = os.path.join(root, STAGING_DIRNAME)
+    if not os.path.isdir(staging_root):
+        return
+    cutoff = time.time() - max_age_minutes * 60
+    for entry in os.scandir(staging_root):
+        if not entry.is_dir() or not _older_than(entry.path, cutoff):
+            continue
+        # Staged files sit at their final path relative to the upload root
+        staged = {os.path.relpath(path, entry.path): path for path in LocalStorage(entry.path).walk()}
+        referenced = _referenced(db, storage, [os.path.join(root, key) for key in staged]) if staged else set()
+        for key in referenced & staged.keys():
+            final_path = os.path.join(root, key)
+            if not storage.exists(final_path):
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(staged.pop(key), final_path)
+                stats["promoted"] += 1
+        stats["staging_removed"] += len(staged)
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def sweep_orphans(db, storage: LocalStorage, grace_minutes: int, batch_size: int, stats: Dict[str, int]):
+    cutoff = time.time() - grace_minutes * 60
+    for batch in _batched(storage.walk(), batch_size):
+        stats["scanned"] += len(batch)
+        owners = {path: storage.preview_source(path) or path for path in batch}
+        referenced = _referenced(db, storage, list(set(owners.values())))
+        for path in batch:
+            if _key(storage, owners[path]) not in referenced and _older_than(path, cutoff) and storage.delete(path):
+                stats["orphans_removed"] += 1
+
+
+def count_missing(db, storage: LocalStorage, batch_size: int, stats: Dict[str, int]):
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(File.file_id, File.file_path)
+            .where(File.file_id > last_id, File.is_deleted.is_(False))
+            .order_by(File.file_id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        for file_id, file_path in rows:
+            if not storage.exists(file_path):
+                stats["missing"] += 1
+                if stats["missing"] <= 20:
+                    logger.warning("File row %s points to a missing file: %s", file_id, file_path)
+        last_id = rows[-1].file_id
+
+
+def sweep_uploads(storage: LocalStorage = default_storage, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """One full reconciliation pass; returns counters"""
+    batch_size = batch_size or settings.UPLOAD_SWEEP_BATCH_SIZE
+    stats = {
+        "promoted": 0, "staging_removed": 0, "blobs_removed": 0, "sessions_expired": 0,
+        "scanned": 0, "orphans_removed": 0, "missing": 0,
+    }
+    if not os.path.isdir(storage.root):
+        return stats
+
+    db = PostgresSessionLocal()
+    try:
+        sweep_staging(db, storage, settings.UPLOAD_STAGING_MAX_AGE_MINUTES, stats)
+        stats["blobs_removed"] = collect_blobs(db, settings.UPLOAD_ORPHAN_GRACE_MINUTES, batch_size)
+        stats["sessions_expired"] = collect_upload_sessions(db, storage, settings.UPLOAD_ORPHAN_GRACE_MINUTES, batch_size)
+        sweep_orphans(db, storage, settings.UPLOAD_ORPHAN_GRACE_MINUTES, batch_size, stats)
+        count_missing(db, storage, batch_size, stats)
+    finally:
+        db.close()
+    logger.info("Upload sweep: %s", stats)
+    return stats
+
+
+async def run_periodic_upload_sweep(interval_minutes: int):
+    """Background loop for UPLOAD_SWEEP_INTERVAL_MINUTES > 0 (started from app startup)"""
+    while True:
+        try:
+            await asyncio.to_thread(sweep_uploads)
+        except Exception as e:
+            logger.error("Upload sweep failed: %s", e)
+        await asyncio.sleep(interval_minutes * 60)
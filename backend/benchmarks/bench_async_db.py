@@ -0,0 +1,93 @@
+"""
+Benchmark: sync Session vs AsyncSession inside async def handlers
+
+Simulates one uvicorn worker serving a mix of slow and fast queries
+concurrently. With the sync Session every query blocks the event loop, so
+fast requests queue up behind slow ones; with the asyncpg-backed
+AsyncSession they overlap.
+
+Run against the configured PostgreSQL (see .env):
+    cd backend
+    python -m benchmarks.bench_async_db --concurrency 50 --slow-ratio 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from app.core.database import PostgresSessionLocal, AsyncPostgresSessionLocal, async_postgres_engine
+
+SLOW_QUERY = text("SELECT pg_sleep(:s)")
+FAST_QUERY = text("SELECT 1")
+
+
+async def sync_handler(slow: bool, slow_seconds: float):
+    """What the endpoints did before: a blocking Session in an async def"""
+    db = PostgresSessionLocal()
+    try:
+        if slow:
+            db.execute(SLOW_QUERY, {"s": slow_seconds})
+        else:
+            db.execute(FAST_QUERY)
+    finally:
+        db.close()
+
+
+async def async_handler(slow: bool, slow_seconds: float):
+    """What the endpoints do now: AsyncSession from get_async_db"""
+    async with AsyncPostgresSessionLocal() as db:
+        if slow:
+            await db.execute(SLOW_QUERY, {"s": slow_seconds})
+        else:
+            await db.execute(FAST_QUERY)
+
+
+async def run(handler, requests: int, concurrency: int, slow_ratio: float, slow_seconds: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    fast_latencies = []
+    slow_every = int(1 / slow_ratio) if slow_ratio > 0 else 0
+
+    async def one(i: int):
+        slow = bool(slow_every) and i % slow_every == 0
+        async with semaphore:
+            started = time.perf_counter()
+            await handler(slow, slow_seconds)
+            if not slow:
+                fast_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    fast_latencies.sort()
+    return {
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1),
+        "fast_p50_ms": round(statistics.median(fast_latencies) * 1000, 2),
+        "fast_p95_ms": round(fast_latencies[int(len(fast_latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--slow-ratio", type=float, default=0.1, help="fraction of requests running the slow query")
+    parser.add_argument("--slow-seconds", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for name, handler in (("sync Session (before)", sync_handler), ("AsyncSession (after)", async_handler)):
+        result = await run(handler, args.requests, args.concurrency, args.slow_ratio, args.slow_seconds)
+        print(f"{name:24s} {result}")
+
+    await async_postgres_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
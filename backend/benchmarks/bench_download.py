@@ -0,0 +1,129 @@
+"""
+Benchmark: parallel attachment downloads, read-into-memory vs FileDownload
+
+The naive handler returns Response(content=f.read()), so every concurrent
+download holds the whole file in memory. app.core.downloads.FileDownload
+sends DOWNLOAD_CHUNK_SIZE chunks (or lets the server sendfile() when it
+supports the zero-copy ASGI extension). Both run under uvicorn on a local
+socket in a child process; N clients download the same 10 MB PDF in
+parallel, discarding the body. Reported: aggregate throughput and the
+server's peak Python allocations (tracemalloc) per concurrency level.
+
+    cd backend
+    python -m benchmarks.bench_download --size-mb 10 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from app.core.downloads import FileDownload
+
+
+def build_app(path: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/naive")
+    async def naive():
+        with open(path, "rb") as f:
+            return Response(content=f.read(), media_type="application/pdf")
+
+    @app.get("/stream")
+    async def stream(request: Request):
+        return FileDownload(request, path, os.stat(path), '"bench"', "application/pdf")
+
+    @app.post("/peak")
+    async def peak():
+        """Peak traced memory (bytes) since the previous call"""
+        value = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        return value
+
+    return app
+
+
+def serve(path: str, port: int):
+    tracemalloc.start()
+    uvicorn.run(build_app(path), port=port, log_level="warning", access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def download_all(url: str, concurrency: int, rounds: int) -> int:
+    received = 0
+
+    async def one(client):
+        nonlocal received
+        async with client.stream("GET", url) as response:
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+
+    async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=concurrency)) as client:
+        for _ in range(rounds):
+            await asyncio.gather(*(one(client) for _ in range(concurrency)))
+    return received
+
+
+def measure(base_url: str, route: str, concurrency: int, rounds: int):
+    """(MB/s, server peak MB)"""
+    httpx.post(f"{base_url}/peak")
+    started = time.perf_counter()
+    received = asyncio.run(download_all(base_url + route, concurrency, rounds))
+    elapsed = time.perf_counter() - started
+    peak = httpx.post(f"{base_url}/peak").json()
+    return received / (1024 * 1024) / elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "agenda.pdf")
+        with open(path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = multiprocessing.Process(target=serve, args=(path, port), daemon=True)
+        server.start()
+        while True:
+            try:
+                httpx.post(f"{base_url}/peak")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        print(f"{args.size_mb} MB file, {args.rounds} rounds per level")
+        print(f"{'parallel':>8}  {'naive MB/s':>10}  {'naive peak':>10}  {'stream MB/s':>11}  {'stream peak':>11}")
+        for concurrency in args.concurrency:
+            old_rate, old_peak = measure(base_url, "/naive", concurrency, args.rounds)
+            new_rate, new_peak = measure(base_url, "/stream", concurrency, args.rounds)
+            print(f"{concurrency:>8}  {old_rate:>10.0f}  {old_peak:>8.1f}MB  {new_rate:>11.0f}  {new_peak:>9.1f}MB")
+
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark: BaseHTTPMiddleware stack vs pure ASGI middleware stack
+
+Measures in-process requests per second on /health and GET /api/v1/meetings/
+with the previous BaseHTTPMiddleware-based SecurityHeaders/RateLimit pair
+and with the current pure ASGI versions. The database and auth dependencies
+are replaced with in-memory stand-ins so only the middleware cost differs.
+
+    cd backend
+    python -m benchmarks.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, datetime, time as dtime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.api.v1.endpoints import meetings
+from app.core.database import get_async_db
+from app.core.middleware import SECURITY_HEADERS, SecurityHeadersMiddleware, RateLimitMiddleware
+from app.core.ratelimit import rate_limiter
+from app.core.rbac import require_authenticated
+from app.models.meeting import Meeting
+from app.models.user import User
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here for comparison"""
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous dispatch shape on top of the current limiter"""
+    async def dispatch(self, request: Request, call_next):
+        rule = rate_limiter.match(request.method, request.url.path)
+        if rule is not None:
+            await rate_limiter.hit(rule, request.client.host)
+        return await call_next(request)
+
+
+class _StubResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class _StubSession:
+    """Returns the same 100 meetings for every query"""
+    def __init__(self, rows):
+        self._rows = rows
+
+    async def execute(self, *args, **kwargs):
+        return _StubResult(self._rows)
+
+
+def _meetings(count: int = 100):
+    creator = User(user_id=1, username="admin", fullname="ผู้ดูแลระบบ")
+    return [
+        Meeting(
+            meeting_id=i, meeting_title=f"ประชุม {i}", meeting_date=date(2025, 1, 1),
+            start_time=dtime(9, 0), end_time=dtime(12, 0), location="ห้องประชุม 1",
+            status="active", created_by=1, creator=creator, created_at=datetime(2025, 1, 1),
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    if legacy:
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RateLimitMiddleware)
+
+    rows = _meetings()
+    session = _StubSession(rows)
+
+    async def stub_db():
+        yield session
+
+    app.include_router(meetings.router, prefix="/api/v1/meetings")
+    app.dependency_overrides[get_async_db] = stub_db
+    app.dependency_overrides[require_authenticated] = lambda: rows[0].creator
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm-up
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    for path in ("/health", "/api/v1/meetings/"):
+        old = await measure(build_app(legacy=True), path, args.requests, args.concurrency)
+        new = await measure(build_app(legacy=False), path, args.requests, args.concurrency)
+        print(f"{path:20s} BaseHTTPMiddleware {old:8.0f} req/s | pure ASGI {new:8.0f} req/s | {new / old:5.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark: OFFSET vs keyset (cursor) pagination of the meetings list
+
+Fills a meetings table (500k rows by default) and times fetching page 1 and
+a deep page with skip/limit and with a cursor, using the same query builder
+as the endpoints (app.services.meeting_service.meetings_page_query).
+
+Uses a throwaway SQLite file by default; pass --url to run against PostgreSQL
+(the meetings/users_local tables there are created if missing and filled).
+    cd backend
+    python -m benchmarks.bench_pagination --rows 500000 --page 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.pagination import encode_cursor
+from app.models import Meeting, User
+from app.services.meeting_service import MEETING_KEYSET, meetings_page_query
+
+
+def fill(engine, rows: int):
+    Base.metadata.create_all(engine, tables=[User.__table__, Meeting.__table__])
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Meeting)).scalar()
+        if existing >= rows:
+            return
+        if not conn.execute(select(User.user_id).where(User.user_id == 1)).first():
+            conn.execute(insert(User).values(user_id=1, username="bench"))
+        rng = random.Random(42)
+        start = date(2000, 1, 1)
+        batch = []
+        for i in range(existing, rows):
+            batch.append({
+                "meeting_title": f"ประชุม {i}", "meeting_date": start + timedelta(days=rng.randrange(9000)),
+                "start_time": dtime(9, 0), "end_time": dtime(12, 0), "location": "ห้องประชุม 1",
+                "status": "closed", "created_by": 1,
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(Meeting), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Meeting), batch)
+
+
+def time_page(engine, limit: int, skip: int = 0, cursor: str = None, repeat: int = 5) -> float:
+    """Median milliseconds to fetch one page"""
+    samples = []
+    with Session(engine) as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = db.execute(meetings_page_query(select(Meeting), limit, cursor, skip)).scalars().all()
+            samples.append((time.perf_counter() - started) * 1000)
+            assert rows
+            db.expunge_all()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--page", type=int, default=5000, help="deep page number to compare with page 1")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    started = time.perf_counter()
+    fill(engine, args.rows)
+    print(f"{args.rows} meetings ready in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+    skip = (args.page - 1) * args.limit
+    # Cursor of the last row on the page before the deep page (setup, not timed)
+    with Session(engine) as db:
+        order = [c.desc() for c in MEETING_KEYSET]
+        previous = db.execute(select(*MEETING_KEYSET).order_by(*order).offset(skip - 1).limit(1)).one()
+    cursor = encode_cursor(tuple(previous))
+
+    results = {
+        ("offset", 1): time_page(engine, args.limit),
+        ("offset", args.page): time_page(engine, args.limit, skip=skip),
+        ("keyset", 1): time_page(engine, args.limit),
+        ("keyset", args.page): time_page(engine, args.limit, cursor=cursor),
+    }
+    for (mode, page), ms in results.items():
+        print(f"{mode:7s} page {page:6d}: {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
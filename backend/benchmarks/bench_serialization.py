@@ -0,0 +1,152 @@
+"""
+Benchmark: CPU time per request for the meeting and agenda list endpoints
+
+Compares the previous response path (ORM objects -> hand-built dicts ->
+response_model validation -> stdlib JSON) with the FastJSON path (dicts
+built from row tuples -> orjson, no second validation), through the full
+ASGI stack, on 1,000 meetings and one meeting with 500 agendas, 2 files each.
+
+Runs on a temporary SQLite database through aiosqlite (pip install aiosqlite):
+    cd backend
+    python -m benchmarks.bench_serialization --requests 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+from app.api.v1.endpoints import meeting_admin, meetings
+from app.core.database import Base, get_async_db
+from app.core.rbac import require_any_admin, require_authenticated
+from app.models import Agenda, AgendaObjective, AgendaObjectiveMap, File, Meeting, User
+from app.schemas.agenda import AgendaResponse
+from app.schemas.meeting import MeetingResponse
+from app.services.agenda_service import AsyncAgendaService
+
+MEETINGS = 1000
+AGENDAS = 500
+FILES_PER_AGENDA = 2
+
+legacy = APIRouter(default_response_class=JSONResponse)
+
+
+@legacy.get("/meetings/", response_model=List[MeetingResponse])
+async def legacy_read_meetings(limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(Meeting).options(joinedload(Meeting.creator)).order_by(Meeting.meeting_date.desc()).limit(limit)
+    )
+    return [meetings._populate_creator_fullname(m) for m in result.scalars().all()]
+
+
+@legacy.get("/meetings/{meeting_id}/agendas", response_model=List[AgendaResponse])
+async def legacy_get_meeting_agendas(meeting_id: int, db: AsyncSession = Depends(get_async_db)):
+    agendas = await AsyncAgendaService.get_meeting_agendas(db, meeting_id)
+    return [
+        AgendaResponse(
+            agenda_id=a.agenda_id, meeting_id=a.meeting_id, user_id=a.user_id, agenda_title=a.agenda_title,
+            agenda_detail=a.agenda_detail, agenda_type=a.agenda_type, agenda_order=a.agenda_order,
+            status=a.status, created_at=a.created_at, updated_at=a.updated_at,
+            files=[{"file_id": f.file_id, "filename": f.original_name, "file_path": f.file_path,
+                    "uploaded_at": f.uploaded_at} for f in a.files],
+            objectives=[{"objective_id": om.objective.objective_id, "objective_name": om.objective.objective_name}
+                        for om in a.objective_maps],
+        )
+        for a in agendas
+    ]
+
+
+def seed(url: str):
+    engine = create_engine(url)
+    Base.metadata.create_all(
+        engine, tables=[t.__table__ for t in (User, Meeting, Agenda, File, AgendaObjective, AgendaObjectiveMap)]
+    )
+    now = datetime(2025, 1, 1, 8, 30)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(user_id=1, username="admin", fullname="ผู้ดูแลระบบ"))
+        conn.execute(insert(AgendaObjective).values(objective_id=1, objective_name="เพื่อทราบ"))
+        conn.execute(insert(Meeting), [{
+            "meeting_id": i, "meeting_title": f"ประชุมครั้งที่ {i}", "meeting_date": date(2020, 1, 1) + timedelta(days=i),
+            "start_time": dtime(9, 0), "end_time": dtime(12, 0), "location": "ห้องประชุม 1",
+            "description": "รายละเอียดการประชุม", "status": "closed", "created_by": 1, "created_at": now,
+        } for i in range(1, MEETINGS + 1)])
+        conn.execute(insert(Agenda), [{
+            "agenda_id": a, "meeting_id": 1, "user_id": 1, "agenda_title": f"วาระที่ {a}",
+            "agenda_detail": "รายละเอียดวาระ", "agenda_type": "เพื่อทราบ", "status": "approved", "created_at": now,
+        } for a in range(1, AGENDAS + 1)])
+        conn.execute(insert(AgendaObjectiveMap), [{"agenda_id": a, "objective_id": 1} for a in range(1, AGENDAS + 1)])
+        conn.execute(insert(File), [{
+            "agenda_id": a, "file_name": f"{a}-{n}.pdf", "original_name": f"เอกสาร {a}-{n}.pdf",
+            "file_path": f"uploads/{a}-{n}.pdf", "file_type": ".pdf", "file_size": 1024, "uploaded_by": 1,
+            "uploaded_at": now,
+        } for a in range(1, AGENDAS + 1) for n in range(FILES_PER_AGENDA)])
+
+
+def build_app(url: str) -> FastAPI:
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def db():
+        async with sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(legacy, prefix="/legacy")
+    app.include_router(meetings.router, prefix="/api/v1/meetings")
+    app.include_router(meeting_admin.router, prefix="/api/v1")
+    admin = User(user_id=1, username="admin")
+    app.dependency_overrides[get_async_db] = db
+    app.dependency_overrides[require_authenticated] = lambda: admin
+    app.dependency_overrides[require_any_admin] = lambda: admin
+    return app
+
+
+async def cpu_per_request(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    """Median process CPU milliseconds per request"""
+    await client.get(path)  # warm-up
+    samples = []
+    for _ in range(requests):
+        started = time.process_time()
+        response = await client.get(path)
+        samples.append((time.process_time() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    seed(f"sqlite:///{path}")
+    app = build_app(f"sqlite+aiosqlite:///{path}")
+    assert meetings.respond.enabled and meeting_admin.respond.enabled, "enable FAST_JSON_ROUTERS for meetings, meeting_admin"
+
+    cases = [
+        (f"{MEETINGS} meetings", f"/legacy/meetings/?limit={MEETINGS}", f"/api/v1/meetings/?limit={MEETINGS}"),
+        (f"{AGENDAS} agendas", "/legacy/meetings/1/agendas", "/api/v1/meetings/1/agendas"),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, old_path, new_path in cases:
+            old = await cpu_per_request(client, old_path, args.requests)
+            new = await cpu_per_request(client, new_path, args.requests)
+            print(f"{name:14s} previous {old:8.1f} ms CPU | fast path {new:8.1f} ms CPU | saved {old - new:7.1f} ms ({old / new:4.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
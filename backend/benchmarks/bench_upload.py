@@ -0,0 +1,67 @@
+"""
+Benchmark: peak memory per upload, previous writer vs streaming writer
+
+The previous AgendaService._save_files did f.write(upload.file.read()), so an
+upload's full size was held in memory at once. app.core.uploads.stream_to_file
+copies in UPLOAD_CHUNK_SIZE chunks. Peak Python allocations are measured with
+tracemalloc while copying an on-disk upload (as Starlette spools them) of
+each size.
+
+    cd backend
+    python -m benchmarks.bench_upload --sizes 1 10 50 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.uploads import stream_to_file
+
+
+def legacy_write(source, dest_path: str):
+    with open(dest_path, "wb") as f:
+        f.write(source.read())
+
+
+def measure(write, source_path: str, dest_path: str):
+    """(peak MB, seconds) for one copy"""
+    with open(source_path, "rb") as source:
+        tracemalloc.start()
+        started = time.perf_counter()
+        write(source, dest_path)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    os.unlink(dest_path)
+    return peak / (1024 * 1024), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100], help="upload sizes in MB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            source_path = os.path.join(tmp, f"upload-{size_mb}.bin")
+            with open(source_path, "wb") as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+            dest_path = os.path.join(tmp, "dest.bin")
+
+            old_peak, old_time = measure(legacy_write, source_path, dest_path)
+            new_peak, new_time = measure(
+                lambda source, dest: stream_to_file(source, dest, max_size=size_mb * 1024 * 1024), source_path, dest_path
+            )
+            print(f"{size_mb:5d} MB  previous peak {old_peak:7.1f} MB ({old_time * 1000:6.0f} ms) | "
+                  f"streaming peak {new_peak:5.1f} MB ({new_time * 1000:6.0f} ms, incl. SHA-256 + fsync)")
+            os.unlink(source_path)
+
+
+if __name__ == "__main__":
+    main()
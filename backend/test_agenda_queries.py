@@ -0,0 +1,79 @@
+"""
+Regression test: listing a meeting's agendas uses a fixed number of queries
+Run: python -m pytest test_agenda_queries.py
+"""
+import sys
+from contextlib import contextmanager
+from datetime import date, time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import User, Meeting, Agenda, File, AgendaObjective, AgendaObjectiveMap
+from app.services.agenda_service import AgendaService
+
+AGENDAS = 200
+FILES = 1000
+
+
+def _seed(db):
+    user = User(user_id=1, username="admin")
+    meeting = Meeting(
+        meeting_id=1, meeting_title="ประชุมประจำเดือน", meeting_date=date(2025, 1, 1),
+        start_time=time(9, 0), end_time=time(12, 0), location="ห้องประชุม 1", created_by=1,
+    )
+    objectives = [AgendaObjective(objective_id=i, objective_name=f"objective {i}") for i in range(1, 6)]
+    db.add_all([user, meeting, *objectives])
+    db.flush()
+
+    for a in range(1, AGENDAS + 1):
+        db.add(Agenda(agenda_id=a, meeting_id=1, user_id=1, agenda_title=f"วาระ {a}"))
+        db.add(AgendaObjectiveMap(agenda_id=a, objective_id=a % 5 + 1))
+    for f in range(1, FILES + 1):
+        db.add(File(
+            file_id=f, agenda_id=f % AGENDAS + 1, file_name=f"{f}.pdf", original_name=f"{f}.pdf",
+            file_path=f"uploads/{f}.pdf", file_type=".pdf", uploaded_by=1,
+        ))
+    db.commit()
+
+
+@contextmanager
+def _count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_meeting_agendas_use_fixed_query_count():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine,
+        tables=[t.__table__ for t in (User, Meeting, Agenda, File, AgendaObjective, AgendaObjectiveMap)],
+    )
+    db = sessionmaker(bind=engine)()
+    _seed(db)
+    db.expunge_all()
+
+    with _count_queries(engine) as statements:
+        agendas = AgendaService.get_meeting_agendas(db, 1)
+        # Touch everything the endpoint serializes
+        files = sum(len(agenda.files) for agenda in agendas)
+        objectives = [om.objective.objective_name for agenda in agendas for om in agenda.objective_maps]
+
+    assert len(agendas) == AGENDAS
+    assert files == FILES
+    assert len(objectives) == AGENDAS
+    # agendas + files + objective maps joined to objectives
+    assert len(statements) == 3, statements
@@ -0,0 +1,44 @@
+"""
+Test the audit database sink
+Run: python -m pytest test_audit_store.py
+"""
+import logging
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import audit_store_service
+from app.services.audit_store_service import AuditDatabaseSink
+
+
+def _record(when: datetime) -> logging.LogRecord:
+    record = logging.LogRecord("audit", logging.INFO, __file__, 0, "LOGIN_SUCCESS", None, None)
+    record.created = when.timestamp()
+    return record
+
+
+def test_a_month_whose_partition_fails_is_not_retried_on_every_batch(monkeypatch):
+    attempts = []
+
+    def ensure(engine, months):
+        attempts.append(set(months))
+        return set()  # e.g. the month's rows are already in DEFAULT
+
+    monkeypatch.setattr(audit_store_service, "ensure_audit_partitions", ensure)
+    clock = mock.Mock(return_value=1000.0)
+    monkeypatch.setattr(audit_store_service, "time", SimpleNamespace(monotonic=clock))
+    sink = AuditDatabaseSink(engine=mock.MagicMock())
+
+    for _ in range(5):
+        sink.write_batch([_record(datetime(2025, 3, 15))])
+    assert attempts == [{date(2025, 3, 1)}]
+
+    clock.return_value += AuditDatabaseSink.PARTITION_RETRY_SECONDS
+    sink.write_batch([_record(datetime(2025, 3, 15))])
+    assert len(attempts) == 2
@@ -0,0 +1,126 @@
+"""
+Test attachment downloads (byte ranges, If-Range) and streamed ZIP bundles
+Run: python -m pytest test_downloads.py
+"""
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+import httpx
+from fastapi import FastAPI, Request
+from app.core.downloads import FileDownload, RangeNotSatisfiable, parse_range
+from app.core.zipstream import stream_zip
+from app.services.attachment_bundle_service import bundle_members
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-5000", 1000) == (990, 999)
+    # Ignored: whole file
+    for header in ("bytes=0-1,5-6", "items=0-1", "bytes=5-1", "bytes=a-b", "bytes=abc-5", "bytes=1x-2",
+                   "bytes=-5x", "bytes=²-5", "bytes=0-²", "bytes=-"):
+        assert parse_range(header, 1000) is None
+    for header in ("bytes=1000-", "bytes=-0"):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 1000)
+
+
+def test_download_serves_ranges_only_for_the_current_version():
+    data = os.urandom(600_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "doc.pdf")
+        Path(path).write_bytes(data)
+        app = FastAPI()
+
+        @app.api_route("/download", methods=["GET", "HEAD"])
+        async def download(request: Request):
+            return FileDownload(request, path, os.stat(path), '"v1"', "application/pdf", "รายงาน.pdf")
+
+        asyncio.run(_exercise(app, data))
+
+
+async def _exercise(app, data):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.get("/download")
+        assert r.status_code == 200 and r.content == data
+        assert r.headers["accept-ranges"] == "bytes"
+        assert "filename*=UTF-8''%E0%B8%A3" in r.headers["content-disposition"]
+
+        r = await client.get("/download", headers={"Range": "bytes=300000-300009"})
+        assert r.status_code == 206 and r.content == data[300000:300010]
+        assert r.headers["content-range"] == "bytes 300000-300009/600000"
+
+        r = await client.get("/download", headers={"Range": "bytes=600000-"})
+        assert r.status_code == 416 and r.headers["content-range"] == "bytes */600000"
+
+        # A stale validator gets the whole (new) file instead of a mismatched piece
+        r = await client.get("/download", headers={"Range": "bytes=0-9", "If-Range": '"v1"'})
+        assert r.status_code == 206
+        r = await client.get("/download", headers={"Range": "bytes=0-9", "If-Range": '"v0"'})
+        assert r.status_code == 200 and len(r.content) == len(data)
+
+        r = await client.head("/download")
+        assert r.headers["content-length"] == str(len(data)) and r.content == b""
+
+
+def test_meeting_bundle_streams_one_folder_per_agenda_in_bounded_pieces():
+    chunk_size = 64 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        contents = {"scan.pdf": os.urandom(500_000), "minutes.txt": b"minutes " * 50_000}
+        for name, data in contents.items():
+            Path(tmp, name).write_bytes(data)
+        uploaded = datetime(2025, 1, 1, 9, 0)
+        row = lambda agenda_id, order, title, name, stored: SimpleNamespace(
+            agenda_id=agenda_id, agenda_order=order, agenda_title=title,
+            original_name=name, file_path=os.path.join(tmp, stored), uploaded_at=uploaded,
+        )
+        rows = [
+            row(7, 1, "รับรองรายงาน/การประชุม", "scan.pdf", "scan.pdf"),
+            row(7, 1, "รับรองรายงาน/การประชุม", "scan.pdf", "scan.pdf"),
+            row(9, 2, "เรื่องอื่นๆ", "minutes.txt", "minutes.txt"),
+            row(9, 2, "เรื่องอื่นๆ", "lost.pdf", "missing.pdf"),
+        ]
+
+        pieces = list(stream_zip(bundle_members(rows), chunk_size=chunk_size))
+
+    # Never more than one chunk (plus zip headers) at a time
+    assert max(len(piece) for piece in pieces) <= chunk_size + 1024
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.testzip() is None
+    entries = {info.filename: info for info in archive.infolist()}
+    assert sorted(entries) == [
+        "01 - รับรองรายงาน_การประชุม/scan (2).pdf",
+        "01 - รับรองรายงาน_การประชุม/scan.pdf",
+        "02 - เรื่องอื่นๆ/minutes.txt",
+    ]
+    assert entries["01 - รับรองรายงาน_การประชุม/scan.pdf"].compress_type == zipfile.ZIP_STORED
+    assert entries["02 - เรื่องอื่นๆ/minutes.txt"].compress_type == zipfile.ZIP_DEFLATED
+    assert archive.read("02 - เรื่องอื่นๆ/minutes.txt") == contents["minutes.txt"]
+
+
+def test_agendas_with_the_same_order_and_title_get_separate_folders():
+    row = lambda agenda_id, name: SimpleNamespace(
+        agenda_id=agenda_id, agenda_order=3, agenda_title="Budget", original_name=name,
+        file_path=f"/files/{agenda_id}/{name}", uploaded_at=datetime(2025, 1, 1),
+    )
+    rows = [row(1, "plan.pdf"), row(1, "Plan.pdf"), row(2, "plan.pdf"), row(3, "plan.pdf")]
+    assert [member.arcname for member in bundle_members(rows)] == [
+        "03 - Budget/plan.pdf",
+        "03 - Budget/Plan (2).pdf",
+        "03 - Budget (2)/plan.pdf",
+        "03 - Budget (3)/plan.pdf",
+    ]
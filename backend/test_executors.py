@@ -0,0 +1,31 @@
+"""
+Test the bounded login executors
+Run: python -m pytest test_executors.py
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.core.executors import BoundedExecutor, ExecutorSaturated
+
+
+def test_a_dead_worker_process_does_not_break_later_calls():
+    executor = BoundedExecutor("test", lambda n: ProcessPoolExecutor(max_workers=n), max_workers=1, max_queue=1)
+    try:
+        # Kills the worker on the first try and on the retry with a fresh pool
+        with pytest.raises(ExecutorSaturated):
+            asyncio.run(executor.run(os._exit, 1))
+        assert executor.restarts == 2
+
+        assert asyncio.run(executor.run(abs, -3)) == 3
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
@@ -0,0 +1,45 @@
+"""
+Test keyset cursor tokens
+Run: python -m pytest test_pagination.py
+"""
+import base64
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.core.pagination import encode_cursor, keyset_query
+from app.models import AuditEvent, Meeting
+
+
+def _token(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_values_must_match_the_key_columns():
+    keyset = (AuditEvent.event_time, AuditEvent.event_id)
+    stmt = keyset_query(select(AuditEvent), keyset, encode_cursor((datetime(2025, 1, 2, 3, 4), 17)), descending=True)
+    assert stmt.compile().params == {"param_1": datetime(2025, 1, 2, 3, 4), "param_2": 17}
+    # ISO strings are parsed
+    stmt = keyset_query(select(Meeting), (Meeting.meeting_date, Meeting.meeting_id), _token(["2025-01-01", 5]))
+    assert stmt.compile().params == {"param_1": date(2025, 1, 1), "param_2": 5}
+
+    for values in (
+        ["not a time", 17],
+        [{"dt": "2025-01-02T03:04:00"}, "17"],
+        [{"dt": "2025-01-02T03:04:00"}, True],
+        [{"dt": "2025-01-02T03:04:00"}, 1.5],
+        [17, 17],
+        [{"dt": "2025-01-02T03:04:00"}, {"injected": 1}],
+    ):
+        with pytest.raises(HTTPException) as error:
+            keyset_query(select(AuditEvent), keyset, _token(values))
+        assert error.value.status_code == 400
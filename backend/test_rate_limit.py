@@ -0,0 +1,72 @@
+"""
+Test the sliding-window rate limiter and its backends
+Run: python -m pytest test_rate_limit.py
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.core.ratelimit import InMemoryBackend, SQLiteBackend, RateLimiter, RateLimitRule
+
+
+def _exhaust(backend, limit=5, window=300):
+    """Hit one key limit+1 times at a fixed instant; return the results"""
+    with mock.patch("app.core.ratelimit.time.time", return_value=1_000_000.0):
+        return [backend.hit("POST /api/v1/auth/login|10.0.0.1", limit, window) for _ in range(limit + 1)]
+
+
+def test_in_memory_backend_blocks_after_limit():
+    results = _exhaust(InMemoryBackend())
+    assert all(allowed for allowed, _ in results[:5])
+    allowed, retry_after = results[5]
+    assert not allowed and 0 < retry_after <= 300
+
+
+def test_in_memory_backend_evicts_least_recently_used_keys():
+    backend = InMemoryBackend(max_keys=3)
+    for ip in range(10):
+        backend.hit(f"rule|10.0.0.{ip}", 5, 300)
+    assert len(backend) == 3
+
+
+def test_previous_window_is_weighted_into_the_sliding_window():
+    backend = InMemoryBackend()
+    with mock.patch("app.core.ratelimit.time.time", return_value=299.0):
+        for _ in range(5):
+            backend.hit("k", 5, 300)
+    # Just after the window rolls over nearly all of the previous count still applies
+    with mock.patch("app.core.ratelimit.time.time", return_value=301.0):
+        assert backend.hit("k", 5, 300)[0] is True
+        assert backend.hit("k", 5, 300)[0] is False
+    # A full window later the old attempts no longer count
+    with mock.patch("app.core.ratelimit.time.time", return_value=900.0):
+        assert backend.hit("k", 5, 300)[0] is True
+
+
+def test_sqlite_backend_shares_state_between_instances():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "ratelimit.sqlite3")
+        worker_a, worker_b = SQLiteBackend(path), SQLiteBackend(path)
+        with mock.patch("app.core.ratelimit.time.time", return_value=1_000_000.0):
+            for _ in range(5):
+                assert worker_a.hit("k", 5, 300)[0]
+            assert worker_b.hit("k", 5, 300)[0] is False
+
+
+def test_rules_match_per_route():
+    limiter = RateLimiter(
+        [RateLimitRule.parse("POST /api/v1/auth/login", "5/300"), RateLimitRule.parse("* /api/v1/files/*", "2/60")],
+        InMemoryBackend(),
+    )
+    assert limiter.match("POST", "/api/v1/auth/login").limit == 5
+    assert limiter.match("GET", "/api/v1/auth/login") is None
+    rule = limiter.match("GET", "/api/v1/files/7/download")
+    assert rule.limit == 2
+    results = [asyncio.run(limiter.hit(rule, "10.0.0.1")) for _ in range(3)]
+    assert [allowed for allowed, _ in results] == [True, True, False]
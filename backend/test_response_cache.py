@@ -0,0 +1,192 @@
+"""
+Test the two-tier tagged response cache
+Run: python -m pytest test_response_cache.py
+"""
+import asyncio
+import json
+import sys
+import threading
+from datetime import date, time
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.core.cache import InMemorySharedBackend, TaggedCache, TTLCache, _registry, cached, register_cache
+from app.core.invalidation import MAX_PAYLOAD_BYTES, WORKER_ID, InvalidationListener, encode_messages
+
+
+def _cache(shared=None):
+    return TaggedCache("test", TTLCache(maxsize=16, ttl=60, name="test"), shared=shared)
+
+
+def test_decorator_caches_until_a_tag_is_invalidated():
+    cache = _cache()
+    calls = []
+
+    @cached(cache, key="agendas:{meeting_id}", tags=("meeting:{meeting_id}", "objectives"))
+    async def agendas(db, meeting_id: int):
+        calls.append(meeting_id)
+        return [meeting_id]
+
+    async def run():
+        for _ in range(3):
+            assert await agendas(None, 1) == [1]
+        await agendas(None, 2)
+        cache.invalidate(["meeting:1"])
+        await agendas(None, 1)
+        await agendas(None, 2)
+        cache.invalidate(["objectives"])
+        await agendas(None, 2)
+
+    asyncio.run(run())
+    assert calls == [1, 2, 1, 2]
+    assert cache.stats()["hits"] == 3
+
+
+def test_value_computed_across_an_invalidation_is_not_stored():
+    cache = _cache()
+    hit, _, token = cache.lookup("current", ["meetings"])
+    assert not hit
+    cache.invalidate(["meetings"])  # a write commits while the read is running
+    cache.store("current", "stale", ["meetings"], token)
+    assert cache.lookup("current", ["meetings"])[0] is False
+
+
+def test_shared_tier_is_seen_by_other_workers_and_honours_tag_generations():
+    shared = InMemorySharedBackend()
+    worker_a, worker_b = _cache(shared), _cache(shared)
+
+    _, _, token = worker_a.lookup("objectives", ["objectives"])
+    worker_a.store("objectives", ["a"], ["objectives"], token)
+    assert worker_b.lookup("objectives", ["objectives"])[:2] == (True, ["a"])
+
+    worker_a.invalidate(["objectives"])
+    worker_b.local.clear()  # worker B has not heard about the invalidation locally
+    assert worker_b.lookup("objectives", ["objectives"])[0] is False
+    assert worker_b.stats()["shared"]["hits"] == 1
+
+
+def _filled_bus_cache():
+    cache = register_cache(TaggedCache("test-bus", TTLCache(maxsize=16, ttl=60, name="test-bus")))
+    cache.local.clear()
+    for key, tags in (("agendas:1", ["meeting:1"]), ("agendas:2", ["meeting:2"]), ("objectives", ["objectives"])):
+        cache.store(key, key, tags, cache.lookup(key, tags)[2])
+    return cache
+
+
+def test_listener_evicts_tags_published_by_other_workers_only():
+    cache = _filled_bus_cache()
+    listener = InvalidationListener("postgresql://unused", "cache_invalidation")
+    listener.handle(json.dumps({"origin": WORKER_ID, "tags": ["meeting:1"]}))
+    listener.handle("not json")
+    assert len(cache.local) == 3
+    [payload] = encode_messages(["meeting:1", "objectives"], origin="other-worker")
+    listener.handle(payload)
+    assert [k for k in ("agendas:1", "agendas:2", "objectives") if cache.lookup(k, [])[0]] == ["agendas:2"]
+    assert listener.stats()["messages"] == 1
+
+
+def test_large_tag_sets_are_split_into_notify_sized_payloads():
+    tags = [f"meeting:{i}" for i in range(5000)]
+    payloads = encode_messages(tags)
+    assert len(payloads) > 1
+    assert all(len(p.encode("utf-8")) < MAX_PAYLOAD_BYTES + 100 for p in payloads)
+    assert sorted(t for p in payloads for t in json.loads(p)["tags"]) == sorted(tags)
+
+
+class _FakeConnection:
+    def __init__(self, healthy: bool):
+        self.healthy = healthy
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        pass
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    async def fetchval(self, query):
+        if not self.healthy:
+            raise ConnectionError("server closed the connection")
+        return 1
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+
+def test_listener_reconnects_and_flushes_local_caches_after_a_gap():
+    cache = _filled_bus_cache()
+    listener = InvalidationListener("postgresql://unused", "c", health_check_interval=0.01, min_backoff=0.01)
+    connections = [_FakeConnection(healthy=False), _FakeConnection(healthy=True)]
+
+    async def run():
+        with mock.patch("asyncpg.connect", side_effect=connections):
+            task = asyncio.create_task(listener.run())
+            await asyncio.sleep(0.01)  # first connection: flushed on connect, then drops
+            cache.store("current", "cached during the gap", ["meetings"], cache.lookup("current", ["meetings"])[2])
+            await asyncio.sleep(0.2)
+            task.cancel()
+
+    asyncio.run(run())
+    assert listener.connects == 2 and listener.full_flushes == 2 and listener.errors == 1
+    assert connections[0].closed and len(cache.local) == 0
+
+
+class _BlockingBackend(InMemorySharedBackend):
+    """Records which thread bumps tag generations, like a Redis client would block it"""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.incr_threads = []
+
+    def incr(self, key: str) -> int:
+        self.incr_threads.append((key, threading.get_ident()))
+        return super().incr(key)
+
+
+def test_async_commits_bump_the_shared_tier_once_and_off_the_event_loop():
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    import app.core.etag  # noqa: F401  (session hooks)
+    from app.core.database import Base
+    from app.models import Meeting, User
+
+    backend = _BlockingBackend()
+    cache = register_cache(TaggedCache("test-blocking", TTLCache(maxsize=16, ttl=60, name="test-blocking"), shared=backend))
+
+    async def edit_meeting():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[User.__table__, Meeting.__table__]))
+            await conn.execute(insert(User).values(user_id=1, username="admin"))
+            await conn.execute(insert(Meeting).values(
+                meeting_id=1, meeting_title="m", meeting_date=date(2025, 1, 1), start_time=time(9),
+                end_time=time(10), location="x", created_by=1,
+            ))
+        async with AsyncSession(engine) as db:
+            meeting = await db.get(Meeting, 1)
+            meeting.location = "y"
+            await db.flush()
+            assert backend.incr_threads == []  # local tier only until the commit
+            await db.commit()
+        await engine.dispose()
+        for _ in range(100):  # the bump runs in the executor
+            if len(backend.incr_threads) == 2:
+                break
+            await asyncio.sleep(0.01)
+        return threading.get_ident()
+
+    try:
+        loop_thread = asyncio.run(edit_meeting())
+    finally:
+        _registry.pop(cache.name)
+    assert sorted(key for key, _ in backend.incr_threads) == ["tag:meeting:1", "tag:meetings"]
+    assert all(thread != loop_thread for _, thread in backend.incr_threads)
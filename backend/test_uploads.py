@@ -0,0 +1,484 @@
+"""
+Test the streaming upload writer and agenda attachment storage
+Run: python -m pytest test_uploads.py
+"""
+import asyncio
+import hashlib
+import io
+from datetime import date, datetime, time as dtime
+import os
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import create_engine, event, insert, select, text
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.storage import LocalStorage, storage
+from app.core.uploads import STAGING_DIRNAME, UploadTooLarge, stream_to_file, upload_staging
+from app.models import (
+    Agenda, AgendaObjective, AgendaObjectiveMap, DocumentText, File, FileBlob, Meeting, PreviewJob, UploadSession, User,
+)
+from app.schemas.agenda import AgendaCreate
+from app.schemas.file import UploadSessionCreate
+from app.services import preview_service, text_extraction_service, upload_migration_service, upload_sweeper_service
+from app.services.resumable_upload_service import (
+    ChecksumMismatch, ChunkOffsetMismatch, ResumableUploadService, collect_upload_sessions,
+)
+from app.services.agenda_service import AgendaService
+from app.services.blob_service import collect_blobs
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import ClientDisconnect
+
+
+def test_stream_to_file_writes_in_chunks_and_hashes():
+    data = os.urandom(300_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "a", "doc.pdf")
+        written = stream_to_file(io.BytesIO(data), dest, max_size=len(data), chunk_size=64 * 1024)
+        assert written.size == len(data)
+        assert written.sha256 == hashlib.sha256(data).hexdigest()
+        assert Path(dest).read_bytes() == data
+        assert os.listdir(os.path.dirname(dest)) == ["doc.pdf"]
+
+
+def test_oversized_upload_is_aborted_without_leaving_files():
+    class CountingReader(io.BytesIO):
+        reads = 0
+
+        def read(self, size=-1):
+            CountingReader.reads += 1
+            return super().read(size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "big.pdf")
+        with pytest.raises(UploadTooLarge):
+            stream_to_file(CountingReader(b"x" * 1_000_000), dest, max_size=100_000, chunk_size=64 * 1024)
+        assert os.listdir(tmp) == []
+        # Stopped at the second chunk instead of reading the whole upload
+        assert CountingReader.reads == 2
+
+
+def _stage(session, root, name):
+    session.execute(text("SELECT 1"))
+    return upload_staging(session, root).stage(io.BytesIO(b"pdf"), os.path.join(root, name), max_size=100)
+
+
+def test_staged_files_are_promoted_on_commit_and_dropped_otherwise():
+    engine = create_engine("sqlite://")
+    with tempfile.TemporaryDirectory() as root:
+        for name, finish in (("committed.pdf", Session.commit), ("rolled-back.pdf", Session.rollback),
+                             ("abandoned.pdf", Session.close)):
+            session = Session(engine)
+            _stage(session, root, name)
+            assert not os.path.exists(os.path.join(root, name))
+            finish(session)
+        assert sorted(os.listdir(root)) == [STAGING_DIRNAME, "committed.pdf"]
+        assert os.listdir(os.path.join(root, STAGING_DIRNAME)) == []
+
+
+def test_sweeper_promotes_committed_leftovers_and_removes_orphans():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (User, Meeting, Agenda, File, FileBlob)])
+    with tempfile.TemporaryDirectory() as root, Session(engine) as db:
+        db.execute(insert(File).values(
+            agenda_id=1, file_name="kept.pdf", original_name="kept.pdf", file_path=os.path.join(root, "kept.pdf"),
+            file_type=".pdf", uploaded_by=1,
+        ))
+        # A crash between commit and promotion, an abandoned request, and a stray file
+        crashed = os.path.join(root, STAGING_DIRNAME, "crashed")
+        os.makedirs(crashed)
+        for path in (os.path.join(crashed, "kept.pdf"), os.path.join(crashed, "lost.pdf"), os.path.join(root, "stray.pdf")):
+            Path(path).write_bytes(b"x")
+            os.utime(path, (0, 0))
+        os.utime(crashed, (0, 0))
+
+        stats = {"promoted": 0, "staging_removed": 0, "scanned": 0, "orphans_removed": 0, "missing": 0}
+        local = LocalStorage(root)
+        upload_sweeper_service.sweep_staging(db, local, 60, stats)
+        upload_sweeper_service.sweep_orphans(db, local, 60, batch_size=1, stats=stats)
+        upload_sweeper_service.count_missing(db, local, batch_size=1, stats=stats)
+
+        assert sorted(os.listdir(root)) == [STAGING_DIRNAME, "kept.pdf"]
+        assert stats == {"promoted": 1, "staging_removed": 1, "scanned": 2, "orphans_removed": 1, "missing": 0}
+
+
+def test_sweeper_matches_rows_that_spell_the_path_differently(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (User, Meeting, Agenda, File, FileBlob)])
+    with tempfile.TemporaryDirectory() as cwd, Session(engine) as db:
+        monkeypatch.chdir(cwd)
+        os.makedirs("uploads")
+        # Legacy rows relative to the working directory, a newer one absolute
+        for name, file_path in (
+            ("legacy.pdf", "uploads/legacy.pdf"),
+            ("dotted.pdf", "./uploads/dotted.pdf"),
+            ("absolute.pdf", os.path.join(cwd, "uploads", "absolute.pdf")),
+        ):
+            db.execute(insert(File).values(
+                agenda_id=1, file_name=name, original_name=name, file_path=file_path, file_type=".pdf", uploaded_by=1,
+            ))
+        for name in ("legacy.pdf", "dotted.pdf", "absolute.pdf", "stray.pdf"):
+            Path("uploads", name).write_bytes(b"x")
+            os.utime(os.path.join("uploads", name), (0, 0))
+
+        for root in (os.path.join(cwd, "uploads"), "./uploads"):
+            stats = {"scanned": 0, "orphans_removed": 0}
+            upload_sweeper_service.sweep_orphans(db, LocalStorage(root), 60, batch_size=10, stats=stats)
+            assert sorted(os.listdir("uploads")) == ["absolute.pdf", "dotted.pdf", "legacy.pdf"]
+        assert stats == {"scanned": 3, "orphans_removed": 0}
+
+
+def test_identical_attachments_are_stored_once_and_collected_at_zero_references(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+        User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, AgendaObjective, AgendaObjectiveMap)])
+    pdf = os.urandom(50_000)
+    uploads = lambda: [UploadFile(io.BytesIO(pdf), filename="policy.pdf", size=len(pdf)) for _ in range(2)]
+    blob = lambda db: db.execute(select(FileBlob.ref_count, FileBlob.released_at)).one()
+
+    with tempfile.TemporaryDirectory() as root, Session(engine) as db:
+        monkeypatch.setattr(storage, "root", root)
+        db.execute(insert(User).values(user_id=1, username="admin"))
+        db.execute(insert(Meeting).values(
+            meeting_id=1, meeting_title="m", meeting_date=date(2025, 1, 1), start_time=dtime(9), end_time=dtime(10),
+            location="x", created_by=1,
+        ))
+        first = AgendaService.create_agenda(db, 1, AgendaCreate(agenda_title="a"), 1, uploads())
+        second = AgendaService.create_agenda(db, 1, AgendaCreate(agenda_title="b"), 1, uploads())
+
+        paths = {f.file_path for f in first.files + second.files}
+        stored = [os.path.join(d, n) for d, _, names in os.walk(root) for n in names]
+        assert len(paths) == 1 and stored == list(paths)
+        assert blob(db).ref_count == 4
+
+        AgendaService.delete_agenda(db, first.agenda_id)
+        assert blob(db).ref_count == 2
+        for file in second.files:
+            file.is_deleted = True
+        db.commit()
+        assert blob(db).ref_count == 0 and blob(db).released_at is not None
+
+        assert collect_blobs(db, grace_minutes=60, batch_size=10) == 0
+        assert collect_blobs(db, grace_minutes=-1, batch_size=10) == 1
+        assert not os.path.exists(paths.pop())
+
+
+def test_migration_moves_flat_files_into_the_layout_in_batches(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (User, Meeting, Agenda, File, FileBlob)])
+    monkeypatch.setattr(upload_migration_service, "PostgresSessionLocal", sessionmaker(bind=engine))
+    minutes, other = b"minutes" * 100, b"other"
+    with tempfile.TemporaryDirectory() as root:
+        local = LocalStorage(root)
+        with Session(engine) as db:
+            db.execute(insert(User).values(user_id=1, username="admin"))
+            for file_id, data, known_hash in ((1, minutes, None), (2, minutes, hashlib.sha256(minutes).hexdigest()),
+                                              (3, other, None), (4, None, None)):
+                path = os.path.join(root, f"legacy-{file_id}.pdf")
+                if data is not None:
+                    Path(path).write_bytes(data)
+                db.execute(insert(File).values(
+                    file_id=file_id, agenda_id=1, file_name=f"legacy-{file_id}.pdf", original_name="a.pdf",
+                    file_path=path, file_type=".pdf", uploaded_by=1, content_hash=known_hash,
+                ))
+            db.commit()
+
+        first = upload_migration_service.migrate_uploads(local, batch_size=1, limit=2)
+        assert first["migrated"] == 2 and first["last_file_id"] == 2 and first["deduplicated"] == 1
+        rest = upload_migration_service.migrate_uploads(local, batch_size=1, after_id=first["last_file_id"])
+        assert rest["migrated"] == 1 and rest["missing"] == 1
+
+        with Session(engine) as db:
+            paths = dict(db.execute(select(File.file_id, File.file_path)).all())
+            counts = dict(db.execute(select(FileBlob.content_hash, FileBlob.ref_count)).all())
+        assert paths[1] == paths[2] == local.path_for(hashlib.sha256(minutes).hexdigest())
+        assert counts == {hashlib.sha256(minutes).hexdigest(): 2, hashlib.sha256(other).hexdigest(): 1}
+        assert sorted(local.walk()) == sorted({paths[1], paths[3]})
+
+
+async def _body(*pieces, disconnect=False):
+    for piece in pieces:
+        yield piece
+    if disconnect:
+        raise ClientDisconnect()
+
+
+def test_resumable_upload_survives_a_dropped_chunk_and_checks_the_checksum(monkeypatch):
+    pack = os.urandom(400_000)
+    with tempfile.TemporaryDirectory() as root:
+        monkeypatch.setattr(storage, "root", root)
+        database = os.path.join(root, "test.db")
+        engine = create_engine(f"sqlite:///{database}")
+        Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+            User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, UploadSession)])
+        with Session(engine) as db:
+            db.execute(insert(User).values(user_id=1, username="admin"))
+            db.execute(insert(Agenda).values(agenda_id=1, meeting_id=1, user_id=1, agenda_title="a"))
+            db.commit()
+
+        async def upload():
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+            async with AsyncSession(async_engine, expire_on_commit=False) as db:
+                announced = UploadSessionCreate(agenda_id=1, filename="pack.pdf", size=len(pack),
+                                                sha256=hashlib.sha256(pack).hexdigest())
+                upload_session = await ResumableUploadService.create_session(db, announced, user_id=1)
+                upload_id = upload_session.upload_id
+
+                # The connection drops after 150 KB of a 300 KB chunk: what arrived is kept
+                offset = await ResumableUploadService.write_chunk(
+                    db, upload_session, 0, _body(pack[:150_000], disconnect=True))
+                assert offset == 150_000
+                upload_session = await ResumableUploadService.get_session(db, upload_id, 1)
+                with pytest.raises(ChunkOffsetMismatch) as mismatch:
+                    await ResumableUploadService.write_chunk(db, upload_session, 0, _body(pack[:10]))
+                assert mismatch.value.expected == 150_000
+                await ResumableUploadService.write_chunk(db, upload_session, 150_000, _body(pack[150_000:]))
+
+                file = await ResumableUploadService.finalize(db, upload_id, 1)
+                assert (await ResumableUploadService.finalize(db, upload_id, 1)).file_id == file.file_id
+
+                corrupt = await ResumableUploadService.create_session(
+                    db, announced.model_copy(update={"sha256": "0" * 64}), user_id=1)
+                await ResumableUploadService.write_chunk(db, corrupt, 0, _body(pack))
+                with pytest.raises(ChecksumMismatch):
+                    await ResumableUploadService.finalize(db, corrupt.upload_id, 1)
+                assert (await ResumableUploadService.get_session(db, corrupt.upload_id, 1)).received == 0
+                await async_engine.dispose()
+                return file.file_path, corrupt.upload_id
+
+        file_path, corrupt_id = asyncio.run(upload())
+        assert Path(file_path).read_bytes() == pack
+        assert os.listdir(os.path.join(root, ".partial")) == [corrupt_id]
+
+        with Session(engine) as db:
+            db.execute(UploadSession.__table__.update().values(expires_at=datetime(2000, 1, 1)))
+            db.commit()
+            assert collect_upload_sessions(db, LocalStorage(root), grace_minutes=60, batch_size=1) == 2
+            assert os.listdir(os.path.join(root, ".partial")) == []
+        engine.dispose()
+
+
+def test_previews_are_queued_per_content_and_rendered_next_to_it(monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    pytest.importorskip("pypdfium2")
+
+    def encode(image, fmt):
+        out = io.BytesIO()
+        image.save(out, fmt)
+        return out.getvalue()
+
+    photo = encode(Image.new("RGB", (3000, 2000), "red"), "JPEG")
+    scan = encode(Image.new("RGB", (1240, 1754), "white"), "PDF")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+        User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, AgendaObjective, AgendaObjectiveMap)])
+
+    with tempfile.TemporaryDirectory() as root, Session(engine) as db:
+        monkeypatch.setattr(storage, "root", root)
+        db.execute(insert(User).values(user_id=1, username="admin"))
+        uploads = [UploadFile(io.BytesIO(data), filename=name, size=len(data))
+                   for data, name in ((photo, "a.jpg"), (photo, "copy.jpg"), (scan, "scan.pdf"), (b"# x", "notes.md"))]
+        AgendaService.create_agenda(db, 1, AgendaCreate(agenda_title="a"), 1, uploads)
+        assert sorted(db.execute(select(PreviewJob.file_type)).scalars()) == [".jpg", ".pdf"]
+
+        stats = {"done": 0, "failed": 0}
+        preview_service.process_jobs(db, preview_service.claim_jobs(db, 10, 10), storage, stats)
+        assert stats == {"done": 2, "failed": 0}
+        photo_hash = hashlib.sha256(photo).hexdigest()
+        assert Image.open(storage.preview_path(photo_hash, "thumb")).size == (256, 171)
+        assert Image.open(storage.preview_path(hashlib.sha256(scan).hexdigest(), "web")).size == (905, 1280)
+
+        # A failed render is retried later, then given up on
+        monkeypatch.setattr(preview_service.settings, "PREVIEW_MAX_ATTEMPTS", 2)
+        os.unlink(storage.path_for(photo_hash))
+        assert preview_service.requeue_preview(db, photo_hash, ".jpg") == "pending"
+        db.commit()
+        for expected in ("pending", "failed"):
+            db.execute(PreviewJob.__table__.update().values(run_after=None))
+            preview_service.process_jobs(db, preview_service.claim_jobs(db, 10, 10), storage, stats)
+            assert db.get(PreviewJob, photo_hash).status == expected
+
+
+def _pdf(text):
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 5 0 R >> >> "
+        b"/Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = io.BytesIO(b"%PDF-1.4\n"), []
+    out.seek(0, 2)
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _docx(*paragraphs):
+    body = "".join(f"<w:p><w:r><w:t>{a}</w:t><w:tab/><w:t>{b}</w:t></w:r></w:p>" for a, b in paragraphs)
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as package:
+        package.writestr("word/document.xml", (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>"
+        ))
+    return out.getvalue()
+
+
+def test_text_is_extracted_once_per_content_and_capped(monkeypatch):
+    pytest.importorskip("pypdfium2")
+    minutes = _docx(("Budget", "approved"), ("วาระที่ 2", "รับทราบ"))
+    notes = ("# Agenda\r\n\r\n" + "x" * 5000).encode()
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+        User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, AgendaObjective, AgendaObjectiveMap)])
+
+    with tempfile.TemporaryDirectory() as root, Session(engine) as db:
+        monkeypatch.setattr(storage, "root", root)
+        monkeypatch.setattr(text_extraction_service.settings, "TEXT_EXTRACTION_MAX_CHARS", 1000)
+        db.execute(insert(User).values(user_id=1, username="admin"))
+        uploads = [UploadFile(io.BytesIO(data), filename=name, size=len(data)) for data, name in (
+            (minutes, "minutes.docx"), (minutes, "copy.docx"), (_pdf("Quarterly report"), "report.pdf"),
+            (notes, "notes.md"), (b"\xff\xd8", "photo.jpg"),
+        )]
+        agenda = AgendaService.create_agenda(db, 1, AgendaCreate(agenda_title="a"), 1, uploads)
+        assert sorted(db.execute(select(DocumentText.file_type)).scalars()) == [".docx", ".md", ".pdf"]
+
+        stats = {"done": 0, "failed": 0}
+        with text_extraction_service.ExtractionPool(2, factory=ThreadPoolExecutor) as pool:
+            text_extraction_service.process_jobs(db, text_extraction_service.claim_jobs(db, 10, 10), storage, stats, pool)
+        assert stats == {"done": 3, "failed": 0}
+        texts = {file.original_name: file.document_text for file in agenda.files}
+        assert texts["copy.docx"] is texts["minutes.docx"]
+        assert texts["minutes.docx"].content == "Budget\tapproved\nวาระที่ 2\tรับทราบ"
+        assert texts["report.pdf"].content == "Quarterly report"
+        assert texts["notes.md"].content.startswith("# Agenda\n\nxxx")
+        assert texts["notes.md"].char_count == 1000 and texts["notes.md"].truncated
+        assert texts["photo.jpg"] is None
+
+
+def test_browsers_may_send_and_read_upload_offsets():
+    from app.main import app
+
+    async def preflight():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.options("/api/v1/uploads/abc", headers={
+                "Origin": "http://localhost:5173",
+                "Access-Control-Request-Method": "PATCH",
+                "Access-Control-Request-Headers": "authorization, content-type, upload-offset",
+            })
+
+    response = asyncio.run(preflight())
+    assert response.status_code == 200
+    assert "PATCH" in response.headers["access-control-allow-methods"]
+    assert "HEAD" in response.headers["access-control-allow-methods"]
+    assert "upload-offset" in response.headers["access-control-allow-headers"].lower()
+
+    async def read_offset():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.head("/api/v1/uploads/abc", headers={"Origin": "http://localhost:5173"})
+
+    assert "Upload-Offset" in asyncio.run(read_offset()).headers["access-control-expose-headers"]
+
+
+class _CrashingExecutor(ThreadPoolExecutor):
+    """Stands in for a process pool whose worker dies on documents starting with CRASH"""
+
+    broken = False
+
+    def submit(self, fn, path, *args):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        if Path(path).read_bytes().startswith(b"CRASH"):
+            self.broken = True
+            future = Future()
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+            return future
+        return super().submit(fn, path, *args)
+
+
+def test_a_document_that_kills_its_worker_fails_alone():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+        User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, AgendaObjective, AgendaObjectiveMap)])
+
+    with tempfile.TemporaryDirectory() as root, Session(engine) as db, pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(storage, "root", root)
+        db.execute(insert(User).values(user_id=1, username="admin"))
+        uploads = [UploadFile(io.BytesIO(data), filename=name, size=len(data))
+                   for data, name in ((b"# one", "one.md"), (b"CRASH", "bad.md"), (b"# two", "two.md"))]
+        AgendaService.create_agenda(db, 1, AgendaCreate(agenda_title="a"), 1, uploads)
+
+        stats = {"done": 0, "failed": 0}
+        with text_extraction_service.ExtractionPool(2, factory=_CrashingExecutor) as pool:
+            text_extraction_service.process_jobs(db, text_extraction_service.claim_jobs(db, 10, 10), storage, stats, pool)
+        assert stats == {"done": 2, "failed": 1} and pool.restarts >= 2
+        rows = dict(db.execute(select(DocumentText.content, DocumentText.status)).all())
+        assert rows == {"# one": "done", "# two": "done", None: "failed"}
+        assert db.execute(select(DocumentText.attempts).where(DocumentText.status == "failed")).scalar() == 1
+
+
+def test_deleting_an_agenda_abandons_its_upload_sessions():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (
+        User, Meeting, Agenda, File, FileBlob, PreviewJob, DocumentText, UploadSession, AgendaObjective, AgendaObjectiveMap)])
+
+    with Session(engine) as db:
+        db.execute(insert(User).values(user_id=1, username="admin"))
+        db.execute(insert(Meeting).values(
+            meeting_id=1, meeting_title="m", meeting_date=date(2025, 1, 1), start_time=dtime(9), end_time=dtime(10),
+            location="x", created_by=1,
+        ))
+        db.execute(insert(Agenda).values(agenda_id=1, meeting_id=1, user_id=1, agenda_title="a"))
+        db.execute(insert(File).values(
+            file_id=1, agenda_id=1, file_name="f", original_name="f.pdf", file_path="f.pdf", file_type=".pdf",
+            uploaded_by=1,
+        ))
+        session = dict(agenda_id=1, user_id=1, original_name="f.pdf", file_type=".pdf", total_size=1,
+                       content_hash="0" * 64, received=0, expires_at=datetime(2100, 1, 1))
+        db.execute(insert(UploadSession).values([
+            {**session, "upload_id": "finalized", "file_id": 1}, {**session, "upload_id": "in-progress", "file_id": None},
+        ]))
+        db.commit()
+
+        assert AgendaService.delete_agenda(db, 1)
+        assert db.execute(select(UploadSession.upload_id)).all() == []
+
+
+def test_abandoned_jobs_are_reclaimed_until_their_attempts_run_out(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[DocumentText.__table__, PreviewJob.__table__])
+    monkeypatch.setattr(text_extraction_service.settings, "TEXT_EXTRACTION_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(preview_service.settings, "PREVIEW_MAX_ATTEMPTS", 3)
+    abandoned = dict(file_type=".pdf", status="running", locked_at=datetime(2000, 1, 1), created_at=datetime(2000, 1, 1))
+
+    with Session(engine) as db:
+        for model, service in ((DocumentText, text_extraction_service), (PreviewJob, preview_service)):
+            # A worker that died on "crashes" (e.g. PDFium) would die on it again
+            db.add_all([model(content_hash="crashes", attempts=3, **abandoned),
+                        model(content_hash="retried", attempts=1, **abandoned)])
+            db.commit()
+            assert [job.content_hash for job in service.claim_jobs(db, 10, 10)] == ["retried"]
+            assert db.get(model, "crashes").status == "failed"
+            assert db.get(model, "retried").attempts == 2